@@ -0,0 +1,192 @@
+"""End-to-end benchmark of the real CLI commands against local fake services.
+
+Starts the stand-ins in fakes.py, writes a config pointing every endpoint at
+them, and runs `twitcast dashboard`, `promo` and `summarize` as subprocesses
+with their own cache directory. Reports wall time, requests per service,
+injected failures and model calls/tokens for each command. No network
+access or real credentials are needed.
+
+    python benchmarks/bench_e2e.py
+    python benchmarks/bench_e2e.py --latency-ms 80 --failure-rate 0.05
+    python benchmarks/bench_e2e.py --service anthropic:1500 --service memberful:40:0.02
+    python benchmarks/bench_e2e.py --members 50000 --episodes 200 --runs 3 --cold
+
+Runs share a cache directory unless --cold is given, so later runs show
+the steady state (TTL caches warm, promos already posted, dashboard
+unchanged).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fakes import SERVICES, FakeServices, ServiceSpec, Volume  # noqa: E402
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+COMMANDS = {
+    "dashboard": ["dashboard", "--no-pi"],
+    "promo": ["promo"],
+    "summarize": ["summarize"],
+}
+
+CONFIG_TEMPLATE = """\
+[twit]
+api_url = "{url}/twit/api/v1.0"
+transcript_url = "{url}/transcripts"
+
+[memberful]
+api_url = "{url}/memberful/api/graphql"
+
+[youtube]
+api_url = "{url}/youtube/v3"
+
+[anthropic]
+base_url = "{url}/anthropic"
+
+[discord]
+webhook_url = "{url}/discord/webhook"
+
+[discourse]
+base_url = "{url}/discourse"
+
+[mastodon]
+instance_url = "{url}/mastodon"
+
+[display]
+memberful_refresh_hours = {refresh_hours}
+
+[promo]
+post_delay_seconds = {post_delay}
+"""
+
+# Fake credentials so every code path that checks for a key runs
+FAKE_ENV = {
+    "TWIT_APP_ID": "bench",
+    "TWIT_APP_KEY": "bench",
+    "MEMBERFUL_API_KEY": "bench",
+    "MEMBERFUL_API_USER_ID": "1",
+    "YOUTUBE_API_KEY": "bench",
+    "ANTHROPIC_API_KEY": "bench",
+    "DISCOURSE_API_KEY": "bench",
+    "DISCOURSE_API_USERNAME": "bench",
+    "MASTODON_ACCESS_TOKEN": "bench",
+}
+
+
+def _parse_service(value: str) -> tuple[str, ServiceSpec]:
+    name, _, rest = value.partition(":")
+    if name not in SERVICES:
+        raise argparse.ArgumentTypeError(f"unknown service {name!r}, expected one of {', '.join(SERVICES)}")
+    latency, _, failure = rest.partition(":")
+    return name, ServiceSpec(float(latency or 0), float(failure or 0))
+
+
+def _run_command(args: list[str], env: dict, timeout: float) -> tuple[int, float, str]:
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-c", "from twitcast.cli import main; main()", *args],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        code, output = proc.returncode, proc.stdout + proc.stderr
+    except subprocess.TimeoutExpired as e:
+        code, output = -1, f"timed out after {timeout}s\n{e.stderr or ''}"
+    return code, time.perf_counter() - start, output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", default="dashboard,promo,summarize", help="comma-separated commands to run")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--cold", action="store_true", help="start every run with an empty cache")
+    parser.add_argument("--latency-ms", type=float, default=20, help="default per-request latency")
+    parser.add_argument("--failure-rate", type=float, default=0, help="default fraction of requests answered 503")
+    parser.add_argument(
+        "--service", action="append", type=_parse_service, default=[], metavar="NAME:LATENCY_MS[:FAILURE_RATE]",
+        help="override latency/failure for one service",
+    )
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--members", type=int, default=50_000)
+    parser.add_argument("--transcript-kb", type=int, default=60)
+    parser.add_argument("--post-delay", type=float, default=0, help="promo delay between posts (production: 3)")
+    parser.add_argument("--refresh-hours", type=float, default=4, help="memberful/youtube cache TTL")
+    parser.add_argument("--timeout", type=float, default=600, help="per-command timeout in seconds")
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print each command's output")
+    args = parser.parse_args()
+
+    commands = [c.strip() for c in args.commands.split(",") if c.strip()]
+    unknown = [c for c in commands if c not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    specs = {name: ServiceSpec(args.latency_ms, args.failure_rate) for name in SERVICES}
+    specs.update(dict(args.service))
+    volume = Volume(episodes=args.episodes, members=args.members, transcript_kb=args.transcript_kb)
+
+    workdir = Path(tempfile.mkdtemp(prefix="twitcast-bench-"))
+    results = []
+    try:
+        with FakeServices(specs, volume) as fakes:
+            config_path = workdir / "config.toml"
+            config_path.write_text(CONFIG_TEMPLATE.format(
+                url=fakes.url, refresh_hours=args.refresh_hours, post_delay=args.post_delay,
+            ))
+            cache_dir = workdir / "cache"
+            env = {
+                **os.environ,
+                **FAKE_ENV,
+                "TWITCAST_CONFIG": str(config_path),
+                "TWITCAST_CACHE_DIR": str(cache_dir),
+                "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")])),
+            }
+            env.pop("DISCORD_WEBHOOK_URL", None)
+
+            for run in range(1, args.runs + 1):
+                if args.cold:
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                for command in commands:
+                    fakes.reset_stats()
+                    code, wall, output = _run_command(COMMANDS[command], env, args.timeout)
+                    stats = fakes.reset_stats()
+                    results.append({"run": run, "command": command, "exit_code": code, "wall_s": round(wall, 3),
+                                    **stats.as_dict()})
+                    if args.verbose or code != 0:
+                        print(f"--- {command} (run {run}, exit {code}) ---\n{output}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    _print_results(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    if any(r["exit_code"] != 0 for r in results):
+        sys.exit(1)
+
+
+def _print_results(results: list[dict]) -> None:
+    print(f"{'run':>3} {'command':<10} {'exit':>4} {'wall s':>8} {'reqs':>6} {'fails':>5} "
+          f"{'model':>5} {'tok in':>7} {'tok out':>7}  requests by service")
+    print("-" * 100)
+    for r in results:
+        by_service = ", ".join(f"{k} {v}" for k, v in sorted(r["requests"].items(), key=lambda kv: -kv[1]))
+        print(
+            f"{r['run']:>3} {r['command']:<10} {r['exit_code']:>4} {r['wall_s']:>8.2f} "
+            f"{sum(r['requests'].values()):>6} {sum(r['failures'].values()):>5} {r['model_calls']:>5} "
+            f"{r['input_tokens']:>7} {r['output_tokens']:>7}  {by_service}"
+        )
+
+
+if __name__ == "__main__":
+    main()
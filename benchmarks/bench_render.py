@@ -0,0 +1,187 @@
+"""Dashboard rendering benchmark.
+
+Renders fixture scenarios offline and reports render time, peak memory and
+PNG encode size for each, compared against a stored baseline.
+
+    python benchmarks/bench_render.py                    # run and compare
+    python benchmarks/bench_render.py --check            # exit 1 on regression
+    python benchmarks/bench_render.py --update-baseline  # store new baseline
+
+Each scenario runs in a fresh subprocess so peak memory (growth of the
+process's max RSS during rendering) isn't masked by earlier scenarios.
+Timings are machine-specific: regenerate the baseline on the machine you
+compare on.
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import fixtures  # noqa: E402
+
+from twitcast.dashboard.fonts import load_fonts  # noqa: E402
+from twitcast.dashboard.layout import PROFILES, LayoutProfile  # noqa: E402
+from twitcast.dashboard.palette import quantize  # noqa: E402
+from twitcast.dashboard.renderer import render_dashboard  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / "baseline_render.json"
+MIN_RENDER_DELTA_MS = 2.0
+
+# 6 tiles across a 1600px panel, to stress tile and art handling
+WIDE_PROFILE = replace(PROFILES["eink-large"], name="wide-6", num_tiles=6, art_width=256, scale=1.0)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    profile: LayoutProfile
+    episodes: int = 3
+    titles: str = "short"
+    with_art: bool = True
+    member_count: int | None = 12_345
+    youtube: bool = True
+    palette: str = ""
+
+
+SCENARIOS = [
+    Scenario("no-data", PROFILES["eink"], episodes=0, member_count=None, youtube=False),
+    Scenario("no-episodes", PROFILES["eink"], episodes=0),
+    Scenario("short-titles", PROFILES["eink"]),
+    Scenario("long-titles", PROFILES["eink"], titles="long"),
+    Scenario("missing-art", PROFILES["eink"], titles="long", with_art=False),
+    Scenario("no-youtube", PROFILES["eink"], youtube=False),
+    Scenario("gray4-dither", PROFILES["eink"], titles="long", palette="gray4"),
+    Scenario("discord-card", PROFILES["discord"], titles="long"),
+    Scenario("large-panel", PROFILES["eink-large"], episodes=4, titles="long"),
+    Scenario("many-tiles", WIDE_PROFILE, episodes=6, titles="long"),
+]
+
+
+def _maxrss_kb() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _run_scenario(scenario: Scenario, repeat: int, queue: multiprocessing.Queue) -> None:
+    titles = fixtures.LONG_TITLES if scenario.titles == "long" else fixtures.SHORT_TITLES
+    episodes = fixtures.make_episodes(scenario.episodes, titles, scenario.with_art)
+    youtube_subs = fixtures.YOUTUBE_SUBS if scenario.youtube else None
+
+    # What load_artwork hands the renderer: decoded art already fitted.
+    # Generated at that size so fixture setup doesn't inflate peak RSS.
+    art_images = None
+    if episodes:
+        art_width = scenario.profile.art_width
+        art = fixtures.make_artwork(len(episodes), size=(art_width, art_width * 9 // 16))
+        art_images = [img if scenario.with_art else None for img in art]
+
+    def render() -> Image.Image:
+        img = render_dashboard(episodes, scenario.member_count, youtube_subs, scenario.profile, art_images)
+        return quantize(img, scenario.palette) if scenario.palette else img
+
+    # Warm the process-wide font cache; measure rendering, not font loading
+    load_fonts(scenario.profile.scale)
+    rss_before = _maxrss_kb()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        img = render()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    buf = io.BytesIO()
+    start = time.perf_counter()
+    img.save(buf, "PNG")
+    encode_ms = (time.perf_counter() - start) * 1000
+
+    queue.put({
+        "render_ms": round(statistics.median(timings), 2),
+        "encode_ms": round(encode_ms, 2),
+        "peak_kb": max(0, _maxrss_kb() - rss_before),
+        "png_bytes": len(buf.getvalue()),
+    })
+
+
+def run(scenarios: list[Scenario], repeat: int) -> dict[str, dict]:
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for scenario in scenarios:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_scenario, args=(scenario, repeat, queue))
+        proc.start()
+        results[scenario.name] = queue.get()
+        proc.join()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print a results table against the baseline. Returns regression messages."""
+    regressions = []
+    print(f"{'scenario':<16} {'render ms':>10} {'encode ms':>10} {'peak KB':>9} {'PNG bytes':>10}  vs baseline")
+    print("-" * 80)
+    for name, r in results.items():
+        base = baseline.get(name)
+        notes = []
+        if base:
+            for key, label in (("render_ms", "render"), ("png_bytes", "png")):
+                if base[key]:
+                    change = (r[key] - base[key]) / base[key]
+                    notes.append(f"{label} {change:+.0%}")
+                    # Sub-millisecond wobble on tiny scenarios isn't a regression
+                    if change > tolerance and not (key == "render_ms" and r[key] - base[key] < MIN_RENDER_DELTA_MS):
+                        regressions.append(f"{name}: {label} {base[key]} -> {r[key]} ({change:+.0%})")
+        else:
+            notes.append("new")
+        print(
+            f"{name:<16} {r['render_ms']:>10.2f} {r['encode_ms']:>10.2f} {r['peak_kb']:>9} "
+            f"{r['png_bytes']:>10}  {', '.join(notes)}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="renders per scenario (median is reported)")
+    parser.add_argument("--scenario", action="append", help="run only these scenarios")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown/growth before flagging")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any scenario regressed")
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    results = run(scenarios, args.repeat)
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Local stand-ins for every service twitcast talks to.
+
+One threaded HTTP server answers for all of them, routed by path prefix:
+
+    /twit/...        TWiT API (episodes, shows)
+    /art/...         episode hero images
+    /transcripts/... transcript pages
+    /memberful/...   Memberful GraphQL
+    /youtube/...     YouTube Data API
+    /anthropic/...   Anthropic Messages API
+    /discord/...     Discord webhook
+    /discourse/...   Discourse
+    /mastodon/...    Mastodon
+
+Each service has its own latency and failure rate (failures are 503s), and
+the data volume (episodes, members, transcript size) is configurable.
+Requests, injected failures, model calls and token counts are tallied per
+service so a run can be attributed.
+"""
+
+import io
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+SERVICES = ("twit", "art", "transcripts", "memberful", "youtube", "anthropic", "discord", "discourse", "mastodon")
+
+SHOWS = [
+    ("this-week-in-tech", "This Week in Tech", "TWiT"),
+    ("security-now", "Security Now", "SN"),
+    ("macbreak-weekly", "MacBreak Weekly", "MBW"),
+    ("windows-weekly", "Windows Weekly", "WW"),
+    ("intelligent-machines", "Intelligent Machines", "IM"),
+    ("tech-news-weekly", "Tech News Weekly", "TNW"),
+    ("hands-on-tech", "Hands-On Tech", "HOT"),
+    ("ios-today", "iOS Today", "iOS"),
+    ("this-week-in-space", "This Week in Space", "TWiS"),
+    ("untitled-linux-show", "Untitled Linux Show", "ULS"),
+]
+
+WORDS = (
+    "security patch browser update encryption privacy chip silicon battery "
+    "network router firmware cloud outage regulation antitrust model agent "
+    "keyboard display satellite launch rocket streaming codec podcast "
+    "password passkey malware ransomware vulnerability exploit kernel"
+).split()
+
+
+@dataclass
+class ServiceSpec:
+    latency_ms: float = 0
+    failure_rate: float = 0
+
+
+@dataclass
+class Volume:
+    episodes: int = 200
+    members: int = 50_000
+    transcript_kb: int = 60
+    show_notes_items: int = 12
+
+
+@dataclass
+class Stats:
+    requests: Counter = field(default_factory=Counter)
+    failures: Counter = field(default_factory=Counter)
+    bytes_out: Counter = field(default_factory=Counter)
+    model_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": dict(self.requests),
+            "failures": dict(self.failures),
+            "bytes_out": dict(self.bytes_out),
+            "model_calls": self.model_calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeData:
+    """Deterministic response bodies, built once and reused across requests."""
+
+    def __init__(self, volume: Volume, base_url: str, seed: int = 7):
+        self.volume = volume
+        self.base_url = base_url
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+        self.episodes = []
+        for i in range(volume.episodes):
+            slug, label, code = SHOWS[i % len(SHOWS)]
+            number = 1000 - i // len(SHOWS)
+            episode_id = 500_000 - i
+            notes = "".join(
+                f"<li>{' '.join(rng.choice(WORDS) for _ in range(8)).capitalize()}</li>"
+                for _ in range(volume.show_notes_items)
+            )
+            self.episodes.append({
+                "id": episode_id,
+                "label": " ".join(rng.choice(WORDS) for _ in range(5)).title(),
+                "episodeNumber": number,
+                "airingDate": (now - timedelta(hours=3 * i)).isoformat(),
+                "cleanPath": f"/shows/{slug}/episodes/{number}",
+                "teaser": "A fake episode for benchmarking.",
+                "showNotes": f"<ul>{notes}</ul>",
+                "heroImage": {"derivatives": {"twit_thumb_720x405": f"{base_url}/art/{episode_id}.jpg"}},
+                "_embedded": {"shows": [{"label": label, "shortCode": code, "cleanPath": f"/shows/{slug}"}]},
+            })
+        self.by_id = {str(ep["id"]): ep for ep in self.episodes}
+        self.shows = [
+            {"id": 1000 + i, "label": label, "shortCode": code, "cleanPath": f"/shows/{slug}"}
+            for i, (slug, label, code) in enumerate(SHOWS)
+        ]
+        # (id, title) of topics created on the fake Discourse
+        self.topics: list[tuple[int, str, int | None]] = []
+        self.transcript_slugs = {f"{ep['cleanPath'].split('/')[2]}-{ep['episodeNumber']}-transcript" for ep in self.episodes}
+        self.transcript = self._transcript(rng, volume.transcript_kb * 1024).encode()
+        self.art = self._art(rng)
+
+    @staticmethod
+    def _transcript(rng: random.Random, size: int) -> str:
+        lines = ["<html><body><h1>Transcript</h1>"]
+        total, seconds = 0, 0
+        while total < size:
+            seconds += rng.randrange(5, 40)
+            h, rem = divmod(seconds, 3600)
+            speaker = rng.choice(["Leo Laporte", "Steve Gibson", "Paris Martineau", "Jeff Jarvis"])
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randrange(12, 60)))
+            line = f"<p>{speaker} [{h:02d}:{rem // 60:02d}:{rem % 60:02d}]: {text.capitalize()}.</p>"
+            lines.append(line)
+            total += len(line)
+        lines.append("</body></html>")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _art(rng: random.Random) -> bytes:
+        img = Image.effect_noise((720, 405), 60).convert("RGB")
+        tint = Image.new("RGB", img.size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        buf = io.BytesIO()
+        Image.blend(img, tint, 0.5).save(buf, "JPEG", quality=85)
+        return buf.getvalue()
+
+    def member_page(self, first: int, after: int) -> dict:
+        end = min(after + first, self.volume.members)
+        edges = [
+            {"node": {
+                "creditCard": {"brand": "visa"} if i % 5 else None,
+                "subscriptions": [{"active": i % 3 != 0}],
+            }}
+            for i in range(after, end)
+        ]
+        return {"data": {"members": {
+            "pageInfo": {"endCursor": str(end), "hasNextPage": end < self.volume.members},
+            "edges": edges,
+        }}}
+
+
+class FakeServices(ThreadingHTTPServer):
+    """Serve all fakes on one local port. Use as a context manager."""
+
+    daemon_threads = True
+
+    def __init__(self, specs: dict[str, ServiceSpec], volume: Volume, seed: int = 7):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.specs = specs
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = Stats()
+        self.data = FakeData(volume, self.url, seed)
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset_stats(self) -> Stats:
+        with self.lock:
+            stats, self.stats = self.stats, Stats()
+        return stats
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeServices
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        parts = urlsplit(self.path)
+        service, _, rest = parts.path.lstrip("/").partition("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        server = self.server
+        spec = server.specs.get(service)
+        if spec is None:
+            return self._send(404, b"unknown service")
+        with server.lock:
+            server.stats.requests[service] += 1
+            fail = server.rng.random() < spec.failure_rate
+        if spec.latency_ms:
+            time.sleep(spec.latency_ms / 1000)
+        if fail:
+            with server.lock:
+                server.stats.failures[service] += 1
+            return self._send(503, b"injected failure", service=service)
+
+        handler = getattr(self, f"_{service}")
+        status, payload, content_type = handler(rest, parse_qs(parts.query), body)
+        self._send(status, payload, content_type, service)
+
+    def _send(self, status: int, payload, content_type: str = "text/plain", service: str = ""):
+        if isinstance(payload, (dict, list)):
+            payload, content_type = json.dumps(payload).encode(), "application/json"
+        elif isinstance(payload, str):
+            payload = payload.encode()
+        if service:
+            with self.server.lock:
+                self.server.stats.bytes_out[service] += len(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _twit(self, rest, query, body):
+        data = self.server.data
+        path = rest.removeprefix("api/v1.0/")
+        if path == "episodes":
+            count = int((query.get("range") or ["10"])[0])
+            page = int((query.get("page") or ["0"])[0])
+            return 200, {"episodes": data.episodes[page * count:(page + 1) * count]}, ""
+        if path.startswith("episodes/"):
+            episode = data.by_id.get(path.split("/", 1)[1])
+            return (200, episode, "") if episode else (404, {"error": "not found"}, "")
+        if path == "shows":
+            return 200, {"shows": data.shows}, ""
+        return 404, {"error": "not found"}, ""
+
+    def _art(self, rest, query, body):
+        return 200, self.server.data.art, "image/jpeg"
+
+    def _transcripts(self, rest, query, body):
+        if rest.strip("/") in self.server.data.transcript_slugs:
+            return 200, self.server.data.transcript, "text/html"
+        return 404, b"not found", "text/html"
+
+    def _memberful(self, rest, query, body):
+        gql = json.loads(body or b"{}").get("query", "")
+        first = int((re.search(r"first:\s*(\d+)", gql) or [0, 100])[1])
+        after = re.search(r'after:\s*"(\d+)"', gql)
+        return 200, self.server.data.member_page(first, int(after[1]) if after else 0), ""
+
+    def _youtube(self, rest, query, body):
+        ids = (query.get("id") or [""])[0].split(",")
+        items = [
+            {"id": cid, "statistics": {"subscriberCount": str(1_000_000 // (i + 1))}}
+            for i, cid in enumerate(ids) if cid
+        ]
+        return 200, {"items": items}, ""
+
+    def _anthropic(self, rest, query, body):
+        request = json.loads(body or b"{}")
+        system = request.get("system") or ""
+        prompt = system + "".join(str(m.get("content", "")) for m in request.get("messages", []))
+        if "JSON object" in system:
+            text = json.dumps({
+                "summary": "The hosts discuss the week's news in some depth. " * 3,
+                "topics": ["Browser security patches", "Chip supply", "Privacy regulation"],
+                "notable_quote": '"Patch your router." - Steve Gibson',
+            })
+        elif "500 characters" in system:
+            text = "New episode out now.\n- Security patches\n- Privacy news\nhttps://twit.tv/ #TWiT"
+        else:
+            text = "A new episode is available.\n- One\n- Two\n- Three\nhttps://twit.tv/\n#TWiT #podcast"
+        input_tokens, output_tokens = _estimate_tokens(prompt), _estimate_tokens(text)
+        with self.server.lock:
+            stats = self.server.stats
+            stats.model_calls += 1
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+        return 200, {
+            "id": f"msg_fake{stats.model_calls}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", ""),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        }, ""
+
+    def _discord(self, rest, query, body):
+        return 204, b"", "text/plain"
+
+    def _discourse(self, rest, query, body):
+        data = self.server.data
+        if rest == "categories.json":
+            subcategories = [
+                {"id": 100 + i, "name": label, "slug": slug, "parent_category_id": 5}
+                for i, (slug, label, _) in enumerate(SHOWS)
+            ]
+            return 200, {"category_list": {"categories": [
+                {"id": 5, "name": "TWiT Shows", "slug": "twit-shows", "subcategory_list": subcategories},
+            ]}}, ""
+        if rest == "latest.json":
+            with self.server.lock:
+                topics = [{"id": tid, "title": title, "category_id": cat} for tid, title, cat in data.topics[-30:]]
+            return 200, {"topic_list": {"topics": topics[::-1]}}, ""
+        post = json.loads(body or b"{}")
+        title = post.get("title", "")
+        with self.server.lock:
+            if any(t == title for _, t, _ in data.topics):
+                return 422, {"errors": ["Title has already been used"]}, ""
+            topic_id = len(data.topics) + 1
+            data.topics.append((topic_id, title, post.get("category")))
+        return 200, {"id": topic_id, "topic_id": topic_id}, ""
+
+    def _mastodon(self, rest, query, body):
+        return 200, {"id": "1", "url": f"{self.server.url}/mastodon/@twit/1"}, ""
@@ -0,0 +1,71 @@
+"""Offline fixture data for dashboard benchmarks.
+
+Everything is generated deterministically in-process: no network, no files.
+Episodes use the shape returned by api.twit.fetch_episodes.
+"""
+
+import random
+
+from PIL import Image, ImageDraw
+
+SHOW_CODES = ["TWiT", "SN", "MBW", "WW", "IM", "TNW", "HOT", "iOS", "TWiS", "HTG", "HOA", "HOW", "ULS", "AI"]
+
+SHORT_TITLES = ["Bits", "Zero Day", "Pixel Perfect", "Hot Takes", "Ship It", "Beta", "Rollback", "Uptime"]
+
+LONG_TITLES = [
+    "The Unreasonable Effectiveness of Rebooting Everything Twice Before Filing a Bug Report",
+    "Antidisestablishmentarianism Meets Supercalifragilisticexpialidocious Cryptography Standards",
+    "Why Every Smart Speaker In Your House Is Quietly Negotiating With Your Thermostat Right Now",
+    "A Completely Exhaustive and Somewhat Exhausting Review of Every Keyboard Ever Manufactured",
+    "Regulators, Mount Up: The Long Road to Interoperable Messaging Across Walled Gardens",
+    "From Punch Cards to Quantum Annealing in Ninety Minutes With Questionable Accuracy",
+]
+
+YOUTUBE_SUBS = [
+    ("TWiT", "1.2M"),
+    ("SN", "280K"),
+    ("TWiT Show", "152K"),
+    ("HOT", "98.4K"),
+    ("MBW", "41.7K"),
+    ("WW", "33.9K"),
+    ("iOS", "22.8K"),
+    ("TWiS", "9.6K"),
+]
+
+
+def make_episodes(count: int, titles: list[str], with_art: bool = True) -> list[dict]:
+    """Episodes like fetch_episodes returns, newest first."""
+    episodes = []
+    for i in range(count):
+        episodes.append({
+            "show_code": SHOW_CODES[i % len(SHOW_CODES)],
+            "show_name": titles[i % len(titles)],
+            "airing_date": f"2026-10-{19 - i % 18:02d}T{10 + i % 9:02d}:30:00-07:00",
+            "image_url": f"https://example.invalid/art/{i}.jpg" if with_art else None,
+            "episode_id": 100_000 + i,
+        })
+    return episodes
+
+
+def make_artwork(count: int, size: tuple[int, int] = (720, 405), seed: int = 42) -> list[Image.Image]:
+    """Noisy gradient thumbnails standing in for decoded episode hero images.
+
+    The noise keeps PNG encode sizes realistic; flat fills would compress to
+    almost nothing and hide encode regressions.
+    """
+    rng = random.Random(seed)
+    art = []
+    for i in range(count):
+        base = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        img = Image.linear_gradient("L").resize(size).convert("RGB")
+        tint = Image.new("RGB", size, base)
+        img = Image.blend(img, tint, 0.6)
+        noise = Image.effect_noise(size, 40).convert("RGB")
+        img = Image.blend(img, noise, 0.2)
+        draw = ImageDraw.Draw(img)
+        for _ in range(6):
+            x, y = rng.randrange(size[0]), rng.randrange(size[1])
+            r = rng.randrange(20, 120)
+            draw.ellipse((x - r, y - r, x + r, y + r), fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        art.append(img)
+    return art
@@ -1,9 +1,31 @@
-"""Haiku wrapper: summarize transcripts and write promotional copy."""
+"""Haiku wrapper: summarize transcripts and write promotional copy.
+
+Every call goes through ``_create``, which guards the API three ways:
+
+- a circuit breaker per key, endpoint and model, shared by every caller
+  in the process, so during an outage calls fail at once instead of each
+  waiting out its own timeouts;
+- a deadline per call (``anthropic.timeout_seconds``, split across the
+  SDK's retries) and, inside ``run_deadline``, one for the whole run;
+- an optional cheaper ``anthropic.fallback_model``, tried when the
+  primary model fails or its circuit is open.
+
+Public functions still return None on any failure, so callers fall back
+to the template or local path as before.
+"""
 
 import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 
 import anthropic
 
+from twitcast import metrics
+from twitcast.api import tokens
+from twitcast.breaker import CircuitBreaker
 from twitcast.config import Config
 
 log = logging.getLogger(__name__)
@@ -15,6 +37,7 @@ Produce a JSON object with exactly these keys:
 3. "notable_quote": one notable quote with speaker attribution
 
 Return ONLY valid JSON, no markdown fences."""
+SUMMARIZE_MAX_TOKENS = 1024
 
 MASTODON_SYSTEM = """Condense this announcement to fit within 500 characters (including the URL and hashtags).
 Keep it factual and brief. Use 2-3 bullet points max, no emoji. Keep the episode URL and hashtags.
@@ -35,8 +58,130 @@ Keep it under 120 words. Factual and informative — this is an announcement, no
 Episode URL: {episode_url}"""
 
 
+def _count_retry(request) -> None:
+    # The SDK retries 429/5xx itself and numbers each attempt in this header
+    if request.headers.get("x-stainless-retry-count", "0") != "0":
+        metrics.incr("http.retries")
+
+
+@lru_cache(maxsize=None)
+def _client_for(api_key: str, base_url: str) -> anthropic.Anthropic:
+    return anthropic.Anthropic(
+        api_key=api_key,
+        base_url=base_url or None,
+        http_client=anthropic.DefaultHttpxClient(event_hooks={"request": [_count_retry]}),
+    )
+
+
 def _get_client(config: Config) -> anthropic.Anthropic:
-    return anthropic.Anthropic(api_key=config.anthropic.api_key)
+    """One client (and connection pool) per key and endpoint, reused across
+    calls and across tenants that share credentials."""
+    return _client_for(config.anthropic.api_key, config.anthropic.base_url)
+
+
+class ModelUnavailable(Exception):
+    """No model could be called: circuits open or the deadline has passed."""
+
+
+# Below this many seconds left, a call isn't worth starting
+MIN_CALL_SECONDS = 5
+
+_breakers: dict[tuple[str, str, str], CircuitBreaker] = {}
+_run_deadline: ContextVar[float | None] = ContextVar("twitcast_llm_deadline", default=None)
+
+
+def _breaker_for(config: Config, model: str) -> CircuitBreaker:
+    ac = config.anthropic
+    # setdefault keeps this race-free without a lock; a lost duplicate is harmless
+    return _breakers.setdefault(
+        (ac.api_key, ac.base_url, model),
+        CircuitBreaker(f"Anthropic {model}", ac.breaker_threshold, ac.breaker_cooldown_seconds),
+    )
+
+
+@contextmanager
+def run_deadline(seconds: float) -> Iterator[None]:
+    """No model call made inside this block runs past seconds from now."""
+    token = _run_deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _run_deadline.reset(token)
+
+
+def available(config: Config) -> bool:
+    """Whether a model call could go out now (any model's circuit closed, time left)."""
+    deadline = _run_deadline.get()
+    if deadline is not None and deadline - time.monotonic() < MIN_CALL_SECONDS:
+        return False
+    models = [config.anthropic.model, config.anthropic.fallback_model]
+    return any(not _breaker_for(config, m).is_open for m in models if m)
+
+
+def _counts_against_breaker(e: anthropic.APIError) -> bool:
+    # A malformed request fails the same way on any model; everything else
+    # (timeouts, 5xx, 529 overloaded, 429, auth, 404 for a retired or
+    # misspelled model) says this model is unusable
+    return not isinstance(e, (anthropic.BadRequestError, anthropic.UnprocessableEntityError))
+
+
+def _create(config: Config, stage: str, **kwargs) -> anthropic.types.Message:
+    """messages.create, timed as llm.<stage> and counted toward token usage.
+
+    Tries the configured model, then the fallback model. Raises the last
+    APIError, or ModelUnavailable if no call could be made. The billed
+    input tokens also recalibrate the local token estimator.
+    """
+    ac = config.anthropic
+    client = _get_client(config)
+    models = list(dict.fromkeys(m for m in (ac.model, ac.fallback_model) if m))
+    error: Exception = ModelUnavailable("all model circuits are open")
+    for model in models:
+        budget = ac.timeout_seconds
+        if (deadline := _run_deadline.get()) is not None:
+            budget = min(budget, deadline - time.monotonic())
+        if budget < MIN_CALL_SECONDS:
+            metrics.incr("llm.deadline_skips")
+            raise ModelUnavailable("run deadline reached")
+        breaker = _breaker_for(config, model)
+        if not breaker.allow():
+            continue
+        if model != ac.model:
+            log.warning("Using fallback model %s for %s", model, stage)
+            metrics.incr("llm.fallbacks")
+        # The SDK timeout is per attempt; share the call's budget between them
+        attempt_client = client.with_options(timeout=budget / (ac.max_retries + 1), max_retries=ac.max_retries)
+        healthy = None
+        try:
+            with metrics.span(f"llm.{stage}", model=model):
+                message = attempt_client.messages.create(**{**kwargs, "model": model})
+            healthy = True
+        except anthropic.APIError as e:
+            # A rejected request still means the upstream answered
+            healthy = not _counts_against_breaker(e)
+            if healthy:
+                raise
+            if isinstance(e, anthropic.NotFoundError):
+                log.warning("Anthropic model %s not found (retired or misspelled?)", model)
+            error = e
+        finally:
+            # Every call let through must settle the breaker, or a
+            # half-open trial would keep it open for good
+            if healthy is None:
+                breaker.release()
+            elif healthy:
+                breaker.success()
+            else:
+                breaker.failure()
+        if not healthy:
+            continue
+        metrics.incr("llm.calls")
+        metrics.incr("llm.input_tokens", message.usage.input_tokens)
+        metrics.incr("llm.output_tokens", message.usage.output_tokens)
+        sent = kwargs.get("system", "") + "".join(str(m.get("content", "")) for m in kwargs.get("messages", []))
+        tokens.calibrate(model, tokens.count_pieces(sent), message.usage.input_tokens)
+        return message
+    raise error
 
 
 def summarize_transcript(
@@ -51,11 +196,11 @@ def summarize_transcript(
         log.error("No Anthropic API key configured")
         return None
 
-    client = _get_client(config)
     try:
-        message = client.messages.create(
-            model=config.anthropic.model,
-            max_tokens=1024,
+        message = _create(
+            config,
+            "summarize",
+            max_tokens=SUMMARIZE_MAX_TOKENS,
             system=SUMMARIZE_SYSTEM,
             messages=[{
                 "role": "user",
@@ -63,7 +208,7 @@ def summarize_transcript(
             }],
         )
         return message.content[0].text
-    except anthropic.APIError as e:
+    except (anthropic.APIError, ModelUnavailable) as e:
         log.error("Anthropic API summarization failed: %s", e)
         return None
 
@@ -96,10 +241,10 @@ def write_promo(
         episode_url=episode_url,
     )
 
-    client = _get_client(config)
     try:
-        message = client.messages.create(
-            model=config.anthropic.model,
+        message = _create(
+            config,
+            "promo",
             max_tokens=1024,
             system=system_prompt,
             messages=[{
@@ -108,7 +253,7 @@ def write_promo(
             }],
         )
         return message.content[0].text
-    except anthropic.APIError as e:
+    except (anthropic.APIError, ModelUnavailable) as e:
         log.error("Anthropic API promo generation failed: %s", e)
         return None
 
@@ -119,10 +264,10 @@ def shorten_for_mastodon(config: Config, promo_text: str) -> str | None:
         log.error("No Anthropic API key configured")
         return None
 
-    client = _get_client(config)
     try:
-        message = client.messages.create(
-            model=config.anthropic.model,
+        message = _create(
+            config,
+            "mastodon",
             max_tokens=512,
             system=MASTODON_SYSTEM,
             messages=[{
@@ -131,6 +276,6 @@ def shorten_for_mastodon(config: Config, promo_text: str) -> str | None:
             }],
         )
         return message.content[0].text
-    except anthropic.APIError as e:
+    except (anthropic.APIError, ModelUnavailable) as e:
         log.error("Anthropic API mastodon shortening failed: %s", e)
         return None
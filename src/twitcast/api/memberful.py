@@ -2,16 +2,25 @@
 
 import json
 import logging
+from pathlib import Path
 
 import requests
 
-from twitcast.cache import read_cache, write_cache
+from twitcast import metrics, net
+from twitcast.cache import path_lock, read_cache, shared_cache_path, write_cache
 from twitcast.config import CACHE_DIR, Config
 
-MEMBERFUL_CACHE = CACHE_DIR / "memberful.json"
-
 log = logging.getLogger(__name__)
 
+# Where the count lived before caches were shared between tenants
+LEGACY_CACHE = CACHE_DIR / "memberful.json"
+
+
+def _cache_path(config: Config) -> Path:
+    # Keyed by account, so tenants on the same Memberful account share one count
+    mc = config.memberful
+    return shared_cache_path("memberful", mc.api_url, mc.api_user_id, mc.api_key)
+
 
 def fetch_memberful_count(config: Config) -> int | None:
     """Fetch active paid member count from Memberful GraphQL API.
@@ -19,8 +28,29 @@ def fetch_memberful_count(config: Config) -> int | None:
     Paginates through all members, counts those with active subscription
     and a credit card on file. Caches result to avoid frequent re-queries.
     """
+    cache_path = _cache_path(config)
+    with path_lock(cache_path):
+        _migrate_legacy_cache(cache_path)
+        return _fetch_count(config, cache_path)
+
+
+def _migrate_legacy_cache(cache_path: Path) -> None:
+    """Move a count cached by an older version to cache_path, keeping its timestamp."""
+    if cache_path.exists() or not LEGACY_CACHE.exists():
+        return
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        LEGACY_CACHE.replace(cache_path)
+        log.info("Moved cached member count from %s to %s", LEGACY_CACHE, cache_path)
+    except FileNotFoundError:
+        pass  # another tenant's account took it
+    except OSError as e:
+        log.warning("Could not move cached member count from %s: %s", LEGACY_CACHE, e)
+
+
+def _fetch_count(config: Config, cache_path: Path) -> int | None:
     refresh_hours = config.display.memberful_refresh_hours
-    cached = read_cache(MEMBERFUL_CACHE, refresh_hours)
+    cached = read_cache(cache_path, refresh_hours)
     if cached is not None:
         log.info("Using cached member count: %d", cached["count"])
         return cached["count"]
@@ -28,7 +58,7 @@ def fetch_memberful_count(config: Config) -> int | None:
     mc = config.memberful
     if not mc.api_key:
         log.warning("No Memberful API key configured")
-        return _load_fallback()
+        return _load_fallback(cache_path)
 
     url = f"{mc.api_url}?api_user_id={mc.api_user_id}"
     headers = {
@@ -51,12 +81,13 @@ def fetch_memberful_count(config: Config) -> int | None:
             + "edges { node { creditCard { brand } subscriptions { active } } } } }"
         })
         try:
-            resp = requests.post(url, headers=headers, data=query, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
+            with metrics.span("memberful.page"):
+                resp = net.session().post(url, headers=headers, data=query, timeout=30)
+                resp.raise_for_status()
+                data = resp.json()
         except requests.RequestException as e:
             log.error("Memberful API request failed on page %d: %s", page, e)
-            return _load_fallback()
+            return _load_fallback(cache_path)
 
         members = data.get("data", {}).get("members", {})
         page_info = members.get("pageInfo", {})
@@ -72,16 +103,16 @@ def fetch_memberful_count(config: Config) -> int | None:
 
         log.info("Memberful page %d: running count = %d", page, active_count)
 
-    write_cache(MEMBERFUL_CACHE, {"count": active_count})
+    write_cache(cache_path, {"count": active_count})
     log.info("Memberful total active paid members: %d", active_count)
     return active_count
 
 
-def _load_fallback() -> int | None:
+def _load_fallback(cache_path: Path) -> int | None:
     """Load last cached member count as fallback."""
-    if MEMBERFUL_CACHE.exists():
+    if cache_path.exists():
         try:
-            with open(MEMBERFUL_CACHE) as f:
+            with open(cache_path) as f:
                 data = json.load(f)
             log.info("Falling back to cached count: %d", data["count"])
             return data["count"]
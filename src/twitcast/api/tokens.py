@@ -0,0 +1,102 @@
+"""Token budgets and a local token estimator calibrated on real usage.
+
+Counting tokens exactly needs the model's tokenizer or an API round trip.
+Instead, text is split into word and punctuation pieces and multiplied by
+a tokens-per-piece factor. The factor starts at a typical value for
+English and is corrected after every call from the ``input_tokens`` the
+API reports, as an exponential moving average per model. The factors are
+kept in ``cache/token-calibration.json``, shared by all tenants since they
+describe the model, not the account.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+
+from twitcast.config import CACHE_DIR, Config
+
+log = logging.getLogger(__name__)
+
+CALIBRATION_FILE = CACHE_DIR / "token-calibration.json"
+
+PIECE_RE = re.compile(r"\w+|[^\w\s]")
+DEFAULT_TOKENS_PER_PIECE = 1.3
+# Weight of the newest observation in the moving average
+SMOOTHING = 0.2
+
+# Context windows by model name prefix; the longest matching prefix wins
+CONTEXT_WINDOWS = {
+    "claude-3-haiku": 200_000,
+    "claude-3-5-haiku": 200_000,
+    "claude-haiku-4": 200_000,
+    "claude-sonnet-4": 200_000,
+    "claude-opus-4": 200_000,
+}
+DEFAULT_CONTEXT_WINDOW = 200_000
+# Left free for the system prompt, message framing and estimator error
+PROMPT_RESERVE = 2_000
+
+_lock = threading.Lock()
+_factors: dict[str, float] | None = None
+
+
+def _load() -> dict[str, float]:
+    global _factors
+    if _factors is None:
+        try:
+            with open(CALIBRATION_FILE) as f:
+                _factors = {k: float(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            _factors = {}
+    return _factors
+
+
+def _save(factors: dict[str, float]) -> None:
+    CALIBRATION_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CALIBRATION_FILE.with_name(f".{CALIBRATION_FILE.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w") as f:
+            json.dump(factors, f, indent=2)
+        tmp.replace(CALIBRATION_FILE)
+    except OSError as e:
+        log.warning("Could not save token calibration: %s", e)
+
+
+def count_pieces(text: str) -> int:
+    return len(PIECE_RE.findall(text or ""))
+
+
+def estimate_tokens(text: str, model: str) -> int:
+    """Estimated input tokens for text sent to model."""
+    with _lock:
+        factor = _load().get(model, DEFAULT_TOKENS_PER_PIECE)
+    return round(count_pieces(text) * factor)
+
+
+def calibrate(model: str, pieces: int, actual_tokens: int) -> None:
+    """Fold one observed (pieces sent, tokens billed) pair into model's factor."""
+    if pieces < 100 or actual_tokens <= 0:
+        return
+    observed = actual_tokens / pieces
+    with _lock:
+        factors = _load()
+        old = factors.get(model)
+        factors[model] = observed if old is None else old + SMOOTHING * (observed - old)
+        _save(factors)
+
+
+def input_budget(config: Config, max_output_tokens: int) -> int:
+    """Tokens available for the user content of one call to the configured model.
+
+    ``anthropic.max_input_tokens`` (8000 by default) caps it below the
+    model's context window; 0 leaves only the window.
+    """
+    model = config.anthropic.model
+    prefix = max((p for p in CONTEXT_WINDOWS if model.startswith(p)), key=len, default="")
+    window = CONTEXT_WINDOWS.get(prefix, DEFAULT_CONTEXT_WINDOW)
+    budget = window - max_output_tokens - PROMPT_RESERVE
+    if config.anthropic.max_input_tokens:
+        budget = min(budget, config.anthropic.max_input_tokens)
+    return max(budget, 0)
@@ -1,13 +1,14 @@
 """TWiT REST API client: episodes and shows."""
 
 import logging
+from collections.abc import Iterator
 
 import requests
 
+from twitcast import metrics, net
 from twitcast.config import Config
-from twitcast.shows import extract_show_code
+from twitcast.shows import load_registry
 
-TWIT_API_URL = "https://twit.tv/api/v1.0"
 TWIT_WEB_URL = "https://twit.tv"
 
 log = logging.getLogger(__name__)
@@ -21,6 +22,17 @@ def _headers(config: Config) -> dict[str, str]:
     }
 
 
+def episode_image_url(episode: dict) -> str | None:
+    """Best artwork URL of an API episode: 720x405 thumb, plain thumbnail, then original."""
+    hero = episode.get("heroImage") or {}
+    derivatives = hero.get("derivatives") or {}
+    return (
+        derivatives.get("twit_thumb_720x405")
+        or derivatives.get("thumbnail")
+        or hero.get("url")
+    )
+
+
 def fetch_episodes(config: Config, count: int = 3) -> list[dict] | None:
     """Fetch most recent episodes from TWiT API.
 
@@ -28,33 +40,27 @@ def fetch_episodes(config: Config, count: int = 3) -> list[dict] | None:
     airing_date, image_url, episode_id.
     """
     try:
-        resp = requests.get(
-            f"{TWIT_API_URL}/episodes",
-            headers=_headers(config),
-            params={"sort": "-airingDate", "range": count},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        with metrics.span("twit.episodes"):
+            resp = net.session().get(
+                f"{config.twit.api_url}/episodes",
+                headers=_headers(config),
+                params={"sort": "-airingDate", "range": count},
+                timeout=30,
+            )
+            resp.raise_for_status()
+            data = resp.json()
     except requests.RequestException as e:
         log.error("TWiT API request failed: %s", e)
         return None
 
+    registry = load_registry(config)
     episodes = []
     for item in data.get("episodes", []):
-        hero = item.get("heroImage") or {}
-        derivatives = hero.get("derivatives") or {}
-        image_url = (
-            derivatives.get("twit_thumb_720x405")
-            or derivatives.get("thumbnail")
-            or hero.get("url")
-        )
-        show_code = extract_show_code(item.get("cleanPath", ""))
         episodes.append({
-            "show_code": show_code,
+            "show_code": registry.for_episode(item).code,
             "show_name": item.get("label", "Unknown"),
             "airing_date": item.get("airingDate"),
-            "image_url": image_url,
+            "image_url": episode_image_url(item),
             "episode_id": item.get("id"),
         })
     return episodes
@@ -69,31 +75,87 @@ def fetch_latest_episode(config: Config) -> dict | None:
 def fetch_recent_episodes(config: Config, count: int = 10) -> list[dict]:
     """Fetch the N most recent episodes with full embedded show data."""
     try:
-        resp = requests.get(
-            f"{TWIT_API_URL}/episodes",
-            headers=_headers(config),
-            params={"sort": "-airingDate", "range": count},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        with metrics.span("twit.episodes"):
+            resp = net.session().get(
+                f"{config.twit.api_url}/episodes",
+                headers=_headers(config),
+                params={"sort": "-airingDate", "range": count},
+                timeout=30,
+            )
+            resp.raise_for_status()
+            data = resp.json()
     except requests.RequestException as e:
         log.error("TWiT API request failed: %s", e)
         return []
     return data.get("episodes", [])
 
 
+def iter_episode_pages(config: Config, page_size: int = 50, start_page: int = 0) -> Iterator[tuple[int, list[dict]]]:
+    """Stream the episode catalog newest first, one API page at a time.
+
+    Yields (page number, episodes with embedded show data) and stops after
+    the last page.
+
+    Raises requests.RequestException (logged) for a failed page request, so
+    callers can tell an early stop from the end of the catalog and resume
+    from the page that failed.
+    """
+    page = start_page
+    while True:
+        try:
+            with metrics.span("twit.episodes", page=page):
+                resp = net.session().get(
+                    f"{config.twit.api_url}/episodes",
+                    headers=_headers(config),
+                    params={"sort": "-airingDate", "range": page_size, "page": page},
+                    timeout=30,
+                )
+                resp.raise_for_status()
+                data = resp.json()
+        except requests.RequestException as e:
+            log.error("TWiT API episodes page %d request failed: %s", page, e)
+            raise
+        episodes = data.get("episodes", [])
+        if not episodes:
+            return
+        yield page, episodes
+        if len(episodes) < page_size:
+            return
+        page += 1
+
+
+def fetch_episode(config: Config, episode_id: str | int) -> dict | None:
+    """Fetch a single episode by ID with full embedded show data."""
+    try:
+        with metrics.span("twit.episode"):
+            resp = net.session().get(
+                f"{config.twit.api_url}/episodes/{episode_id}",
+                headers=_headers(config),
+                timeout=30,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+    except requests.RequestException as e:
+        log.error("TWiT API episode %s request failed: %s", episode_id, e)
+        return None
+    # The single-entity endpoint may return the episode bare or wrapped
+    if "episodes" in data:
+        return (data["episodes"] or [None])[0]
+    return data or None
+
+
 def fetch_shows(config: Config) -> list[dict] | None:
     """Fetch all active shows from TWiT API."""
     try:
-        resp = requests.get(
-            f"{TWIT_API_URL}/shows",
-            headers=_headers(config),
-            params={"filter[active]": 1},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        with metrics.span("twit.shows"):
+            resp = net.session().get(
+                f"{config.twit.api_url}/shows",
+                headers=_headers(config),
+                params={"filter[active]": 1},
+                timeout=30,
+            )
+            resp.raise_for_status()
+            data = resp.json()
     except requests.RequestException as e:
         log.error("TWiT API shows request failed: %s", e)
         return None
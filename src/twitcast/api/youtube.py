@@ -1,15 +1,24 @@
-"""YouTube Data API: subscriber counts with caching."""
+"""YouTube Data API: subscriber counts with caching and history."""
 
 import json
 import logging
+import time
+from pathlib import Path
 
 import requests
 
+from twitcast import metrics, net
 from twitcast.cache import read_cache, write_cache
-from twitcast.config import CACHE_DIR, Config
+from twitcast.config import CACHE_DIR, Config, cache_dir
+from twitcast.series import Series, append_sample
 from twitcast.shows import YOUTUBE_CHANNELS
 
-YOUTUBE_CACHE = CACHE_DIR / "youtube.json"
+YOUTUBE_FILE = "youtube.json"
+# Raw subscriber count history, one series file per channel (see series.py).
+# Public data, so it lives in the root cache and is shared by all tenants.
+YOUTUBE_HISTORY_DIR = CACHE_DIR / "youtube-subs"
+# channels.list accepts at most 50 IDs per call
+MAX_IDS_PER_REQUEST = 50
 
 log = logging.getLogger(__name__)
 
@@ -17,47 +26,84 @@ log = logging.getLogger(__name__)
 def fetch_youtube_subs(config: Config) -> list[tuple[str, str]] | None:
     """Fetch YouTube subscriber counts for all configured channels.
 
-    Returns list of (label, subscriber_count_str) tuples.
+    Returns list of (label, subscriber_count_str) tuples. Each raw count is
+    also appended to the channel's history, and the string ends in an
+    up/down arrow when the count moved over the last ``trend_days``.
     """
     refresh_hours = config.display.memberful_refresh_hours
-    cached = read_cache(YOUTUBE_CACHE, refresh_hours)
+    cached = read_cache(cache_dir() / YOUTUBE_FILE, refresh_hours)
     if cached is not None:
         log.info("Using cached YouTube subs")
         return cached["subs"]
 
-    api_key = config.youtube.api_key
-    if not api_key:
+    if not config.youtube.api_key:
         log.warning("No YouTube API key configured")
         return _load_fallback()
 
-    channel_ids = ",".join(cid for _, cid in YOUTUBE_CHANNELS)
-    try:
-        resp = requests.get(
-            "https://www.googleapis.com/youtube/v3/channels",
-            params={"part": "statistics", "id": channel_ids, "key": api_key},
-            timeout=15,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-    except requests.RequestException as e:
-        log.error("YouTube API request failed: %s", e)
+    counts = _fetch_counts(config, [cid for _, cid in YOUTUBE_CHANNELS])
+    if not counts:
         return _load_fallback()
 
-    stats_by_id = {}
-    for item in data.get("items", []):
-        count = int(item["statistics"].get("subscriberCount", 0))
-        stats_by_id[item["id"]] = count
+    now = time.time()
+    for cid, count in counts.items():
+        append_sample(_series_path(cid), count, now)
 
+    trend_seconds = config.youtube.trend_days * 86400
     subs = []
     for label, cid in YOUTUBE_CHANNELS:
-        count = stats_by_id.get(cid, 0)
-        subs.append((label, _format_sub_count(count)))
-
-    write_cache(YOUTUBE_CACHE, {"subs": subs})
+        history = subscriber_history(cid)
+        latest = history.latest()
+        # A channel missing from this fetch (e.g. a failed batch) keeps its last count
+        count = counts.get(cid, latest[1] if latest else 0)
+        trend = _format_trend(history.delta(trend_seconds, now)) if trend_seconds else ""
+        subs.append((label, _format_sub_count(count) + trend))
+
+    write_cache(cache_dir() / YOUTUBE_FILE, {"subs": subs})
     log.info("YouTube subs fetched: %s", subs)
     return subs
 
 
+def _fetch_counts(config: Config, channel_ids: list[str]) -> dict[str, int]:
+    """Raw subscriber counts by channel ID, requested in batches of MAX_IDS_PER_REQUEST.
+
+    A failed batch is logged and skipped; the other batches still count.
+    """
+    counts = {}
+    for start in range(0, len(channel_ids), MAX_IDS_PER_REQUEST):
+        batch = channel_ids[start:start + MAX_IDS_PER_REQUEST]
+        try:
+            with metrics.span("youtube.channels", ids=len(batch)):
+                resp = net.session().get(
+                    f"{config.youtube.api_url}/channels",
+                    params={"part": "statistics", "id": ",".join(batch), "key": config.youtube.api_key},
+                    timeout=15,
+                )
+                resp.raise_for_status()
+                data = resp.json()
+        except requests.RequestException as e:
+            log.error("YouTube API request failed for %d channel(s): %s", len(batch), e)
+            continue
+        for item in data.get("items", []):
+            counts[item["id"]] = int(item["statistics"].get("subscriberCount", 0))
+    return counts
+
+
+def _series_path(channel_id: str) -> Path:
+    return YOUTUBE_HISTORY_DIR / f"{channel_id}.u32"
+
+
+def subscriber_history(channel_id: str) -> Series:
+    """Every raw subscriber count recorded for a channel, oldest first."""
+    return Series.load(_series_path(channel_id))
+
+
+def _format_trend(delta: int | None) -> str:
+    """Arrow for the direction of change over the trend window."""
+    if not delta:
+        return ""
+    return "\u25b2" if delta > 0 else "\u25bc"
+
+
 def _format_sub_count(count: int) -> str:
     """Format subscriber count like '22.8K' or '280K'."""
     if count >= 1_000_000:
@@ -71,9 +117,9 @@ def _format_sub_count(count: int) -> str:
 
 def _load_fallback() -> list[tuple[str, str]] | None:
     """Load last cached YouTube subs as fallback."""
-    if YOUTUBE_CACHE.exists():
+    if (cache_dir() / YOUTUBE_FILE).exists():
         try:
-            with open(YOUTUBE_CACHE) as f:
+            with open(cache_dir() / YOUTUBE_FILE) as f:
                 cached = json.load(f)
             return cached["subs"]
         except (json.JSONDecodeError, KeyError):
@@ -0,0 +1,198 @@
+"""Historical backfill: archive transcripts (and summaries) of past episodes.
+
+Streams the TWiT episode catalog newest first, one API page at a time,
+back to a given airing date. Each episode's transcript is resolved,
+optionally summarized, and saved to the transcript archive on a bounded
+worker pool. At most ``2 * workers`` episodes are in flight, so memory
+stays flat however far back the run goes.
+
+Progress is checkpointed to ``cache/backfill-state.json`` as pages finish.
+A resumed run starts at the oldest page with unfinished or failed episodes
+and skips every episode already archived, so an interrupted run over
+thousands of episodes repeats no work. A run that reaches its airing date
+with nothing failed clears the checkpoint, so the next run starts from the
+newest page again and picks up episodes aired since.
+"""
+
+import contextvars
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import requests
+
+from twitcast import metrics
+from twitcast.config import Config, cache_dir
+
+log = logging.getLogger(__name__)
+
+STATE_FILE = "backfill-state.json"
+
+
+@dataclass
+class BackfillStats:
+    pages: int = 0
+    archived: int = 0
+    no_transcript: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+def _load_state() -> dict:
+    try:
+        with open(cache_dir() / STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(state: dict) -> None:
+    path = cache_dir() / STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    tmp.replace(path)
+
+
+def _clear_state() -> None:
+    (cache_dir() / STATE_FILE).unlink(missing_ok=True)
+
+
+def _airing_date(episode: dict) -> datetime | None:
+    try:
+        aired = datetime.fromisoformat(episode.get("airingDate") or "")
+    except (TypeError, ValueError):
+        return None
+    return aired if aired.tzinfo else aired.replace(tzinfo=timezone.utc)
+
+
+def _is_done(episode_id: str, summarize: bool) -> bool:
+    from twitcast.transcript.archive import has_episode, load_episode
+
+    if not has_episode(episode_id):
+        return False
+    if not summarize:
+        return True
+    # Archived by a --no-summary run: done only if there was nothing to summarize
+    record = load_episode(episode_id) or {}
+    return bool(record.get("summary") or not record.get("transcript"))
+
+
+def run_backfill(
+    config: Config,
+    since: datetime,
+    workers: int = 4,
+    page_size: int = 50,
+    summarize: bool = True,
+    restart: bool = False,
+) -> BackfillStats:
+    """Archive every episode aired on or after since, resuming from the checkpoint."""
+    from twitcast.api.twit import iter_episode_pages
+    from twitcast.shows import load_registry
+    from twitcast.transcript.archive import archive_episode
+
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    registry = load_registry(config)
+
+    # A checkpoint only applies to the same run; pages shift with page_size
+    run_key = {"since": since.isoformat(), "page_size": page_size}
+    state = {} if restart else _load_state()
+    start_page = state.get("next_page", 0) if state.get("run") == run_key else 0
+    if start_page:
+        log.info("Resuming backfill at page %d (checkpoint from %s)", start_page, state.get("updated_at_utc"))
+
+    stats = BackfillStats()
+    inflight: dict[Future, int] = {}
+    open_pages: dict[int, int] = {}
+    first_failed: int | None = None
+    fetched_through = start_page - 1
+    checkpoint = start_page
+    complete = False
+
+    def settle(done) -> None:
+        nonlocal first_failed
+        for future in done:
+            page = inflight.pop(future)
+            open_pages[page] -= 1
+            if not open_pages[page]:
+                del open_pages[page]
+            try:
+                found = future.result()
+            except Exception as e:
+                log.warning("Backfill of an episode on page %d failed: %s", page, e)
+                stats.failed += 1
+                first_failed = page if first_failed is None else min(first_failed, page)
+                continue
+            if found:
+                stats.archived += 1
+            else:
+                stats.no_transcript += 1
+
+    def save_checkpoint() -> None:
+        nonlocal checkpoint
+        pending = [*open_pages, fetched_through + 1]
+        if first_failed is not None:
+            pending.append(first_failed)
+        if min(pending) != checkpoint:
+            checkpoint = min(pending)
+            _save_state({
+                "run": run_key,
+                "next_page": checkpoint,
+                "updated_at_utc": datetime.now(timezone.utc).isoformat(),
+            })
+
+    def queue_pages(pages) -> None:
+        """Queue each page's episodes on the pool, up to the page that reaches since."""
+        nonlocal fetched_through
+        for page, episodes in pages:
+            reached_since = False
+            for episode in episodes:
+                aired = _airing_date(episode)
+                if aired and aired < since:
+                    reached_since = True
+                    continue
+                if _is_done(str(episode.get("id")), summarize):
+                    stats.skipped += 1
+                    continue
+                while len(inflight) >= 2 * workers:
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    settle(done)
+                    save_checkpoint()
+                # Carry the tenant's cache dir into the worker thread
+                future = pool.submit(contextvars.copy_context().run, archive_episode, config, registry, episode, summarize)
+                inflight[future] = page
+                open_pages[page] = open_pages.get(page, 0) + 1
+            fetched_through = page
+            stats.pages += 1
+            log.info("Backfill page %d queued (%d archived, %d skipped so far)", page, stats.archived, stats.skipped)
+            if reached_since:
+                return
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill")
+    try:
+        with metrics.span("backfill", since=since.date().isoformat()):
+            try:
+                queue_pages(iter_episode_pages(config, page_size=page_size, start_page=start_page))
+                complete = True
+            except requests.RequestException:
+                # Already logged; the checkpoint resumes at the page that failed
+                log.warning("Backfill stopped at page %d before reaching %s", fetched_through + 1, since.date())
+                stats.failed += 1
+            done, _ = wait(inflight)
+            settle(done)
+    finally:
+        # On Ctrl-C, drop queued episodes; their pages stay open in the checkpoint
+        pool.shutdown(wait=True, cancel_futures=True)
+        settle([f for f in list(inflight) if f.done() and not f.cancelled()])
+        if complete and not stats.failed and not inflight:
+            _clear_state()
+        else:
+            save_checkpoint()
+
+    metrics.incr("backfill.archived", stats.archived)
+    return stats
@@ -0,0 +1,72 @@
+"""Circuit breaker for calls to a flaky upstream.
+
+After ``threshold`` consecutive failures the breaker opens and callers
+skip the upstream entirely for ``cooldown`` seconds. Then one trial call
+is let through: success closes the breaker, failure opens it for another
+cooldown. Whoever was let through must end the call with success(),
+failure() or release(), or the breaker stays open. Breakers are plain
+objects; whoever owns the upstream decides how they are shared (see
+anthropic_client._breaker_for).
+"""
+
+import logging
+import threading
+import time
+
+from twitcast import metrics
+
+log = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int = 3, cooldown: float = 300):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    def allow(self) -> bool:
+        """Whether a call may go out now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._trial and time.monotonic() - self._opened_at >= self.cooldown:
+                # Half-open: exactly one caller gets to try
+                self._trial = True
+                return True
+        metrics.incr("breaker.short_circuits")
+        return False
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and (self._trial or time.monotonic() - self._opened_at < self.cooldown)
+
+    def success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                log.info("%s recovered, closing circuit", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or (self._opened_at is None and self._failures >= self.threshold):
+                if self._opened_at is None:
+                    log.warning("%s failed %d times in a row, opening circuit for %gs", self.name, self._failures, self.cooldown)
+                    metrics.incr("breaker.trips")
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def release(self) -> None:
+        """End a call that says nothing about the upstream (it was cut short).
+
+        A trial call released this way lets the next caller try again.
+        """
+        with self._lock:
+            self._trial = False
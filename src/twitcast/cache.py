@@ -1,12 +1,20 @@
 """Generic JSON file cache with TTL."""
 
+import hashlib
 import json
 import logging
+import threading
 import time
 from pathlib import Path
 
+from twitcast import metrics
+from twitcast.config import CACHE_DIR
+
 log = logging.getLogger(__name__)
 
+_locks_lock = threading.Lock()
+_path_locks: dict[Path, threading.Lock] = {}
+
 
 def read_cache(path: Path, max_age_hours: float) -> dict | None:
     """Read cached JSON if it exists and is fresh enough.
@@ -14,6 +22,7 @@ def read_cache(path: Path, max_age_hours: float) -> dict | None:
     Returns the parsed dict or None if stale/missing/corrupt.
     """
     if not path.exists():
+        metrics.incr("cache.misses")
         return None
     try:
         with open(path) as f:
@@ -21,9 +30,11 @@ def read_cache(path: Path, max_age_hours: float) -> dict | None:
         hours_since = (time.time() - cached["timestamp"]) / 3600
         if hours_since < max_age_hours:
             log.info("Using cache %s (%.1fh old)", path.name, hours_since)
+            metrics.incr("cache.hits")
             return cached
     except (json.JSONDecodeError, KeyError, OSError) as e:
         log.warning("Corrupt cache %s, ignoring: %s", path.name, e)
+    metrics.incr("cache.misses")
     return None
 
 
@@ -33,3 +44,18 @@ def write_cache(path: Path, data: dict) -> None:
     payload = {**data, "timestamp": time.time()}
     with open(path, "w") as f:
         json.dump(payload, f)
+
+
+def shared_cache_path(name: str, *key: str) -> Path:
+    """Cache file shared by every tenant with the same key (API URL, credentials).
+
+    The key is hashed, so credentials never end up in file names.
+    """
+    digest = hashlib.sha256("\0".join(key).encode()).hexdigest()[:16]
+    return CACHE_DIR / "shared" / f"{name}-{digest}.json"
+
+
+def path_lock(path: Path) -> threading.Lock:
+    """Process-wide lock for path, so concurrent tenants fill a shared cache once."""
+    with _locks_lock:
+        return _path_locks.setdefault(path, threading.Lock())
@@ -1,101 +1,61 @@
-"""Click CLI: dashboard, promo, summarize, shows."""
+"""Click CLI: dashboard, promo, run, backfill, search, listen, notify, summarize, shows."""
 
-import json
 import logging
 import sys
 import time
-from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import click
 
-from twitcast.config import CACHE_DIR, load_config
+from twitcast import metrics
+from twitcast.config import PROJECT_DIR, load_config
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 log = logging.getLogger(__name__)
 
-STATE_PATH = CACHE_DIR / "transcript-promo-state.json"
-MAX_EPISODE_AGE_DAYS = 14
-MASTODON_SHOW_CODES = {"TWiT", "MBW", "WW", "SN", "IM"}
 
-
-def _load_state() -> dict:
-    if not STATE_PATH.exists():
-        return {}
-    try:
-        with open(STATE_PATH) as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return {}
-
-
-def _save_state(state: dict) -> None:
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    with open(STATE_PATH, "w") as f:
-        json.dump(state, f, indent=2)
+@click.group()
+@click.pass_context
+def main(ctx):
+    """TWiT network podcast tools."""
+    ctx.call_on_close(lambda: _export_metrics(ctx.invoked_subcommand))
 
 
-def _parse_airing_date(date_str: str | None) -> datetime | None:
-    """Parse an ISO 8601 airing date string to a timezone-aware datetime."""
-    if not date_str:
-        return None
-    try:
-        return datetime.fromisoformat(date_str)
-    except (ValueError, TypeError):
-        return None
+def _export_metrics(command: str | None) -> None:
+    """Write this invocation's metrics; runs on success, errors and sys.exit."""
+    if not command:
+        return
+    exc = sys.exc_info()[1]
+    ok = exc is None or (isinstance(exc, SystemExit) and not exc.code)
+    metrics.export(command, "ok" if ok else "error")
 
 
-@click.group()
-def main():
-    """TWiT network podcast tools."""
-    pass
+def _load_config():
+    with metrics.span("config.load"):
+        config = load_config()
+    metrics.configure(config.metrics)
+    return config
 
 
 @main.command()
 @click.option("--preview", is_flag=True, help="Save to preview.png, skip delivery")
 @click.option("--no-discord", is_flag=True, help="Skip Discord posting")
 @click.option("--no-pi", is_flag=True, help="Skip Pi push")
-def dashboard(preview, no_discord, no_pi):
+@click.option("--force", is_flag=True, help="Render and deliver even if nothing changed")
+def dashboard(preview, no_discord, no_pi, force):
     """Render and deliver the e-ink dashboard."""
-    from twitcast.api.memberful import fetch_memberful_count
-    from twitcast.api.twit import fetch_episodes
-    from twitcast.api.youtube import fetch_youtube_subs
-    from twitcast.dashboard.renderer import render_dashboard
-    from twitcast.delivery.discord import post_image
-    from twitcast.delivery.pi import push_to_pi
-
-    config = load_config()
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-
-    episodes = fetch_episodes(config)
-    if episodes:
-        for ep in episodes:
-            log.info("  %s: %s (%s)", ep["show_code"], ep["show_name"], ep["airing_date"])
-    else:
-        log.warning("Failed to fetch episodes")
-
-    member_count = fetch_memberful_count(config)
-    log.info("Club TWiT paid members: %s", member_count)
-
-    youtube_subs = fetch_youtube_subs(config)
-    if youtube_subs:
-        log.info("YouTube subs: %s", youtube_subs)
-
-    img = render_dashboard(episodes or [], member_count, youtube_subs)
-
-    project_dir = Path(__file__).parent.parent.parent
-    preview_path = project_dir / "preview.png"
-    img.save(preview_path)
-    log.info("Image saved to %s", preview_path)
-
-    if preview:
-        log.info("Preview mode — skipping delivery")
-        return
+    from twitcast.dashboard.pipeline import run_dashboard
 
-    if not no_pi:
-        push_to_pi(config, preview_path)
-    if not no_discord:
-        post_image(config, preview_path)
+    config = _load_config()
+    try:
+        results = run_dashboard(config, PROJECT_DIR, preview=preview, no_discord=no_discord, no_pi=no_pi, force=force)
+    except ValueError as e:
+        log.error("Invalid config: %s", e)
+        sys.exit(1)
+
+    for r in results:
+        latency = f"{r.seconds:7.2f}s" if r.status != "unchanged" else ""
+        click.echo(f"{r.target:<24}  {r.status:<9}  {latency}")
 
 
 @main.command()
@@ -104,110 +64,181 @@ def dashboard(preview, no_discord, no_pi):
 @click.option("--no-ai", is_flag=True, help="Use template mode instead of Haiku AI")
 @click.option("--no-discourse", is_flag=True, help="Skip Discourse posting")
 @click.option("--no-mastodon", is_flag=True, help="Skip Mastodon posting")
-def promo(dry_run, force, no_ai, no_discourse, no_mastodon):
+@click.option("--scheduled", is_flag=True, help="Only poll when the learned airing schedule says it's due")
+@click.option("--budget", "budget_minutes", type=click.FloatRange(min=0), default=None,
+              help="Wall-clock budget in minutes (default: promo.run_budget_minutes); the rest is deferred")
+def promo(dry_run, force, no_ai, no_discourse, no_mastodon, scheduled, budget_minutes):
     """Generate and post transcript promos for recent episodes."""
-    from twitcast.api.anthropic_client import shorten_for_mastodon
-    from twitcast.api.twit import fetch_recent_episodes
-    from twitcast.delivery.discord import post_text
-    from twitcast.delivery.discourse import post_topic
-    from twitcast.delivery.mastodon import post_status
-    from twitcast.promo.builder import build_ai_promo, build_template_promo
-    from twitcast.shows import extract_show_code
-
-    config = load_config()
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    state = _load_state()
-
-    # Load posted IDs, migrating from old single-ID format if needed
-    posted_ids = set(state.get("posted_episode_ids", []))
-    old_id = state.get("last_posted_episode_id")
-    if old_id:
-        posted_ids = posted_ids | {old_id}
-
-    episodes = fetch_recent_episodes(config, count=10)
-    if not episodes:
-        log.warning("No episodes returned from API")
-        return
+    from twitcast.promo.pipeline import poll_promo
+
+    config = _load_config()
+    poll_promo(
+        config,
+        dry_run=dry_run,
+        force=force,
+        no_ai=no_ai,
+        no_discourse=no_discourse,
+        no_mastodon=no_mastodon,
+        scheduled=scheduled,
+        budget_minutes=budget_minutes,
+    )
+
+
+@main.command()
+@click.option("-c", "--config", "config_paths", multiple=True, required=True,
+              type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help="Tenant config file; repeat for each tenant (named by file stem)")
+@click.option("--job", "jobs", multiple=True, type=click.Choice(["promo", "dashboard"]),
+              help="Job to run for every tenant, in order (default: promo, dashboard)")
+@click.option("--workers", type=click.IntRange(min=1), default=4, show_default=True,
+              help="Tenants served concurrently")
+@click.option("--scheduled", is_flag=True, help="Only poll promos for tenants whose schedule says it's due")
+@click.option("--dry-run", is_flag=True, help="Print promos and save dashboard previews, deliver nothing")
+def run(config_paths, jobs, workers, scheduled, dry_run):
+    """Run jobs for several configs (tenants) in one process."""
+    from twitcast.dashboard.pipeline import run_dashboard
+    from twitcast.promo.pipeline import poll_promo
+    from twitcast.tenants import TenantLogFilter, load_tenants, run_jobs
 
-    cutoff = datetime.now(timezone.utc) - timedelta(days=MAX_EPISODE_AGE_DAYS)
-    posted_count = 0
-
-    for episode in episodes:
-        episode_id = str(episode.get("id"))
-
-        if not force and episode_id in posted_ids:
-            continue
-
-        airing_date = _parse_airing_date(episode.get("airingDate"))
-        if airing_date and airing_date < cutoff:
-            continue
-
-        show = (episode.get("_embedded", {}).get("shows") or [{}])[0]
-        show_slug = (show.get("cleanPath") or "").strip("/").split("/")[-1]
-        show_label = show.get("label", "")
-        show_code = show.get("shortCode", "").strip()
-        if not show_code:
-            show_code = extract_show_code(episode.get("cleanPath", ""))
-        if show_code == "PLUSSHOWS":
-            show_code = "CLUB"
-        episode_number = episode.get("episodeNumber")
-
-        # Generate promo copy from show notes
-        promo_text = None
-        if not no_ai:
-            promo_text = build_ai_promo(config, episode)
-        if promo_text is None:
-            promo_text = build_template_promo(episode)
-
-        if dry_run:
-            click.echo(f"--- {show_label} #{episode_number} (episode {episode_id}) ---")
-            click.echo(promo_text)
-            click.echo()
-            continue
-
-        post_text(config, promo_text)
-
-        if not no_discourse:
-            post_topic(
-                config,
-                show_code=show_code,
-                episode_number=episode_number or "?",
-                show_label=show_label,
-                episode_title=episode.get("label", ""),
-                body=promo_text,
-            )
-
-        if not no_mastodon and show_code in MASTODON_SHOW_CODES:
-            mastodon_text = shorten_for_mastodon(config, promo_text) if not no_ai else None
-            post_status(config, mastodon_text or promo_text)
-
-        log.info("Posted promo for %s #%s (episode %s)", show_label, episode_number, episode_id)
-        posted_ids = posted_ids | {episode_id}
-        posted_count += 1
-
-        # Delay between posts so Discord shows them as separate messages
-        time.sleep(3)
-
-    if not dry_run:
-        _save_state({
-            "posted_episode_ids": sorted(posted_ids),
-            "updated_at_utc": datetime.now(timezone.utc).isoformat(),
-        })
-
-    if posted_count == 0:
-        log.info("No new episodes ready for promo")
+    try:
+        tenants = load_tenants(list(config_paths))
+    except ValueError as e:
+        log.error("Invalid tenants: %s", e)
+        sys.exit(1)
+    # Textfile export is process-wide; the first tenant that asks for it wins
+    metrics.configure(next((t.config.metrics for t in tenants if t.config.metrics.textfile_dir), tenants[0].config.metrics))
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(TenantLogFilter())
+
+    job_funcs = {
+        "promo": lambda t: poll_promo(t.config, dry_run=dry_run, scheduled=scheduled),
+        "dashboard": lambda t: run_dashboard(t.config, t.cache_dir, preview=dry_run),
+    }
+    results = run_jobs(tenants, [(name, job_funcs[name]) for name in jobs or ("promo", "dashboard")], workers)
+
+    for r in sorted(results, key=lambda r: (r.tenant, r.job)):
+        click.echo(f"{r.tenant:<20}  {r.job:<10}  {'ok' if r.ok else 'FAILED':<6}  {r.seconds:7.2f}s  {r.error}")
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+@main.command()
+@click.option("--since", required=True, type=click.DateTime(formats=["%Y-%m-%d"]),
+              help="Oldest airing date to backfill (YYYY-MM-DD)")
+@click.option("--workers", type=click.IntRange(min=1), default=4, show_default=True,
+              help="Episodes processed concurrently")
+@click.option("--page-size", type=click.IntRange(1, 100), default=50, show_default=True,
+              help="Episodes per TWiT API page")
+@click.option("--no-summary", is_flag=True, help="Archive transcripts without summarizing them")
+@click.option("--restart", is_flag=True, help="Ignore the checkpoint and start from the newest episode")
+def backfill(since, workers, page_size, no_summary, restart):
+    """Archive transcripts and summaries of past episodes back to a date."""
+    from twitcast.backfill import run_backfill
+    from twitcast.transcript.search import update_index
+
+    config = _load_config()
+    if not no_summary and not config.anthropic.api_key:
+        log.error("No Anthropic API key configured; use --no-summary to archive transcripts only")
+        sys.exit(1)
+
+    stats = run_backfill(
+        config, since, workers=workers, page_size=page_size, summarize=not no_summary, restart=restart
+    )
+    update_index()
+    click.echo(
+        f"{stats.pages} pages: {stats.archived} archived, {stats.no_transcript} without transcript, "
+        f"{stats.skipped} already done, {stats.failed} failed"
+    )
+    if stats.failed:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("query", nargs=-1, required=True)
+@click.option("--limit", type=click.IntRange(min=1), default=20, show_default=True)
+@click.option("--show", "show_code", help="Only episodes of this show code (e.g. SN)")
+@click.option("--raw", is_flag=True, help="Pass the query to FTS5 as is (NEAR, OR, prefix*)")
+@click.option("--rebuild", is_flag=True, help="Rebuild the index from the archive first")
+def search(query, limit, show_code, raw, rebuild):
+    """Search archived transcripts and show notes."""
+    from twitcast.transcript.search import search as search_index
+    from twitcast.transcript.search import update_index
+
+    update_index(rebuild=rebuild)
+    start = time.perf_counter()
+    hits = search_index(" ".join(query), limit=limit, show_code=show_code or "", raw=raw)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for hit in hits:
+        where = f"[{hit.timestamp}]" if hit.seconds is not None else f"({hit.kind})"
+        click.echo(f"{hit.show_code} {hit.episode_number}  {hit.airing_date[:10]}  {where}  {hit.title}")
+        click.echo(f"    {hit.snippet}")
+        click.echo(f"    {hit.url}")
+    click.echo(f"{len(hits)} hits in {elapsed_ms:.1f} ms")
+
+
+@main.command()
+@click.option("--dry-run", is_flag=True, help="Print promos without posting or updating state")
+@click.option("--no-ai", is_flag=True, help="Use template mode instead of Haiku AI")
+def listen(dry_run, no_ai):
+    """Run the webhook listener for push-triggered promos."""
+    from twitcast.api.twit import fetch_episode
+    from twitcast.promo.pipeline import run_promo
+    from twitcast.webhook import WEBHOOK_PATH, WebhookServer
+
+    config = _load_config()
+    wc = config.webhook
+    if not wc.secret:
+        log.error("No webhook secret configured (TWITCAST_WEBHOOK_SECRET)")
+        sys.exit(1)
+
+    def on_episode(episode_id: str) -> None:
+        episode = fetch_episode(config, episode_id)
+        if episode is None:
+            log.warning("Episode %s not found, leaving it to the next poll", episode_id)
+            return
+        run_promo(config, [episode], dry_run=dry_run, no_ai=no_ai)
+
+    server = WebhookServer((wc.host, wc.port), wc.secret, on_episode)
+    log.info("Listening for webhooks on http://%s:%d%s", wc.host, wc.port, WEBHOOK_PATH)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@main.command()
+@click.argument("episode_id")
+@click.option("--event", type=click.Choice(["episode.published", "transcript.published"]), default="episode.published")
+@click.option("--url", help="Listener URL (default: from [webhook] config)")
+def notify(episode_id, event, url):
+    """Send a signed test notification to the webhook listener."""
+    from twitcast.webhook import WEBHOOK_PATH, send_notification
+
+    config = _load_config()
+    wc = config.webhook
+    url = url or f"http://{wc.host}:{wc.port}{WEBHOOK_PATH}"
+    if not send_notification(url, wc.secret, episode_id, event):
+        sys.exit(1)
 
 
 @main.command()
 @click.option("--show", "show_code", help="Show short code to summarize")
 @click.option("--episode-id", "episode_id", help="Specific episode ID")
-def summarize(show_code, episode_id):
-    """Summarize the latest episode transcript using Haiku."""
+@click.option("--offline", is_flag=True, help="Use the local extractive summarizer instead of Haiku")
+def summarize(show_code, episode_id, offline):
+    """Summarize the latest episode transcript using Haiku.
+
+    Falls back to the local extractive summarizer if the API call fails.
+    """
     from twitcast.api.twit import fetch_latest_episode
+    from twitcast.transcript.extractive import summarize_extractive
     from twitcast.transcript.resolver import resolve_transcript_url
     from twitcast.transcript.summarizer import summarize_episode
 
-    config = load_config()
+    config = _load_config()
 
     episode = fetch_latest_episode(config)
     if not episode:
@@ -221,7 +252,7 @@ def summarize(show_code, episode_id):
     title = episode.get("label", "Unknown")
 
     transcript_url, transcript_html, attempted = resolve_transcript_url(
-        show_slug, show_label, episode_number
+        show_slug, show_label, episode_number, config.twit.transcript_url
     )
     if not transcript_html:
         log.error("No transcript found. Tried: %s", ", ".join(attempted))
@@ -230,10 +261,14 @@ def summarize(show_code, episode_id):
     click.echo(f"Summarizing: {show_label} #{episode_number} - {title}")
     click.echo(f"Transcript: {transcript_url}\n")
 
-    result = summarize_episode(config, transcript_html, show_label, episode_number, title)
+    result = None if offline else summarize_episode(config, transcript_html, show_label, episode_number, title)
     if result is None:
-        log.error("Summarization failed")
-        sys.exit(1)
+        if not offline:
+            log.warning("AI summarization failed, using the extractive summarizer")
+        result = summarize_extractive(transcript_html)
+        if not result["summary"]:
+            log.error("Summarization failed")
+            sys.exit(1)
 
     click.echo(f"Summary:\n{result['summary']}\n")
     if result["topics"]:
@@ -247,17 +282,19 @@ def summarize(show_code, episode_id):
 
 @main.command()
 def shows():
-    """List all active TWiT shows."""
-    from twitcast.api.twit import fetch_shows
-
-    config = load_config()
-    show_list = fetch_shows(config)
+    """Sync the show registry from the TWiT API and list it."""
+    from twitcast.shows import load_registry, sync_shows
 
-    if not show_list:
+    config = _load_config()
+    if not sync_shows(config):
         log.error("Failed to fetch shows")
         sys.exit(1)
-
-    click.echo(f"{'ID':>6}  {'Code':<12}  {'Label'}")
-    click.echo("-" * 60)
-    for s in show_list:
-        click.echo(f"{s['id']:>6}  {s['short_code']:<12}  {s['label']}")
+    registry = load_registry(config)
+
+    click.echo(f"{'ID':>6}  {'Code':<10}  {'API code':<10}  {'Forum':>5}  {'Masto':<5}  {'Label'}")
+    click.echo("-" * 78)
+    for s in sorted(registry.shows, key=lambda s: (s.id is None, s.label or s.slug)):
+        click.echo(
+            f"{s.id if s.id is not None else '-':>6}  {s.code:<10}  {s.short_code:<10}  "
+            f"{s.discourse_category or '-':>5}  {'yes' if s.mastodon else '':<5}  {s.label or s.slug}"
+        )
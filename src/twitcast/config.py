@@ -2,14 +2,39 @@
 
 import os
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from pathlib import Path
 
 import tomllib
 
 PROJECT_DIR = Path(__file__).parent.parent.parent
-CONFIG_PATH = PROJECT_DIR / "config.toml"
-CACHE_DIR = PROJECT_DIR / "cache"
+# Overridable so a run can be pointed at another config and cache
+# (e.g. the offline benchmarks in benchmarks/)
+CONFIG_PATH = Path(os.environ.get("TWITCAST_CONFIG") or PROJECT_DIR / "config.toml")
+CACHE_DIR = Path(os.environ.get("TWITCAST_CACHE_DIR") or PROJECT_DIR / "cache")
+# Per-tenant state and caches of a multi-config `twitcast run`
+TENANTS_DIR = CACHE_DIR / "tenants"
+
+_cache_dir: ContextVar[Path | None] = ContextVar("twitcast_cache_dir", default=None)
+
+
+def cache_dir() -> Path:
+    """Where state and per-credential caches go: the current tenant's
+    directory inside ``use_cache_dir``, otherwise CACHE_DIR."""
+    return _cache_dir.get() or CACHE_DIR
+
+
+@contextmanager
+def use_cache_dir(path: Path):
+    """Point cache_dir() at path for the current thread or task."""
+    path.mkdir(parents=True, exist_ok=True)
+    token = _cache_dir.set(path)
+    try:
+        yield path
+    finally:
+        _cache_dir.reset(token)
 
 
 ENV_MAP = {
@@ -23,11 +48,14 @@ ENV_MAP = {
     ("discourse", "api_key"): "DISCOURSE_API_KEY",
     ("discourse", "api_username"): "DISCOURSE_API_USERNAME",
     ("mastodon", "access_token"): "MASTODON_ACCESS_TOKEN",
+    ("webhook", "secret"): "TWITCAST_WEBHOOK_SECRET",
 }
 
 
 @dataclass(frozen=True)
 class TwitConfig:
+    api_url: str = "https://twit.tv/api/v1.0"
+    transcript_url: str = "https://twit.tv/posts/transcripts"
     app_id: str = ""
     app_key: str = ""
 
@@ -41,13 +69,29 @@ class MemberfulConfig:
 
 @dataclass(frozen=True)
 class YouTubeConfig:
+    api_url: str = "https://www.googleapis.com/youtube/v3"
     api_key: str = ""
+    # Window for the up/down arrow next to each count; 0 hides it
+    trend_days: float = 7
 
 
 @dataclass(frozen=True)
 class AnthropicConfig:
     api_key: str = ""
     model: str = "claude-haiku-4-5-20251001"
+    # Empty uses the SDK default endpoint
+    base_url: str = ""
+    # Caps summarization input below the model's context window; 0 = no cap.
+    # 8000 is about what the old 30,000-character transcript cut sent
+    max_input_tokens: int = 8000
+    # Cheaper model tried when calls to `model` fail; empty disables
+    fallback_model: str = ""
+    # Deadline for one call, SDK retries included
+    timeout_seconds: float = 60
+    max_retries: int = 2
+    # Consecutive failures that open the circuit, and how long it stays open
+    breaker_threshold: int = 3
+    breaker_cooldown_seconds: float = 300
 
 
 @dataclass(frozen=True)
@@ -56,11 +100,31 @@ class PiConfig:
     user: str = "pi"
     image_path: str = "/home/pi/dashboard.png"
     display_script: str = "/home/pi/display.py"
+    timeout: float = 60
+    control_persist: str = "10m"
+    partial_refresh: bool = False
+    partial_max_ratio: float = 0.5
+    full_refresh_every: int = 10
+    profile: str = "eink"
+    # Panel palette and dither for this display; "" uses [display], "none" sends full colour
+    palette: str = ""
+    dither: str = ""
+    # Label of a [[pi.displays]] entry (its host by default); "" for the lone [pi] host
+    name: str = ""
+    # [[pi.displays]]: one entry per panel, each inheriting the keys it doesn't set from [pi]
+    displays: tuple["PiConfig", ...] = ()
+    # Most displays pushed to at once
+    max_parallel: int = 4
 
 
 @dataclass(frozen=True)
 class DiscordConfig:
     webhook_url: str = ""
+    profile: str = "eink"
+    # "text": one message per promo; "embeds": rich embeds, batched per request
+    promo_mode: str = "text"
+    # Seconds to wait on a webhook request
+    timeout: float = 30
 
 
 @dataclass(frozen=True)
@@ -80,6 +144,30 @@ class MastodonConfig:
 @dataclass(frozen=True)
 class DisplayConfig:
     memberful_refresh_hours: float = 4
+    palette: str = ""
+    dither: str = "floyd-steinberg"
+
+
+@dataclass(frozen=True)
+class PromoConfig:
+    dense_poll_minutes: float = 5
+    sparse_poll_minutes: float = 30
+    post_delay_seconds: float = 3
+    # Wall-clock budget for one promo run; work that won't fit is deferred
+    run_budget_minutes: float = 25
+
+
+@dataclass(frozen=True)
+class WebhookConfig:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    secret: str = ""
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    # node_exporter textfile collector directory; empty writes JSON only
+    textfile_dir: str = ""
 
 
 @dataclass(frozen=True)
@@ -93,6 +181,24 @@ class Config:
     discourse: DiscourseConfig = field(default_factory=DiscourseConfig)
     mastodon: MastodonConfig = field(default_factory=MastodonConfig)
     display: DisplayConfig = field(default_factory=DisplayConfig)
+    promo: PromoConfig = field(default_factory=PromoConfig)
+    webhook: WebhookConfig = field(default_factory=WebhookConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    # [shows.<slug>] overrides for the show registry (see shows.py)
+    shows: dict[str, dict] = field(default_factory=dict)
+
+
+def _pi_config(raw: dict) -> PiConfig:
+    """[pi] and its [[pi.displays]] entries, each filled in from [pi]."""
+    fields = PiConfig.__dataclass_fields__
+    base = {k: v for k, v in raw.items() if k in fields and k != "displays"}
+    shared = {k: v for k, v in base.items() if k not in ("name", "max_parallel")}
+    displays = []
+    for entry in raw.get("displays", []):
+        display = {**shared, **{k: v for k, v in entry.items() if k in fields and k not in ("displays", "max_parallel")}}
+        display["name"] = display.get("name") or display.get("host", "")
+        displays.append(PiConfig(**display))
+    return PiConfig(**base, displays=tuple(displays))
 
 
 def load_config(config_path: Path | None = None) -> Config:
@@ -120,9 +226,13 @@ def load_config(config_path: Path | None = None) -> Config:
         memberful=MemberfulConfig(**{k: v for k, v in raw.get("memberful", {}).items() if k in MemberfulConfig.__dataclass_fields__}),
         youtube=YouTubeConfig(**{k: v for k, v in raw.get("youtube", {}).items() if k in YouTubeConfig.__dataclass_fields__}),
         anthropic=AnthropicConfig(**{k: v for k, v in raw.get("anthropic", {}).items() if k in AnthropicConfig.__dataclass_fields__}),
-        pi=PiConfig(**{k: v for k, v in raw.get("pi", {}).items() if k in PiConfig.__dataclass_fields__}),
+        pi=_pi_config(raw.get("pi", {})),
         discord=DiscordConfig(**{k: v for k, v in raw.get("discord", {}).items() if k in DiscordConfig.__dataclass_fields__}),
         discourse=DiscourseConfig(**{k: v for k, v in raw.get("discourse", {}).items() if k in DiscourseConfig.__dataclass_fields__}),
         mastodon=MastodonConfig(**{k: v for k, v in raw.get("mastodon", {}).items() if k in MastodonConfig.__dataclass_fields__}),
         display=DisplayConfig(**{k: v for k, v in raw.get("display", {}).items() if k in DisplayConfig.__dataclass_fields__}),
+        promo=PromoConfig(**{k: v for k, v in raw.get("promo", {}).items() if k in PromoConfig.__dataclass_fields__}),
+        webhook=WebhookConfig(**{k: v for k, v in raw.get("webhook", {}).items() if k in WebhookConfig.__dataclass_fields__}),
+        metrics=MetricsConfig(**{k: v for k, v in raw.get("metrics", {}).items() if k in MetricsConfig.__dataclass_fields__}),
+        shows={slug: fields for slug, fields in raw.get("shows", {}).items() if isinstance(fields, dict)},
     )
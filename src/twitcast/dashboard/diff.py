@@ -0,0 +1,58 @@
+"""Changed-region detection between dashboard frames for partial e-ink refresh."""
+
+from PIL import Image, ImageChops
+
+Rect = tuple[int, int, int, int]
+
+# Rows are scanned in bands; changes in consecutive bands merge into one rect
+BAND_HEIGHT = 16
+# E-ink controllers address the framebuffer in bytes, so keep x on 8px bounds
+X_ALIGN = 8
+MAX_REGIONS = 8
+
+
+def changed_regions(previous: Image.Image, current: Image.Image) -> list[Rect] | None:
+    """Return (x0, y0, x1, y1) rectangles where current differs from previous.
+
+    Returns [] when the frames are identical, or None when they can't be
+    compared (different sizes) and a full refresh is needed.
+    """
+    if previous.size != current.size:
+        return None
+
+    diff = ImageChops.difference(previous.convert("RGB"), current.convert("RGB"))
+    if diff.getbbox() is None:
+        return []
+
+    width, height = current.size
+    rects: list[Rect] = []
+    last_band_bottom = -1
+    for top in range(0, height, BAND_HEIGHT):
+        bottom = min(top + BAND_HEIGHT, height)
+        box = diff.crop((0, top, width, bottom)).getbbox()
+        if box is None:
+            continue
+        x0 = box[0] // X_ALIGN * X_ALIGN
+        x1 = min(width, -(-box[2] // X_ALIGN) * X_ALIGN)
+        rect = (x0, top + box[1], x1, top + box[3])
+        if rects and last_band_bottom == top:
+            rects[-1] = _union(rects[-1], rect)
+        else:
+            rects.append(rect)
+        last_band_bottom = bottom
+
+    while len(rects) > MAX_REGIONS:
+        # Merge the vertically closest neighbours
+        i = min(range(len(rects) - 1), key=lambda i: rects[i + 1][1] - rects[i][3])
+        rects[i:i + 2] = [_union(rects[i], rects[i + 1])]
+    return rects
+
+
+def changed_fraction(regions: list[Rect], size: tuple[int, int]) -> float:
+    """Fraction of the frame covered by the changed regions."""
+    area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions)
+    return area / (size[0] * size[1])
+
+
+def _union(a: Rect, b: Rect) -> Rect:
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
@@ -0,0 +1,66 @@
+"""Content fingerprints for skipping unchanged dashboard renders and pushes."""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+
+from PIL import Image
+
+from twitcast.config import cache_dir
+
+DASHBOARD_STATE_FILE = "dashboard-state.json"
+
+log = logging.getLogger(__name__)
+
+
+def fingerprint_inputs(
+    episodes: list[dict],
+    member_count: int | None,
+    youtube_subs: list[tuple[str, str]] | None,
+    looks: dict[str, tuple[str, str, str]] | None = None,
+) -> str:
+    """Hash everything the renderer draws from.
+
+    looks maps each delivery target to its (profile, palette, dither), so a
+    config change to how a target is drawn counts as changed input.
+    """
+    payload = json.dumps(
+        {"episodes": episodes, "member_count": member_count, "youtube_subs": youtube_subs, "looks": looks or {}},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def fingerprint_image(img: Image.Image) -> str:
+    """Hash the raw raster, independent of any file encoding."""
+    h = hashlib.sha256(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def load_dashboard_state() -> dict:
+    if not (cache_dir() / DASHBOARD_STATE_FILE).exists():
+        return {}
+    try:
+        with open(cache_dir() / DASHBOARD_STATE_FILE) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def save_dashboard_state(state: dict) -> None:
+    (cache_dir() / DASHBOARD_STATE_FILE).parent.mkdir(parents=True, exist_ok=True)
+    state = {**state, "updated_at_utc": datetime.now(timezone.utc).isoformat()}
+    with open(cache_dir() / DASHBOARD_STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def is_delivered(state: dict, target: str, frame_hash: str | None) -> bool:
+    """Whether a delivery target already received this frame."""
+    return frame_hash is not None and state.get("delivered", {}).get(target) == frame_hash
+
+
+def mark_delivered(state: dict, target: str, frame_hash: str) -> None:
+    state.setdefault("delivered", {})[target] = frame_hash
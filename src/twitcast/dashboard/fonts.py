@@ -1,4 +1,6 @@
-"""Font loading with fallback."""
+"""Font loading with fallback, cached for the life of the process."""
+
+from functools import lru_cache
 
 from PIL import ImageFont
 
@@ -24,16 +26,23 @@ def _try_load(paths: list[str], size: int) -> ImageFont.FreeTypeFont | None:
     return None
 
 
-def load_fonts() -> tuple:
-    """Load dashboard fonts.
+@lru_cache(maxsize=None)
+def get_font(size: int, bold: bool = True) -> ImageFont.FreeTypeFont | None:
+    """Load a DejaVu font once per (size, weight). Returns None if not installed."""
+    return _try_load(BOLD_PATHS if bold else REGULAR_PATHS, size)
+
+
+@lru_cache(maxsize=None)
+def load_fonts(scale: float = 1.0) -> tuple:
+    """Load dashboard fonts, sized for the 800x480 panel times scale.
 
     Returns (font_header, font_code, font_label, font_title, font_date).
     """
-    font_header = _try_load(BOLD_PATHS, 28)
-    font_code = _try_load(BOLD_PATHS, 22)
-    font_label = _try_load(BOLD_PATHS, 18)
-    font_title = _try_load(BOLD_PATHS, 16)
-    font_date = _try_load(REGULAR_PATHS, 16)
+    font_header = get_font(round(28 * scale))
+    font_code = get_font(round(22 * scale))
+    font_label = get_font(round(18 * scale))
+    font_title = get_font(round(16 * scale))
+    font_date = get_font(round(16 * scale), bold=False)
 
     if font_header is None:
         font_header = ImageFont.load_default()
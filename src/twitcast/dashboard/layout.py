@@ -1,6 +1,47 @@
-"""Dashboard constants and geometry helpers."""
+"""Dashboard layout profiles and geometry helpers.
 
-WIDTH = 800
-HEIGHT = 480
-NUM_TILES = 3
-ART_WIDTH = 256
+A profile describes one display target. Everything the renderer draws is
+sized from it: fixed bar heights, gaps and font sizes are given for the
+800x480 panel and multiplied by ``scale``.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LayoutProfile:
+    name: str
+    width: int
+    height: int
+    num_tiles: int = 3
+    art_width: int = 256
+    scale: float = 1.0
+
+    def px(self, base: int) -> int:
+        """Scale a size given for the 800x480 panel."""
+        return round(base * self.scale)
+
+
+PROFILES: dict[str, LayoutProfile] = {
+    # 7.5" e-ink panel on the Pi
+    "eink": LayoutProfile("eink", 800, 480),
+    # 16:9 card for Discord embeds
+    "discord": LayoutProfile("discord", 1200, 675, art_width=368, scale=1.4),
+    # 13.3" e-ink panel
+    "eink-large": LayoutProfile("eink-large", 1600, 1200, num_tiles=4, art_width=360, scale=2.2),
+}
+
+DEFAULT_PROFILE = PROFILES["eink"]
+
+WIDTH = DEFAULT_PROFILE.width
+HEIGHT = DEFAULT_PROFILE.height
+NUM_TILES = DEFAULT_PROFILE.num_tiles
+ART_WIDTH = DEFAULT_PROFILE.art_width
+
+
+def get_profile(name: str) -> LayoutProfile:
+    """Look up a profile by name. Raises ValueError if unknown."""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown layout profile {name!r}, expected one of {', '.join(PROFILES)}") from None
@@ -0,0 +1,91 @@
+"""E-ink panel palettes: quantize and dither rendered frames.
+
+All work happens inside Pillow's C routines on whole images (quantize with
+Floyd-Steinberg, or a tiled Bayer threshold added with ImageChops); there
+are no per-pixel Python loops. The result is a palette-indexed ("P") image,
+which encodes to a far smaller PNG than the full-colour RGB frame.
+"""
+
+from functools import lru_cache
+
+from PIL import Image, ImageChops
+
+# name -> (colours, ordered-dither spread). The spread is roughly the gap
+# between neighbouring palette levels, so the threshold noise can push a
+# pixel to the next level but no further.
+PALETTES: dict[str, tuple[list[tuple[int, int, int]], int]] = {
+    "mono": ([(0, 0, 0), (255, 255, 255)], 255),
+    "gray4": ([(0, 0, 0), (85, 85, 85), (170, 170, 170), (255, 255, 255)], 85),
+    # Waveshare 7-colour ACeP panels, in the controller's index order
+    "color7": (
+        [
+            (0, 0, 0),
+            (255, 255, 255),
+            (0, 255, 0),
+            (0, 0, 255),
+            (255, 0, 0),
+            (255, 255, 0),
+            (255, 128, 0),
+        ],
+        128,
+    ),
+}
+
+DITHERS = ("floyd-steinberg", "ordered", "none")
+
+BAYER_8X8 = [
+    [0, 32, 8, 40, 2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44, 4, 36, 14, 46, 6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [3, 35, 11, 43, 1, 33, 9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47, 7, 39, 13, 45, 5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21],
+]
+
+
+@lru_cache(maxsize=None)
+def _palette_image(name: str) -> Image.Image:
+    colours, _ = PALETTES[name]
+    pal = Image.new("P", (1, 1))
+    pal.putpalette([c for rgb in colours for c in rgb])
+    return pal
+
+
+@lru_cache(maxsize=8)
+def _threshold_image(size: tuple[int, int], spread: int) -> Image.Image:
+    """Bayer threshold map tiled to size, scaled to 0..spread, as RGB."""
+    tile = Image.new("L", (8, 8))
+    tile.putdata([round((v + 0.5) / 64 * spread) for row in BAYER_8X8 for v in row])
+
+    width, height = size
+    strip = Image.new("L", (width, 8))
+    for x in range(0, width, 8):
+        strip.paste(tile, (x, 0))
+    full = Image.new("L", size)
+    for y in range(0, height, 8):
+        full.paste(strip, (0, y))
+    return Image.merge("RGB", (full, full, full))
+
+
+def quantize(img: Image.Image, palette: str, dither: str = "floyd-steinberg") -> Image.Image:
+    """Reduce an image to a panel palette. Returns a "P" mode image.
+
+    Raises ValueError for an unknown palette or dither mode.
+    """
+    if palette not in PALETTES:
+        raise ValueError(f"Unknown palette {palette!r}, expected one of {', '.join(PALETTES)}")
+    if dither not in DITHERS:
+        raise ValueError(f"Unknown dither {dither!r}, expected one of {', '.join(DITHERS)}")
+
+    rgb = img.convert("RGB")
+    pal = _palette_image(palette)
+
+    if dither == "ordered":
+        _, spread = PALETTES[palette]
+        rgb = ImageChops.add(rgb, _threshold_image(rgb.size, spread), offset=-(spread // 2))
+        return rgb.quantize(palette=pal, dither=Image.Dither.NONE)
+    if dither == "floyd-steinberg":
+        return rgb.quantize(palette=pal, dither=Image.Dither.FLOYDSTEINBERG)
+    return rgb.quantize(palette=pal, dither=Image.Dither.NONE)
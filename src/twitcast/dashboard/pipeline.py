@@ -0,0 +1,253 @@
+"""Dashboard pipeline: fetch inputs, render, deliver to the Pi displays and Discord.
+
+Frames never touch the disk on the way out. Each distinct frame is encoded
+once, in memory, with PNG settings for where it goes: fast compression for
+a frame only Pi displays (on the LAN) get, full compression for anything
+uploaded to Discord. The same bytes are then handed to every delivery
+showing that frame. Deliveries run concurrently, each under its own
+timeout, at most ``pi.max_parallel`` of each kind at once. Only
+``--preview`` writes files.
+
+Each display of a ``[[pi.displays]]`` fleet is its own delivery target
+(``pi:<name>``; a lone ``[pi]`` host is just ``pi``), with its own layout
+profile and palette and its own last-delivered frame hash, so a display
+that already shows the new frame is skipped.
+"""
+
+import contextvars
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+from twitcast import metrics
+from twitcast.config import Config, PiConfig, cache_dir
+
+log = logging.getLogger(__name__)
+
+# zlib level 1 encodes about 3x faster for ~10% more bytes: worth it on the
+# LAN, not for an upload
+PNG_COMPRESS_LEVEL = {"pi": 1, "discord": 6}
+
+
+@dataclass(frozen=True)
+class DeliveryResult:
+    target: str
+    # "delivered", "unchanged" (already showed this frame) or "failed"
+    status: str
+    seconds: float = 0.0
+
+
+def _kind(target: str) -> str:
+    return target.partition(":")[0]
+
+
+def _pi_target(display: PiConfig) -> str:
+    return f"pi:{display.name}" if display.name else "pi"
+
+
+def encode_png(frame: Image.Image, targets: list[str]) -> bytes:
+    """Encode a frame once for all the targets it goes to (the smallest encoding any of them wants)."""
+    level = max(PNG_COMPRESS_LEVEL[_kind(t)] for t in targets)
+    buf = io.BytesIO()
+    frame.save(buf, "PNG", compress_level=level)
+    return buf.getvalue()
+
+
+def run_dashboard(
+    config: Config,
+    output_dir: Path,
+    preview: bool = False,
+    no_discord: bool = False,
+    no_pi: bool = False,
+    force: bool = False,
+) -> list[DeliveryResult]:
+    """Render the dashboard and deliver it where it changed.
+
+    With preview, saves the frames into output_dir instead of delivering.
+    Returns what happened to each delivery target.
+
+    Raises ValueError for an invalid layout profile, palette or display.
+    """
+    from twitcast.api.memberful import fetch_memberful_count
+    from twitcast.api.twit import fetch_episodes
+    from twitcast.api.youtube import fetch_youtube_subs
+    from twitcast.dashboard.fingerprint import (
+        fingerprint_image,
+        fingerprint_inputs,
+        is_delivered,
+        load_dashboard_state,
+        mark_delivered,
+        save_dashboard_state,
+    )
+    from twitcast.dashboard.layout import get_profile
+    from twitcast.dashboard.palette import quantize
+    from twitcast.dashboard.renderer import render_targets
+    from twitcast.delivery.discord import post_image
+    from twitcast.delivery.pi import pi_displays, push_to_pi
+
+    cache_dir().mkdir(parents=True, exist_ok=True)
+
+    displays = {_pi_target(d): d for d in pi_displays(config)}
+    display_profiles = {target: get_profile(d.profile) for target, d in displays.items()}
+    discord_profile = get_profile(config.discord.profile)
+    profiles = list({p.name: p for p in (*display_profiles.values(), discord_profile)}.values())
+
+    episodes = fetch_episodes(config, count=max(p.num_tiles for p in profiles))
+    if episodes:
+        for ep in episodes:
+            log.info("  %s: %s (%s)", ep["show_code"], ep["show_name"], ep["airing_date"])
+    else:
+        log.warning("Failed to fetch episodes")
+
+    member_count = fetch_memberful_count(config)
+    log.info("Club TWiT paid members: %s", member_count)
+
+    youtube_subs = fetch_youtube_subs(config)
+    if youtube_subs:
+        log.info("YouTube subs: %s", youtube_subs)
+
+    # How each target is drawn: (profile, palette, dither)
+    looks = {}
+    for target, d in displays.items():
+        palette = d.palette or config.display.palette
+        palette = "" if palette == "none" else palette
+        looks[target] = (display_profiles[target].name, palette, d.dither or config.display.dither)
+    # Discord shows what the (first) panel shows unless it has a profile of its own
+    first = next(iter(displays))
+    looks["discord"] = looks[first] if discord_profile == display_profiles[first] else (discord_profile.name, "", "")
+
+    state = load_dashboard_state()
+    inputs_hash = fingerprint_inputs(episodes or [], member_count, youtube_subs, looks)
+
+    targets = []
+    if not no_pi:
+        targets += [target for target, d in displays.items() if d.host]
+    if not no_discord and config.discord.webhook_url:
+        targets.append("discord")
+
+    if not (force or preview) and inputs_hash == state.get("inputs"):
+        last_frames = state.get("frames", {})
+        pending = [t for t in targets if not is_delivered(state, t, last_frames.get(t))]
+        if not pending:
+            log.info("Dashboard inputs unchanged since %s, skipping render and delivery",
+                     state.get("updated_at_utc", "last run"))
+            return [DeliveryResult(t, "unchanged") for t in targets]
+        log.info("Dashboard inputs unchanged, re-rendering to retry delivery to %s", ", ".join(pending))
+
+    with metrics.span("render", profiles=len(profiles)):
+        rendered = render_targets(episodes or [], member_count, youtube_subs, profiles)
+
+    # Displays sharing a profile and palette share one frame (and one encode)
+    frames: dict[str, Image.Image] = {}
+    panels: dict[tuple[str, str, str], Image.Image] = {}
+    for target, d in displays.items():
+        key = looks[target]
+        if key not in panels:
+            profile, palette, dither = key
+            frame = rendered[profile]
+            if palette:
+                try:
+                    with metrics.span("quantize"):
+                        frame = quantize(frame, palette, dither)
+                except ValueError as e:
+                    section = f"[[pi.displays]] {d.name}:" if d.palette or d.dither else "[display]"
+                    raise ValueError(f"{section} {e}") from e
+            panels[key] = frame
+        frames[target] = panels[key]
+    frames["discord"] = frames[first] if discord_profile == display_profiles[first] else rendered[discord_profile.name]
+
+    if preview:
+        paths = {first: output_dir / "preview.png"}
+        paths.update({t: output_dir / f"preview-{displays[t].name}.png" for t in displays if t != first})
+        paths["discord"] = output_dir / "preview-discord.png"
+        saved: set[int] = set()
+        for target, frame in frames.items():
+            if id(frame) not in saved:
+                saved.add(id(frame))
+                paths[target].write_bytes(encode_png(frame, [t for t, f in frames.items() if f is frame]))
+                log.info("Image saved to %s", paths[target])
+        log.info("Preview mode — skipping delivery")
+        return []
+
+    frame_hashes: dict[str, str] = {}
+    for frame in {id(f): f for f in frames.values()}.values():
+        digest = fingerprint_image(frame)
+        frame_hashes.update({t: digest for t, f in frames.items() if f is frame})
+    state.update(inputs=inputs_hash, frames=frame_hashes)
+
+    results = []
+    pending = []
+    for target in targets:
+        if not force and is_delivered(state, target, frame_hashes[target]):
+            log.info("%s already shows this frame, skipping", target)
+            results.append(DeliveryResult(target, "unchanged"))
+        else:
+            pending.append(target)
+
+    # One encode per distinct frame, shared by every target showing it
+    payloads: dict[str, bytes] = {}
+    with metrics.span("encode"):
+        for frame in {id(frames[t]): frames[t] for t in pending}.values():
+            png = encode_png(frame, [t for t in pending if frames[t] is frame])
+            payloads.update({t: png for t in pending if frames[t] is frame})
+
+    deliveries = {}
+    for target in pending:
+        if target == "discord":
+            deliveries[target] = lambda: post_image(config, payloads["discord"])
+        else:
+            deliveries[target] = lambda d=displays[target], t=target: push_to_pi(d, frames[t], payloads[t])
+
+    for target, (ok, seconds) in _deliver_concurrently(deliveries, config.pi.max_parallel).items():
+        if ok:
+            mark_delivered(state, target, frame_hashes[target])
+        results.append(DeliveryResult(target, "delivered" if ok else "failed", seconds))
+
+    save_dashboard_state(state)
+    return sorted(results, key=lambda r: targets.index(r.target))
+
+
+def _deliver_concurrently(deliveries: dict, max_parallel: int) -> dict[str, tuple[bool, float]]:
+    """Run the deliveries on worker threads. Returns (success, seconds) by target.
+
+    Each kind of target (Pi displays, Discord) gets its own pool of at most
+    max_parallel threads, so a fleet of slow displays never queues the
+    Discord post. Each delivery enforces its own timeout (pi.timeout,
+    discord.timeout).
+    """
+    if not deliveries:
+        return {}
+
+    def deliver(target, send) -> tuple[bool, float]:
+        start = time.monotonic()
+        with metrics.span(f"deliver.{_kind(target)}", target=target) as span:
+            try:
+                ok = bool(send())
+            except Exception:
+                log.exception("Delivery to %s failed", target)
+                ok = False
+            span.update(ok=ok)
+        return ok, time.monotonic() - start
+
+    counts: dict[str, int] = {}
+    for target in deliveries:
+        counts[_kind(target)] = counts.get(_kind(target), 0) + 1
+    with ExitStack() as stack:
+        pools = {
+            kind: stack.enter_context(
+                ThreadPoolExecutor(max_workers=min(n, max(1, max_parallel)), thread_name_prefix=f"deliver-{kind}")
+            )
+            for kind, n in counts.items()
+        }
+        # Carry the tenant's cache dir (Pi state lives there) into each thread
+        futures = {
+            target: pools[_kind(target)].submit(contextvars.copy_context().run, deliver, target, send)
+            for target, send in deliveries.items()
+        }
+        return {target: future.result() for target, future in futures.items()}
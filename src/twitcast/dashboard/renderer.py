@@ -1,38 +1,50 @@
-"""PIL 800x480 dashboard rendering."""
+"""PIL dashboard rendering for one or more layout profiles."""
 
 import logging
+import os
+import threading
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
 
-import requests
 from PIL import Image, ImageDraw
 
+from twitcast import metrics, net
 from twitcast.config import CACHE_DIR
 from twitcast.dashboard.fonts import load_fonts
-from twitcast.dashboard.layout import ART_WIDTH, HEIGHT, NUM_TILES, WIDTH
+from twitcast.dashboard.layout import ART_WIDTH, DEFAULT_PROFILE, LayoutProfile
+from twitcast.dashboard.text import draw_cached_text, text_bbox, text_width, wrap_text
 
+# Shared by all tenants of a multi-config run: album art is public
 ART_CACHE_DIR = CACHE_DIR / "art"
 
 log = logging.getLogger(__name__)
 
 
-def download_art(episode: dict) -> Image.Image | None:
-    """Download and cache album art for an episode."""
+def download_art(episode: dict, size: int = ART_WIDTH) -> Image.Image | None:
+    """Download and cache album art for an episode, fitted within size x size."""
     if not episode.get("image_url"):
         return None
 
     ART_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    cache_path = ART_CACHE_DIR / f"{episode['episode_id']}.png"
+    suffix = "" if size == ART_WIDTH else f"@{size}"
+    cache_path = ART_CACHE_DIR / f"{episode['episode_id']}{suffix}.png"
     if cache_path.exists():
-        return Image.open(cache_path)
+        metrics.incr("cache.hits")
+        with Image.open(cache_path) as cached:
+            return cached.convert("RGB")
+    metrics.incr("cache.misses")
 
     try:
-        resp = requests.get(episode["image_url"], timeout=15)
-        resp.raise_for_status()
+        with metrics.span("art.download"):
+            resp = net.session().get(episode["image_url"], timeout=15)
+            resp.raise_for_status()
         img = Image.open(BytesIO(resp.content)).convert("RGB")
-        img.thumbnail((ART_WIDTH, ART_WIDTH), Image.LANCZOS)
-        img.save(cache_path, "PNG")
+        img.thumbnail((size, size), Image.LANCZOS)
+        # Atomic, as concurrent tenants may be reading the same file
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        img.save(tmp_path, "PNG")
+        tmp_path.replace(cache_path)
         return img
     except Exception as e:
         log.error("Failed to download art for %s: %s", episode["show_code"], e)
@@ -54,26 +66,66 @@ def format_airing_date(date_str: str | None) -> str:
         return "\u2014"
 
 
+def load_artwork(episodes: list[dict], profiles: list[LayoutProfile]) -> list[Image.Image | None]:
+    """Download and decode art once, at the largest size any profile needs."""
+    num_tiles = max(p.num_tiles for p in profiles)
+    size = max(p.art_width for p in profiles)
+    return [download_art(ep, size) for ep in episodes[:num_tiles]]
+
+
+def render_targets(
+    episodes: list[dict],
+    member_count: int | None,
+    youtube_subs: list[tuple[str, str]] | None,
+    profiles: list[LayoutProfile],
+) -> dict[str, Image.Image]:
+    """Render every profile from one data fetch, sharing decoded art and fonts.
+
+    Returns {profile name: image}.
+    """
+    art_images = load_artwork(episodes, profiles) if episodes else []
+    return {
+        p.name: render_dashboard(episodes, member_count, youtube_subs, profile=p, art_images=art_images)
+        for p in profiles
+    }
+
+
+def _fit_art(art: Image.Image, size: int) -> Image.Image:
+    """Downscale shared art for a profile without touching the shared copy."""
+    if art.size[0] <= size and art.size[1] <= size:
+        return art
+    fitted = art.copy()
+    fitted.thumbnail((size, size), Image.LANCZOS)
+    return fitted
+
+
 def render_dashboard(
     episodes: list[dict],
     member_count: int | None,
     youtube_subs: list[tuple[str, str]] | None = None,
+    profile: LayoutProfile = DEFAULT_PROFILE,
+    art_images: list[Image.Image | None] | None = None,
 ) -> Image.Image:
-    """Render the dashboard as an 800x480 PIL Image."""
-    img = Image.new("RGB", (WIDTH, HEIGHT), color=(0, 0, 0))
+    """Render the dashboard as a PIL Image sized for the layout profile.
+
+    art_images, if given, is pre-decoded art per episode (see load_artwork);
+    otherwise art is downloaded for this profile alone.
+    """
+    width, height, px = profile.width, profile.height, profile.px
+    img = Image.new("RGB", (width, height), color=(0, 0, 0))
     draw = ImageDraw.Draw(img)
-    font_header, font_code, font_label, font_title, font_date = load_fonts()
+    font_header, font_code, font_label, font_title, font_date = load_fonts(profile.scale)
 
     # --- Header bar ---
-    header_h = 60
-    draw.rectangle([(0, 0), (WIDTH, header_h)], fill=(47, 110, 145))
+    header_h = px(60)
+    draw.rectangle([(0, 0), (width, header_h)], fill=(47, 110, 145))
     count_str = f"{member_count:,}" if member_count is not None else "\u2014"
     header_text = f"CLUB TWiT PAID MEMBERS: {count_str}"
-    bbox = draw.textbbox((0, 0), header_text, font=font_header)
+    bbox = text_bbox(font_header, header_text)
     text_w = bbox[2] - bbox[0]
     text_h = bbox[3] - bbox[1]
     draw.text(
-        ((WIDTH - text_w) // 2, (header_h - text_h) // 2),
+        ((width - text_w) // 2, (header_h - text_h) // 2),
         header_text,
         fill=(255, 255, 255),
         font=font_header,
@@ -85,49 +137,56 @@ def render_dashboard(
     if youtube_subs:
         mid = (len(youtube_subs) + 1) // 2
         footer_lines = [youtube_subs[:mid], youtube_subs[mid:]]
-        banner_h = 28
-        line_h = 24
-        footer_h = banner_h + len(footer_lines) * line_h + 10
+        banner_h = px(28)
+        line_h = px(24)
+        footer_h = banner_h + len(footer_lines) * line_h + px(10)
 
     # --- Episode tiles ---
     if not episodes and member_count is None:
-        _draw_centered(draw, "No data yet \u2014 check network & config", font_label, (180, 180, 180))
+        _draw_centered(draw, profile, "No data yet \u2014 check network & config", font_label, (180, 180, 180))
         return img
 
     if not episodes:
-        _draw_centered(draw, "No episode data available", font_label, (180, 180, 180))
+        _draw_centered(draw, profile, "No episode data available", font_label, (180, 180, 180))
         return img
 
-    tile_w = ART_WIDTH
-    gutter = (WIDTH - tile_w * NUM_TILES) // (NUM_TILES + 1)
+    num_tiles = profile.num_tiles
+    tile_w = profile.art_width
+    gutter = (width - tile_w * num_tiles) // (num_tiles + 1)
 
-    art_images = [download_art(ep) for ep in episodes[:NUM_TILES]]
-    max_art_h = max((a.size[1] if a else 0) for a in art_images) or 140
+    if art_images is None:
+        art_images = [download_art(ep, tile_w) for ep in episodes[:num_tiles]]
+    art_images = [_fit_art(a, tile_w) if a else None for a in art_images[:num_tiles]]
+    max_art_h = max((a.size[1] if a else 0) for a in art_images) or px(140)
 
-    just_posted_h = 28
-    title_line_h = 16
-    tile_block_h = just_posted_h + 8 + max_art_h + 6 + title_line_h * 2 + 4 + 26 + 6 + 20
-    available_h = HEIGHT - header_h - footer_h
+    just_posted_h = px(28)
+    title_line_h = px(16)
+    code_h = px(26)
+    tile_block_h = (
+        just_posted_h + px(8) + max_art_h + px(6) + title_line_h * 2 + px(4) + code_h + px(6) + px(20)
+    )
+    available_h = height - header_h - footer_h
     block_y = header_h + (available_h - tile_block_h) // 2
 
     # --- "Just Posted" bar ---
-    draw.rectangle([(0, block_y), (WIDTH, block_y + just_posted_h)], fill=(255, 255, 255))
+    draw.rectangle([(0, block_y), (width, block_y + just_posted_h)], fill=(255, 255, 255))
     jp_text = "Just Posted"
-    bbox = draw.textbbox((0, 0), jp_text, font=font_label)
+    bbox = text_bbox(font_label, jp_text)
     jp_w = bbox[2] - bbox[0]
     jp_h = bbox[3] - bbox[1]
-    draw.text(
-        ((WIDTH - jp_w) // 2, block_y + (just_posted_h - jp_h) // 2),
+    draw_cached_text(
+        img,
+        ((width - jp_w) // 2, block_y + (just_posted_h - jp_h) // 2),
         jp_text,
-        fill=(0, 0, 0),
-        font=font_label,
+        font_label,
+        (0, 0, 0),
     )
 
-    art_y = block_y + just_posted_h + 8
+    art_y = block_y + just_posted_h + px(8)
 
-    for i, ep in enumerate(episodes[:NUM_TILES]):
+    for i, ep in enumerate(episodes[:num_tiles]):
         tile_x = gutter + i * (tile_w + gutter)
-        art = art_images[i]
+        art = art_images[i] if i < len(art_images) else None
 
         if art:
             art_x = tile_x + (tile_w - art.size[0]) // 2
@@ -140,11 +199,10 @@ def render_dashboard(
             )
 
         # Episode title in quotes (up to 2 lines)
-        title_y = art_y + max_art_h + 6
+        title_y = art_y + max_art_h + px(6)
         raw_title = ep["show_name"]
         title_text = f'"{raw_title}"'
-        bbox = draw.textbbox((0, 0), title_text, font=font_title)
-        tw = bbox[2] - bbox[0]
+        tw = text_width(font_title, title_text)
         if tw <= tile_w:
             draw.text(
                 (tile_x + (tile_w - tw) // 2, title_y),
@@ -153,17 +211,9 @@ def render_dashboard(
                 font=font_title,
             )
         else:
-            words = raw_title.split()
-            best_split = len(words) // 2 or 1
-            line1 = " ".join(words[:best_split])
-            line2 = " ".join(words[best_split:])
-            for line_idx, line in enumerate([f'"{line1}', f'{line2}"']):
-                bbox = draw.textbbox((0, 0), line, font=font_title)
-                lw = bbox[2] - bbox[0]
-                while lw > tile_w and len(line) > 4:
-                    line = line[:-2] + "\u2026"
-                    bbox = draw.textbbox((0, 0), line, font=font_title)
-                    lw = bbox[2] - bbox[0]
+            lines = wrap_text(title_text, font_title, tile_w, max_lines=2)
+            for line_idx, line in enumerate(lines):
+                lw = text_width(font_title, line)
                 draw.text(
                     (tile_x + (tile_w - lw) // 2, title_y + line_idx * title_line_h),
                     line,
@@ -172,22 +222,21 @@ def render_dashboard(
                 )
 
         # Show code
-        label_y = title_y + title_line_h * 2 + 4
+        label_y = title_y + title_line_h * 2 + px(4)
         code = ep["show_code"].upper()
-        bbox = draw.textbbox((0, 0), code, font=font_code)
-        cw = bbox[2] - bbox[0]
-        draw.text(
+        cw = text_width(font_code, code)
+        draw_cached_text(
+            img,
             (tile_x + (tile_w - cw) // 2, label_y),
             code,
-            fill=(255, 255, 255),
-            font=font_code,
+            font_code,
+            (255, 255, 255),
         )
 
         # Airing date
-        date_y = label_y + 26 + 6
+        date_y = label_y + code_h + px(6)
         date_str = format_airing_date(ep.get("airing_date"))
-        bbox = draw.textbbox((0, 0), date_str, font=font_date)
-        dw = bbox[2] - bbox[0]
+        dw = text_width(font_date, date_str)
         draw.text(
             (tile_x + (tile_w - dw) // 2, date_y),
             date_str,
@@ -197,30 +246,28 @@ def render_dashboard(
 
     # --- YouTube subscriber footer ---
     if youtube_subs and footer_h:
-        banner_h = 28
-        line_h = 24
-        y = HEIGHT - footer_h
+        y = height - footer_h
 
-        draw.rectangle([(0, y), (WIDTH, y + banner_h)], fill=(180, 30, 30))
+        draw.rectangle([(0, y), (width, y + banner_h)], fill=(180, 30, 30))
         banner_text = "YouTube Subscriber Counts"
-        bbox = draw.textbbox((0, 0), banner_text, font=font_label)
+        bbox = text_bbox(font_label, banner_text)
         bw = bbox[2] - bbox[0]
         bh = bbox[3] - bbox[1]
-        draw.text(
-            ((WIDTH - bw) // 2, y + (banner_h - bh) // 2 - bbox[1]),
+        draw_cached_text(
+            img,
+            ((width - bw) // 2, y + (banner_h - bh) // 2 - bbox[1]),
             banner_text,
-            fill=(255, 255, 255),
-            font=font_label,
+            font_label,
+            (255, 255, 255),
         )
-        y += banner_h + 5
+        y += banner_h + px(5)
 
         separator = "  \u00b7  "
         for line_subs in footer_lines:
             line_text = separator.join(f"{label} {count}" for label, count in line_subs)
-            bbox = draw.textbbox((0, 0), line_text, font=font_label)
-            lw = bbox[2] - bbox[0]
+            lw = text_width(font_label, line_text)
             draw.text(
-                ((WIDTH - lw) // 2, y),
+                ((width - lw) // 2, y),
                 line_text,
                 fill=(200, 200, 200),
                 font=font_label,
@@ -230,12 +277,11 @@ def render_dashboard(
     return img
 
 
-def _draw_centered(draw: ImageDraw.ImageDraw, text: str, font, fill) -> None:
+def _draw_centered(draw: ImageDraw.ImageDraw, profile: LayoutProfile, text: str, font, fill) -> None:
     """Draw centered text on the dashboard."""
-    bbox = draw.textbbox((0, 0), text, font=font)
-    ew = bbox[2] - bbox[0]
+    ew = text_width(font, text)
     draw.text(
-        ((WIDTH - ew) // 2, HEIGHT // 2),
+        ((profile.width - ew) // 2, profile.height // 2),
         text,
         fill=fill,
         font=font,
@@ -0,0 +1,92 @@
+"""Text measurement, fitting and cached glyph bitmaps for dashboard rendering.
+
+Fonts come from the process-wide cache in fonts.py, so a font object can be
+used as a cache key: the same (font, text) pair is only measured or
+rasterized once per process.
+"""
+
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+ELLIPSIS = "…"
+# Shortest prefix kept when truncating, matching the old trim loop
+MIN_PREFIX = 3
+
+Font = ImageFont.FreeTypeFont | ImageFont.ImageFont
+
+
+@lru_cache(maxsize=4096)
+def text_bbox(font: Font, text: str) -> tuple[int, int, int, int]:
+    """Bounding box of text drawn at (0, 0), same as ImageDraw.textbbox."""
+    return tuple(int(v) for v in font.getbbox(text))
+
+
+def text_width(font: Font, text: str) -> int:
+    bbox = text_bbox(font, text)
+    return bbox[2] - bbox[0]
+
+
+def fit_text(text: str, font: Font, max_width: int) -> str:
+    """Truncate text with an ellipsis so it fits max_width.
+
+    Binary-searches the longest prefix that fits instead of trimming one
+    character at a time.
+    """
+    if text_width(font, text) <= max_width:
+        return text
+    lo, hi = MIN_PREFIX, len(text) - 2
+    if hi < lo:
+        return text
+    if text_width(font, text[:lo] + ELLIPSIS) > max_width:
+        return text[:lo] + ELLIPSIS
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if text_width(font, text[:mid] + ELLIPSIS) <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + ELLIPSIS
+
+
+def wrap_text(text: str, font: Font, max_width: int, max_lines: int = 2) -> list[str]:
+    """Greedy word wrap, binary-searching how many words fit on each line.
+
+    The last line takes whatever is left and is truncated to fit.
+    """
+    words = text.split()
+    lines = []
+    while words and len(lines) < max_lines - 1:
+        lo, hi = 1, len(words)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if text_width(font, " ".join(words[:mid])) <= max_width:
+                lo = mid
+            else:
+                hi = mid - 1
+        lines.append(fit_text(" ".join(words[:lo]), font, max_width))
+        words = words[lo:]
+    if words:
+        lines.append(fit_text(" ".join(words), font, max_width))
+    return lines
+
+
+@lru_cache(maxsize=256)
+def text_bitmap(font: Font, text: str) -> tuple[Image.Image, tuple[int, int]]:
+    """Pre-rasterized coverage mask for text, plus its offset from the draw origin.
+
+    Meant for strings that repeat across renders (show codes, banners).
+    Glyphs can overhang the origin (e.g. the hook of a "J"), so the mask is
+    padded and the offset says where its top-left goes relative to xy.
+    """
+    left, top, right, bottom = text_bbox(font, text)
+    ox, oy = min(left, 0), min(top, 0)
+    mask = Image.new("L", (max(1, right - ox), max(1, bottom - oy)))
+    ImageDraw.Draw(mask).text((-ox, -oy), text, fill=255, font=font)
+    return mask, (ox, oy)
+
+
+def draw_cached_text(img: Image.Image, xy: tuple[int, int], text: str, font: Font, fill) -> None:
+    """Draw text from its cached bitmap; equivalent to ImageDraw.text at xy."""
+    mask, (ox, oy) = text_bitmap(font, text)
+    img.paste(fill, (int(xy[0]) + ox, int(xy[1]) + oy), mask)
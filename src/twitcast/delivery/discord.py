@@ -1,31 +1,45 @@
-"""Discord webhook: image and text posting."""
+"""Discord webhook: image, text and embed posting.
+
+Promos go out either as one plain-text message each, or (``discord.promo_mode
+= "embeds"``) as rich embeds, several episodes per webhook request. Embed
+text is split at the description and field limits rather than truncated.
+"""
 
 import logging
-from pathlib import Path
 
 import requests
 
+from twitcast import net
 from twitcast.config import Config
 
 log = logging.getLogger(__name__)
 
+# Webhook embed limits, in characters except where noted
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_MESSAGE_EMBED_CHARS = 6000
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_VALUE_LIMIT = 1024
+MAX_FIELDS = 25
+# Discord requires a field name; a zero-width space shows nothing
+CONTINUED = "\u200b"
+
 
-def post_image(config: Config, image_path: Path) -> bool:
-    """Post rendered dashboard image to Discord via webhook."""
+def post_image(config: Config, png: bytes) -> bool:
+    """Post an encoded dashboard image to Discord via webhook."""
     webhook_url = config.discord.webhook_url
     if not webhook_url:
         log.info("No Discord webhook_url configured, skipping")
         return False
 
     try:
-        with open(image_path, "rb") as f:
-            resp = requests.post(
-                webhook_url,
-                files={"file": ("dashboard.png", f, "image/png")},
-                timeout=30,
-            )
-            resp.raise_for_status()
-        log.info("Image posted to Discord webhook")
+        resp = net.session().post(
+            webhook_url,
+            files={"file": ("dashboard.png", png, "image/png")},
+            timeout=config.discord.timeout,
+        )
+        resp.raise_for_status()
+        log.info("Image posted to Discord webhook (%d KB)", len(png) // 1024)
         return True
     except requests.RequestException as e:
         log.warning("Discord webhook failed: %s", e)
@@ -44,10 +58,102 @@ def post_text(config: Config, content: str) -> bool:
         content = content[:1987] + "..."
 
     try:
-        resp = requests.post(webhook_url, json={"content": content}, timeout=30)
+        resp = net.session().post(webhook_url, json={"content": content}, timeout=config.discord.timeout)
         resp.raise_for_status()
         log.info("Text posted to Discord webhook")
         return True
     except requests.RequestException as e:
         log.warning("Discord webhook text post failed: %s", e)
         return False
+
+
+def _split_text(text: str, limit: int) -> list[str]:
+    """Chunks of at most limit chars, cut at paragraph, line or word ends where possible."""
+    chunks = []
+    text = text.strip()
+    while len(text) > limit:
+        window = text[:limit + 1]
+        cut = max(window.rfind("\n\n"), window.rfind("\n"))
+        if cut <= limit // 2:
+            cut = window.rfind(" ")
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def _embed_chars(embed: dict) -> int:
+    return len(embed.get("title", "")) + len(embed.get("description", "")) + sum(
+        len(f["name"]) + len(f["value"]) for f in embed.get("fields", [])
+    )
+
+
+def promo_embed(title: str, url: str, text: str, thumbnail_url: str | None = None, timestamp: str | None = None) -> dict:
+    """One promo as an embed: the text fills the description, then continuation fields."""
+    if len(title) > TITLE_LIMIT:
+        title = title[:TITLE_LIMIT - 1] + "…"
+    embed: dict = {"title": title, "url": url}
+    # Keep the whole embed under the per-message total so it can always be sent
+    room = MAX_MESSAGE_EMBED_CHARS - len(title)
+    text = text.strip()
+    description = _split_text(text, DESCRIPTION_LIMIT)[0] if text else ""
+    rest = text[len(description):].lstrip()
+    embed["description"] = description
+    room -= len(description)
+    fields = []
+    for chunk in _split_text(rest, FIELD_VALUE_LIMIT) if rest else []:
+        if len(fields) >= MAX_FIELDS or room < len(CONTINUED) + 2:
+            log.warning("Promo %r exceeds the embed limits, dropping the rest", title)
+            break
+        if len(chunk) > room - len(CONTINUED):
+            chunk = chunk[:room - len(CONTINUED) - 1] + "…"
+        fields.append({"name": CONTINUED, "value": chunk})
+        room -= len(CONTINUED) + len(chunk)
+    if fields:
+        embed["fields"] = fields
+    if thumbnail_url:
+        embed["thumbnail"] = {"url": thumbnail_url}
+    if timestamp:
+        embed["timestamp"] = timestamp
+    return embed
+
+
+def _batches(embeds: list[dict]) -> list[list[dict]]:
+    """Group embeds into messages under the per-message count and size limits."""
+    batches: list[list[dict]] = []
+    size = 0
+    for embed in embeds:
+        chars = _embed_chars(embed)
+        if not batches or len(batches[-1]) >= MAX_EMBEDS_PER_MESSAGE or size + chars > MAX_MESSAGE_EMBED_CHARS:
+            batches.append([])
+            size = 0
+        batches[-1].append(embed)
+        size += chars
+    return batches
+
+
+def post_embeds(config: Config, embeds: list[dict]) -> list[bool]:
+    """Post embeds via webhook, as few messages as the limits allow.
+
+    Returns whether each embed was delivered, in order. With no webhook
+    configured there is nothing to deliver to, and all count as delivered.
+    """
+    webhook_url = config.discord.webhook_url
+    if not webhook_url:
+        log.info("No Discord webhook_url configured, skipping")
+        return [True] * len(embeds)
+
+    delivered: list[bool] = []
+    for batch in _batches(embeds):
+        try:
+            resp = net.session().post(webhook_url, json={"embeds": batch}, timeout=config.discord.timeout)
+            resp.raise_for_status()
+            delivered += [True] * len(batch)
+        except requests.RequestException as e:
+            log.warning("Discord webhook embed post failed (%d embeds): %s", len(batch), e)
+            delivered += [False] * len(batch)
+    log.info("Posted %d of %d embeds to Discord webhook", sum(delivered), len(embeds))
+    return delivered
@@ -1,51 +1,218 @@
-"""Discourse API: create topics on twit.community."""
+"""Discourse API: create topics on twit.community.
 
+Two local indexes keep posting cheap and idempotent:
+
+- Categories from /categories.json, cached for a day, so a show without a
+  configured subcategory is matched by name instead of landing in the
+  parent "TWiT Shows" category.
+- Recent topics from /latest.json (refreshed at most every
+  TOPICS_REFRESH_MINUTES) plus every topic we create, so a re-run after a
+  crash finds the existing topic locally instead of posting a duplicate.
+  A topic matches on its exact title, or on the episode ("SN 1000") if it
+  is in the show's category or was created by our API user; a member's
+  "SN 1000: question about..." thread elsewhere doesn't count.
+"""
+
+import json
 import logging
+import re
+import time
 
 import requests
 
-from twitcast.config import Config
+from twitcast import metrics, net
+from twitcast.cache import read_cache, write_cache
+from twitcast.config import Config, cache_dir
 
 log = logging.getLogger(__name__)
 
-# Discourse subcategory IDs under "TWiT Shows" (parent_category_id=5)
-SHOW_CATEGORY_IDS = {
-    "This Week In Tech": 13,
-    "This Week in Tech": 13,
-    "MacBreak Weekly": 14,
-    "iOS Today": 15,
-    "Security Now": 16,
-    "Windows Weekly": 17,
-    "Hands-On Tech": 22,
-    "Tech News Weekly": 32,
-    "This Week in Space": 80,
-    "Hands-On Windows": 81,
-    "Home Theater Geeks": 84,
-    "Untitled Linux Show": 85,
-    "Intelligent Machines": 89,
-    "Hands-On Apple": 90,
-}
-
-# Fallback: parent "TWiT Shows" category
+# Fallback when a show has no subcategory: parent "TWiT Shows" category
 TWIT_SHOWS_CATEGORY_ID = 5
 
+CATEGORIES_FILE = "discourse-categories.json"
+CATEGORIES_REFRESH_HOURS = 24
+TOPICS_FILE = "discourse-topics.json"
+TOPICS_REFRESH_MINUTES = 30
+# Forget topics older than this; promos only go out for recent episodes
+TOPICS_KEEP_DAYS = 60
+
+
+def _headers(config: Config) -> dict[str, str]:
+    dc = config.discourse
+    return {
+        "Api-Key": dc.api_key,
+        "Api-Username": dc.api_username,
+        "Content-Type": "application/json",
+    }
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip().casefold()
+
+
+def _episode_key(title: str) -> str:
+    """'SN 1000: Title' -> 'sn 1000', so a retitled episode still matches."""
+    head, sep, _ = title.partition(":")
+    return _normalize(head) if sep else ""
+
+
+# --- Categories ---
+
+def _fetch_categories(config: Config) -> list[dict] | None:
+    try:
+        with metrics.span("discourse.categories"):
+            resp = net.session().get(
+                f"{config.discourse.base_url}/categories.json",
+                headers=_headers(config),
+                params={"include_subcategories": "true"},
+                timeout=30,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+    except requests.RequestException as e:
+        log.warning("Discourse categories request failed: %s", e)
+        return None
+
+    categories = []
+    for cat in data.get("category_list", {}).get("categories", []):
+        for item in [cat, *cat.get("subcategory_list", [])]:
+            categories.append({
+                "id": item.get("id"),
+                "name": item.get("name", ""),
+                "slug": item.get("slug", ""),
+                "parent": item.get("parent_category_id"),
+            })
+    return categories
+
+
+def _load_categories(config: Config) -> list[dict]:
+    cached = read_cache(cache_dir() / CATEGORIES_FILE, CATEGORIES_REFRESH_HOURS)
+    if cached is not None:
+        return cached["categories"]
+    categories = _fetch_categories(config)
+    if categories:
+        write_cache(cache_dir() / CATEGORIES_FILE, {"categories": categories})
+        return categories
+    # Stale is better than nothing while Discourse is unreachable
+    try:
+        with open(cache_dir() / CATEGORIES_FILE) as f:
+            return json.load(f)["categories"]
+    except (OSError, json.JSONDecodeError, KeyError):
+        return []
+
+
+def find_category(config: Config, *names: str) -> int | None:
+    """Category ID whose name or slug matches one of names.
+
+    Subcategories of "TWiT Shows" win over same-named categories elsewhere.
+    """
+    wanted = {_normalize(n) for n in names if n}
+    if not wanted:
+        return None
+    matches = [
+        c for c in _load_categories(config)
+        if _normalize(c["name"]) in wanted or _normalize(c["slug"]) in wanted
+    ]
+    matches.sort(key=lambda c: c["parent"] != TWIT_SHOWS_CATEGORY_ID)
+    return matches[0]["id"] if matches else None
+
+
+# --- Recent topics ---
+
+def _load_topics() -> dict:
+    try:
+        with open(cache_dir() / TOPICS_FILE) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"topics": {}, "refreshed_at": 0}
+
+
+def _save_topics(index: dict) -> None:
+    cutoff = time.time() - TOPICS_KEEP_DAYS * 86400
+    index["topics"] = {tid: t for tid, t in index["topics"].items() if t.get("seen_at", 0) >= cutoff}
+    (cache_dir() / TOPICS_FILE).parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir() / TOPICS_FILE, "w") as f:
+        json.dump(index, f)
+
+
+def _remember(index: dict, topic_id, title: str, category_id: int | None = None, author: str = "") -> None:
+    index["topics"][str(topic_id)] = {
+        "title": title,
+        "category_id": category_id,
+        "author": author,
+        "seen_at": time.time(),
+    }
+
+
+def _original_poster(topic: dict, usernames: dict) -> str:
+    for poster in topic.get("posters", []):
+        if "Original Poster" in (poster.get("description") or ""):
+            return usernames.get(poster.get("user_id"), "")
+    return ""
+
+
+def _refresh_topics(config: Config, index: dict, force: bool = False) -> None:
+    """Merge the latest topics into the index if it's older than TOPICS_REFRESH_MINUTES (or force)."""
+    if not force and time.time() - index.get("refreshed_at", 0) < TOPICS_REFRESH_MINUTES * 60:
+        metrics.incr("cache.hits")
+        return
+    metrics.incr("cache.misses")
+    try:
+        with metrics.span("discourse.latest"):
+            resp = net.session().get(f"{config.discourse.base_url}/latest.json", headers=_headers(config), timeout=30)
+            resp.raise_for_status()
+            data = resp.json()
+    except requests.RequestException as e:
+        log.warning("Discourse latest topics request failed, using local index: %s", e)
+        return
+    usernames = {u.get("id"): u.get("username", "") for u in data.get("users", [])}
+    for topic in data.get("topic_list", {}).get("topics", []):
+        if topic.get("id") and topic.get("title"):
+            _remember(index, topic["id"], topic["title"], topic.get("category_id"), _original_poster(topic, usernames))
+    index["refreshed_at"] = time.time()
+    _save_topics(index)
+
+
+def find_topic(config: Config, title: str, category_id: int | None = None, refresh: bool = False) -> int | None:
+    """ID of a recent topic with this title, or for the same episode.
+
+    Only topics in category_id or created by the configured API user match
+    on the episode alone; anyone else's topic needs the exact title. With
+    refresh, re-reads /latest.json even if the index is fresh.
+    """
+    index = _load_topics()
+    _refresh_topics(config, index, force=refresh)
+    title_norm, key = _normalize(title), _episode_key(title)
+    ours = _normalize(config.discourse.api_username)
+    for topic_id, topic in index["topics"].items():
+        if _normalize(topic["title"]) == title_norm:
+            return int(topic_id)
+        official = (category_id is not None and topic.get("category_id") == category_id) or (
+            ours and _normalize(topic.get("author", "")) == ours
+        )
+        if key and official and _episode_key(topic["title"]) == key:
+            return int(topic_id)
+    return None
+
 
 def post_topic(
     config: Config,
     show_code: str,
     episode_number: str | int,
-    show_label: str,
     episode_title: str,
     body: str,
     category_id: int | None = None,
+    show_label: str = "",
 ) -> dict | None:
-    """Create a new Discourse topic.
+    """Create a new Discourse topic, unless one for this episode already exists.
 
     Title format: "{show_code} {episode_number}: {episode_title}"
-    Category: show-specific subcategory under TWiT Shows, or TWiT Shows parent.
+    Category: category_id, else the category named like show_label, else
+    the TWiT Shows parent.
     Tag: "episode"
 
-    Returns the API response dict on success, None on failure.
+    Returns the API response dict on success ({"topic_id": ..., "duplicate":
+    True} if the topic already existed), None on failure.
     """
     dc = config.discourse
     if not dc.api_key or not dc.api_username:
@@ -55,7 +222,12 @@ def post_topic(
     title = f"{show_code} {episode_number}: {episode_title}"
 
     if category_id is None:
-        category_id = SHOW_CATEGORY_IDS.get(show_label, TWIT_SHOWS_CATEGORY_ID)
+        category_id = find_category(config, show_label) or TWIT_SHOWS_CATEGORY_ID
+
+    existing = find_topic(config, title, category_id)
+    if existing is not None:
+        log.info("Discourse topic already exists for %r: %s/t/%s", title, dc.base_url, existing)
+        return {"topic_id": existing, "duplicate": True}
 
     payload = {
         "title": title,
@@ -64,24 +236,29 @@ def post_topic(
         "tags": ["episode"],
     }
 
-    headers = {
-        "Api-Key": dc.api_key,
-        "Api-Username": dc.api_username,
-        "Content-Type": "application/json",
-    }
-
     try:
-        resp = requests.post(
+        resp = net.session().post(
             f"{dc.base_url}/posts.json",
-            headers=headers,
+            headers=_headers(config),
             json=payload,
             timeout=30,
         )
+        if resp.status_code == 422 and "already been used" in resp.text:
+            # Posted before our index knew about it (e.g. by hand)
+            existing = find_topic(config, title, category_id, refresh=True)
+            log.info("Discourse rejected %r as a duplicate title, treating as posted: %s/t/%s",
+                     title, dc.base_url, existing)
+            return {"topic_id": existing, "duplicate": True}
         resp.raise_for_status()
         data = resp.json()
-        topic_id = data.get("topic_id")
-        log.info("Discourse topic created: %s/t/%s", dc.base_url, topic_id)
-        return data
     except requests.RequestException as e:
         log.warning("Discourse API post failed: %s", e)
         return None
+
+    topic_id = data.get("topic_id")
+    if topic_id:
+        index = _load_topics()
+        _remember(index, topic_id, title, category_id, dc.api_username)
+        _save_topics(index)
+    log.info("Discourse topic created: %s/t/%s", dc.base_url, topic_id)
+    return data
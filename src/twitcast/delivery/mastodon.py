@@ -4,6 +4,7 @@ import logging
 
 import requests
 
+from twitcast import net
 from twitcast.config import Config
 
 log = logging.getLogger(__name__)
@@ -34,7 +35,7 @@ def post_status(config: Config, content: str) -> bool:
     }
 
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=30)
+        resp = net.session().post(url, headers=headers, json=payload, timeout=30)
         resp.raise_for_status()
         status_url = resp.json().get("url", "")
         log.info("Posted to Mastodon: %s", status_url)
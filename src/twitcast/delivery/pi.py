@@ -1,47 +1,304 @@
-"""SCP + SSH push to Raspberry Pi."""
+"""SSH push to Raspberry Pi over a multiplexed connection.
 
+The first push opens an OpenSSH ControlMaster connection that persists for
+``pi.control_persist``; later pushes reuse it and skip the handshake. The
+image is streamed over stdin and the display script triggered in the same
+remote command, all under a single ``pi.timeout`` deadline.
+
+With ``pi.partial_refresh`` enabled, only the regions that changed since the
+last successful push are sent. They arrive as a tar stream unpacked into
+``{image_path}.regions/``::
+
+    manifest.json   {"width": 800, "height": 480, "image_path": "...",
+                     "regions": [{"x": 0, "y": 0, "w": 800, "h": 60,
+                                  "file": "region-0.png"}, ...]}
+    region-0.png    ...
+
+and the display script is run as ``{display_script} --partial <manifest>``.
+It must paste each region onto ``image_path`` at (x, y), save it, and do a
+partial refresh of those rectangles. A full push (plain image, no flag) is
+still sent for the first frame, after size changes, when most of the frame
+changed, and every ``pi.full_refresh_every`` pushes to clear e-ink ghosting.
+
+Several panels are configured as ``[[pi.displays]]`` (see pi_displays);
+each keeps its own last frame and partial-refresh count, so one push
+works the same for a lone ``[pi]`` host or any display of a fleet.
+"""
+
+import io
+import json
 import logging
+import re
+import shlex
 import subprocess
+import tarfile
+import threading
+import time
 from pathlib import Path
 
-from twitcast.config import Config
+from PIL import Image
+
+from twitcast import metrics
+from twitcast.config import Config, PiConfig, cache_dir
+from twitcast.dashboard.diff import Rect, changed_fraction, changed_regions
 
 log = logging.getLogger(__name__)
 
+# Last frame the Pi displayed, to diff the next push against; displays
+# of a fleet get their name appended (pi-frame-kitchen.png)
+PI_FRAME_FILE = "pi-frame.png"
+PI_STATE_FILE = "pi-state.json"
 
-def push_to_pi(config: Config, image_path: Path) -> bool:
-    """Push rendered image to Pi via scp and trigger display update."""
-    host = config.pi.host
-    if not host:
-        log.info("No Pi host configured, skipping Pi push")
-        return False
+# %C is a hash of (local host, remote host, port, user), which keeps the
+# socket path short enough for the unix socket limit.
+CONTROL_PATH = "~/.ssh/twitcast-%C"
+CONNECT_TIMEOUT = 10
+TRANSFER_MARKER = "__twitcast_transferred__"
+
+
+class PiPushError(Exception):
+    """Raised when the remote transfer or display command fails."""
+
+
+def pi_displays(config: Config) -> tuple[PiConfig, ...]:
+    """The configured displays: every [[pi.displays]] entry, else [pi] itself.
+
+    Raises ValueError for a display without a host or a name used twice.
+    """
+    pc = config.pi
+    if not pc.displays:
+        return (pc,)
+    seen = set()
+    for display in pc.displays:
+        if not display.host:
+            raise ValueError(f"[[pi.displays]] {display.name or '(unnamed)'} has no host")
+        if display.name in seen:
+            raise ValueError(f"[[pi.displays]] name {display.name!r} is used twice")
+        seen.add(display.name)
+    return pc.displays
+
+
+def _state_path(pc: PiConfig, filename: str) -> Path:
+    if not pc.name:
+        return cache_dir() / filename
+    stem, dot, ext = filename.rpartition(".")
+    return cache_dir() / f"{stem}-{re.sub(r'[^A-Za-z0-9_.-]', '_', pc.name)}{dot}{ext}"
 
-    user = config.pi.user
-    remote_path = config.pi.image_path
-    display_script = config.pi.display_script
 
-    dest = f"{user}@{host}:{remote_path}"
+def _ssh_options(pc: PiConfig) -> list[str]:
+    return [
+        "-o", "BatchMode=yes",
+        "-o", f"ConnectTimeout={CONNECT_TIMEOUT}",
+        "-o", "ControlMaster=auto",
+        "-o", f"ControlPath={CONTROL_PATH}",
+        "-o", f"ControlPersist={pc.control_persist}",
+    ]
+
+
+def _remaining(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise PiPushError("deadline exceeded")
+    return remaining
+
+
+def _ensure_master(target: str, options: list[str], deadline: float) -> float | None:
+    """Make sure a master connection is up. Returns handshake seconds, or None if reused."""
+    check = subprocess.run(
+        ["ssh", *options, "-O", "check", target],
+        capture_output=True,
+        text=True,
+        timeout=_remaining(deadline),
+    )
+    if check.returncode == 0:
+        return None
+
+    start = time.monotonic()
     try:
         subprocess.run(
-            ["scp", "-o", "ConnectTimeout=10", str(image_path), dest],
+            ["ssh", *options, target, "true"],
             check=True,
             capture_output=True,
             text=True,
+            timeout=_remaining(deadline),
         )
-        log.info("Image pushed to %s", dest)
     except subprocess.CalledProcessError as e:
-        log.warning("scp to Pi failed: %s", e.stderr.strip())
-        return False
+        raise PiPushError(f"ssh connect failed: {e.stderr.strip()}") from e
+    except subprocess.TimeoutExpired as e:
+        raise PiPushError("ssh connect timed out") from e
+    return time.monotonic() - start
+
+
+def _full_command(pc: PiConfig) -> str:
+    path = shlex.quote(pc.image_path)
+    tmp = shlex.quote(pc.image_path + ".part")
+    return f"cat > {tmp} && mv {tmp} {path} && echo {TRANSFER_MARKER} && {pc.display_script}"
+
+
+def _partial_command(pc: PiConfig) -> str:
+    regions_dir = shlex.quote(pc.image_path + ".regions")
+    manifest = shlex.quote(pc.image_path + ".regions/manifest.json")
+    return (
+        f"rm -rf {regions_dir} && mkdir -p {regions_dir} && tar -xf - -C {regions_dir}"
+        f" && echo {TRANSFER_MARKER} && {pc.display_script} --partial {manifest}"
+    )
+
+
+def _pack_regions(pc: PiConfig, frame: Image.Image, regions: list[Rect]) -> bytes:
+    """Tar the changed regions as PNGs plus a manifest with their coordinates."""
+    manifest = {
+        "width": frame.size[0],
+        "height": frame.size[1],
+        "image_path": pc.image_path,
+        "regions": [],
+    }
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for i, (x0, y0, x1, y1) in enumerate(regions):
+            name = f"region-{i}.png"
+            png = io.BytesIO()
+            frame.crop((x0, y0, x1, y1)).save(png, "PNG")
+            _add_file(tar, name, png.getvalue())
+            manifest["regions"].append({"x": x0, "y": y0, "w": x1 - x0, "h": y1 - y0, "file": name})
+        _add_file(tar, "manifest.json", json.dumps(manifest).encode())
+    return buf.getvalue()
+
+
+def _add_file(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
 
+
+def _load_pi_state(pc: PiConfig) -> dict:
     try:
-        subprocess.run(
-            ["ssh", "-o", "ConnectTimeout=10", f"{user}@{host}", display_script],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        log.info("Pi display update triggered")
+        with open(_state_path(pc, PI_STATE_FILE)) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def _plan_partial(pc: PiConfig, frame: Image.Image, pi_state: dict) -> list[Rect] | None:
+    """Changed regions to send, or None when a full push is due."""
+    if not pc.partial_refresh or not _state_path(pc, PI_FRAME_FILE).exists():
+        return None
+    if pi_state.get("partials_since_full", 0) >= pc.full_refresh_every:
+        log.info("Full e-ink refresh due after %d partial updates", pi_state["partials_since_full"])
+        return None
+    try:
+        with Image.open(_state_path(pc, PI_FRAME_FILE)) as previous:
+            regions = changed_regions(previous, frame)
+    except OSError as e:
+        log.warning("Could not read last Pi frame, doing a full push: %s", e)
+        return None
+    if regions and changed_fraction(regions, frame.size) > pc.partial_max_ratio:
+        log.info("Most of the frame changed, doing a full push")
+        return None
+    return regions
+
+
+def _send_and_display(
+    target: str,
+    options: list[str],
+    pc: PiConfig,
+    payload: bytes,
+    remote_cmd: str,
+    deadline: float,
+) -> tuple[float, float]:
+    """Stream a payload and run the display script in one remote command.
+
+    Returns (transfer_seconds, display_seconds).
+    """
+    remaining = _remaining(deadline)
+    proc = subprocess.Popen(
+        ["ssh", *options, target, remote_cmd],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(remaining, kill)
+    timer.start()
+    try:
+        start = time.monotonic()
+        try:
+            proc.stdin.write(payload)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        marker = proc.stdout.readline().decode(errors="replace").strip()
+        transferred = time.monotonic()
+        proc.stdout.read()
+        stderr = proc.stderr.read().decode(errors="replace").strip()
+        proc.wait()
+        finished = time.monotonic()
+    finally:
+        timer.cancel()
+
+    if timed_out.is_set():
+        stage = "display script" if marker == TRANSFER_MARKER else "transfer"
+        raise PiPushError(f"{stage} exceeded the {pc.timeout:g}s deadline")
+    if marker != TRANSFER_MARKER:
+        raise PiPushError(f"transfer failed: {stderr}")
+    if proc.returncode != 0:
+        raise PiPushError(f"display script failed: {stderr}")
+    return transferred - start, finished - transferred
+
+
+def push_to_pi(pc: PiConfig, frame: Image.Image, png: bytes) -> bool:
+    """Push a rendered frame to one display and trigger an update in one round-trip.
+
+    png is the frame already encoded; it is sent as is for a full push.
+    """
+    if not pc.host:
+        log.info("No Pi host configured, skipping Pi push")
+        return False
+
+    target = f"{pc.user}@{pc.host}"
+    options = _ssh_options(pc)
+    deadline = time.monotonic() + pc.timeout
+
+    pi_state = _load_pi_state(pc)
+    regions = _plan_partial(pc, frame, pi_state)
+    if regions == []:
+        log.info("Frame matches what the Pi already shows, nothing to refresh")
         return True
-    except subprocess.CalledProcessError as e:
-        log.warning("ssh display trigger failed: %s", e.stderr.strip())
+
+    if regions:
+        payload = _pack_regions(pc, frame, regions)
+        remote_cmd = _partial_command(pc)
+        kind = f"{len(regions)} region(s)"
+    else:
+        payload = png
+        remote_cmd = _full_command(pc)
+        kind = "full frame"
+
+    try:
+        handshake = _ensure_master(target, options, deadline)
+        transfer, display = _send_and_display(target, options, pc, payload, remote_cmd, deadline)
+    except (PiPushError, subprocess.TimeoutExpired) as e:
+        log.warning("Pi push to %s failed: %s", target, e)
         return False
+
+    if handshake is not None:
+        metrics.record("pi.handshake", handshake)
+    metrics.record("pi.transfer", transfer, bytes=len(payload))
+    metrics.record("pi.display", display)
+    handshake_str = "reused connection" if handshake is None else f"handshake {handshake:.2f}s"
+    log.info(
+        "Pushed %s to %s:%s (%s, transfer %.2fs for %d KB, display %.2fs)",
+        kind, target, pc.image_path, handshake_str, transfer, len(payload) // 1024, display,
+    )
+
+    cache_dir().mkdir(parents=True, exist_ok=True)
+    _state_path(pc, PI_FRAME_FILE).write_bytes(png)
+    partials = pi_state.get("partials_since_full", 0) + 1 if regions else 0
+    with open(_state_path(pc, PI_STATE_FILE), "w") as f:
+        json.dump({"partials_since_full": partials}, f)
+    return True
@@ -0,0 +1,172 @@
+"""Per-invocation stage timings and counters.
+
+Code wraps each stage in ``span(name)`` and bumps counters with ``incr``.
+At the end of a ``twitcast`` command the CLI calls ``export``, which logs
+the slowest stages, writes the run to ``cache/metrics/<command>.json`` and,
+if ``[metrics] textfile_dir`` is set, a Prometheus textfile for
+node_exporter's textfile collector.
+
+Everything is process-global and thread-safe; spans nest per thread.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from twitcast.config import CACHE_DIR, MetricsConfig
+
+log = logging.getLogger(__name__)
+
+METRICS_DIR = CACHE_DIR / "metrics"
+# Raw spans kept for the JSON dump; per-stage totals keep counting past this
+MAX_SPANS = 5000
+
+_lock = threading.Lock()
+_local = threading.local()
+_started = time.monotonic()
+_started_at = datetime.now(timezone.utc)
+_spans: list[dict] = []
+_stages: dict[str, list[float]] = {}
+_counters: Counter = Counter()
+_config = MetricsConfig()
+
+
+def configure(config: MetricsConfig) -> None:
+    global _config
+    _config = config
+
+
+def _record(name: str, seconds: float, parent: str | None, attrs: dict) -> None:
+    with _lock:
+        stage = _stages.setdefault(name, [0, 0.0])
+        stage[0] += 1
+        stage[1] += seconds
+        if len(_spans) < MAX_SPANS:
+            _spans.append({
+                "name": name,
+                "parent": parent,
+                "start_s": round(time.monotonic() - seconds - _started, 4),
+                "duration_s": round(seconds, 4),
+                **attrs,
+            })
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a stage. Yields a dict the caller may add attributes to.
+
+    An exception escaping the block marks the span with ``error``.
+    """
+    stack = _local.__dict__.setdefault("stack", [])
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    start = time.monotonic()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        stack.pop()
+        elapsed = time.monotonic() - start
+        _record(name, elapsed, parent, attrs)
+        log.debug("span %s %.3fs %s", name, elapsed, attrs or "")
+
+
+def record(name: str, seconds: float, **attrs) -> None:
+    """Record a stage timed elsewhere (e.g. split out of a subprocess)."""
+    stack = getattr(_local, "stack", None)
+    _record(name, seconds, stack[-1] if stack else None, attrs)
+
+
+def incr(name: str, value: int = 1) -> None:
+    """Bump a counter, e.g. ``cache.hits`` or ``llm.input_tokens``."""
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot(command: str, status: str) -> dict:
+    with _lock:
+        return {
+            "command": command,
+            "status": status,
+            "started_at_utc": _started_at.isoformat(),
+            "duration_s": round(time.monotonic() - _started, 4),
+            "stages": {name: {"count": c, "total_s": round(t, 4)} for name, (c, t) in _stages.items()},
+            "counters": dict(_counters),
+            "spans": list(_spans),
+        }
+
+
+def _prom_name(name: str) -> str:
+    return "twitcast_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _prom_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_textfile(run: dict) -> str:
+    """Prometheus text exposition of one run."""
+    cmd = f'command="{_prom_escape(run["command"])}"'
+    lines = [
+        "# HELP twitcast_run_seconds Wall time of the last run.",
+        "# TYPE twitcast_run_seconds gauge",
+        f"twitcast_run_seconds{{{cmd}}} {run['duration_s']}",
+        "# HELP twitcast_run_success 1 if the last run exited cleanly.",
+        "# TYPE twitcast_run_success gauge",
+        f"twitcast_run_success{{{cmd}}} {int(run['status'] == 'ok')}",
+        "# HELP twitcast_run_timestamp_seconds Start of the last run.",
+        "# TYPE twitcast_run_timestamp_seconds gauge",
+        f"twitcast_run_timestamp_seconds{{{cmd}}} {datetime.fromisoformat(run['started_at_utc']).timestamp():.0f}",
+        "# HELP twitcast_stage_seconds Total time spent in each stage during the last run.",
+        "# TYPE twitcast_stage_seconds gauge",
+    ]
+    for name, stage in sorted(run["stages"].items()):
+        lines.append(f'twitcast_stage_seconds{{{cmd},stage="{_prom_escape(name)}"}} {stage["total_s"]}')
+    lines += [
+        "# HELP twitcast_stage_count Times each stage ran during the last run.",
+        "# TYPE twitcast_stage_count gauge",
+    ]
+    for name, stage in sorted(run["stages"].items()):
+        lines.append(f'twitcast_stage_count{{{cmd},stage="{_prom_escape(name)}"}} {stage["count"]}')
+    for name, value in sorted(run["counters"].items()):
+        metric = _prom_name(name)
+        lines += [f"# TYPE {metric} gauge", f"{metric}{{{cmd}}} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # node_exporter may read at any moment; never let it see a partial file
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+def export(command: str, status: str = "ok") -> None:
+    """Log a summary of this run and write its JSON (and textfile) dump."""
+    run = snapshot(command, status)
+    slowest = sorted(run["stages"].items(), key=lambda kv: -kv[1]["total_s"])[:5]
+    if slowest:
+        log.info(
+            "%s %s in %.2fs; slowest stages: %s",
+            command, status, run["duration_s"],
+            ", ".join(f"{name} {s['total_s']:.2f}s" for name, s in slowest),
+        )
+
+    try:
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+        _write_atomic(METRICS_DIR / f"{command}.json", json.dumps(run, indent=2) + "\n")
+        if _config.textfile_dir:
+            textfile_dir = Path(_config.textfile_dir).expanduser()
+            textfile_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(textfile_dir / f"twitcast_{command}.prom", render_textfile(run))
+    except OSError as e:
+        log.warning("Failed to write metrics: %s", e)
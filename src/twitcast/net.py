@@ -0,0 +1,34 @@
+"""Process-wide HTTP session.
+
+Every API call goes through one ``requests.Session`` so keep-alive
+connections are pooled per host across calls, stages and, in a
+multi-config ``twitcast run``, tenants. Credentials are always passed
+per request (headers, params, webhook URLs), never set on the session,
+and cookies are refused, so sharing a pool never shares an identity.
+"""
+
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections kept open per host; enough for the worker pool of `twitcast run`
+POOL_SIZE = 16
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+
+
+def session() -> requests.Session:
+    """The shared session, created on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            _session = s
+        return _session
@@ -2,34 +2,72 @@
 
 import logging
 
+from twitcast.api import anthropic_client
 from twitcast.api.twit import TWIT_WEB_URL
 from twitcast.config import Config
 from twitcast.promo.voices import get_voice
+from twitcast.shows import Show
+from twitcast.transcript import topics
+from twitcast.transcript.extractive import summarize_extractive
 from twitcast.transcript.parser import extract_list_items, strip_html
 from twitcast.transcript.summarizer import generate_ai_promo, summarize_episode
 
 log = logging.getLogger(__name__)
 
 
-def build_template_promo(episode: dict) -> str:
-    """Build promotional copy using the template-based approach."""
+def _episode_text(episode: dict) -> str:
+    """Title, notes and teaser, plus the transcript if the episode is archived."""
+    from twitcast.transcript.archive import load_episode
+
+    parts = [episode.get("label", ""), strip_html(episode.get("showNotes", "")), strip_html(episode.get("teaser", ""))]
+    record = load_episode(episode["id"]) if episode.get("id") else None
+    if record and record.get("transcript"):
+        parts.append(record["transcript"])
+    return "\n".join(parts)
+
+
+def _topics_line(text: str, weights: dict[str, float], bullets: list[str]) -> str:
+    """'Topics include ...' from the top terms the bullets don't already mention."""
+    covered = set(topics.terms(" ".join(bullets)))
+    picks = [topics.surface(t, text) for t in topics.top_terms(weights, k=6) if t not in covered][:3]
+    if not picks:
+        return ""
+    return "Topics include " + (", ".join(picks[:-1]) + " and " + picks[-1] if len(picks) > 1 else picks[0])
+
+
+def _extractive_summary(episode: dict, source_html: str) -> dict | None:
+    """Offline summary of the archived transcript if there is one, else of source_html."""
+    from twitcast.transcript.archive import load_episode
+
+    record = load_episode(episode["id"]) if episode.get("id") else None
+    text = (record or {}).get("transcript") or source_html
+    if not text:
+        return None
+    summary = summarize_extractive(text)
+    return summary if summary["summary"] else None
+
+
+def build_template_promo(episode: dict, show: Show, summary: dict | None = None) -> str:
+    """Build promotional copy using the template-based approach.
+
+    With a summary (summary, topics, notable_quote, as from
+    summarize_episode or summarize_extractive), the promo leads with the
+    summary, takes its topics line from it and quotes the episode.
+    """
     title = episode.get("label", "New Episode")
     clean_path = episode.get("cleanPath") or ""
-    show = (episode.get("_embedded", {}).get("shows") or [{}])[0]
-    show_name = show.get("label", "TWiT Show")
+    show_name = show.label or "TWiT Show"
     episode_number = episode.get("episodeNumber", "?")
     airing = episode.get("airingDate", "")
     episode_url = f"{TWIT_WEB_URL}{clean_path}"
 
-    notes_items = extract_list_items(episode.get("showNotes", ""))
+    notes_items = list(dict.fromkeys(item for item in extract_list_items(episode.get("showNotes", "")) if item))
 
-    bullets = []
-    for item in notes_items:
-        if len(bullets) >= 3:
-            break
-        if item and item not in bullets:
-            bullets.append(item)
-    while len(bullets) < 3:
+    # Prefer the notes items that are most specific to this episode
+    text = _episode_text(episode)
+    weights = topics.weigh(text)
+    bullets = topics.rank_passages(notes_items, weights, k=3)
+    if len(bullets) < 3:
         fallback = (
             episode.get("teaser")
             or episode.get("metatag_description")
@@ -38,23 +76,29 @@ def build_template_promo(episode: dict) -> str:
         fallback = strip_html(fallback)
         if fallback and fallback not in bullets:
             bullets.append(fallback)
+    if len(bullets) < 3:
+        if summary and summary.get("topics"):
+            picks = summary["topics"][:3]
+            extra = "Topics include " + (", ".join(picks[:-1]) + " and " + picks[-1] if len(picks) > 1 else picks[0])
         else:
-            break
+            extra = _topics_line(text, weights, bullets)
+        if extra:
+            bullets.append(extra)
     bullets = [b.rstrip(".") + "." for b in bullets[:3]]
 
-    show_code = show.get("shortCode", "").strip()
     episode_ref = f"{show_name} #{episode_number}" if episode_number else show_name
-    if show_code:
-        episode_ref = f"{episode_ref} ({show_code})"
-
-    voice = get_voice(show_code)
-
-    lines = [
-        f"{voice['lead']} {episode_ref} — \"{title}\"",
-        "",
-        voice["section"],
-        *[f"- {b}" for b in bullets],
-        "",
+    if show.code:
+        episode_ref = f"{episode_ref} ({show.code})"
+
+    voice = get_voice(show.voice)
+
+    lines = [f"{voice['lead']} {episode_ref} — \"{title}\"", ""]
+    if summary and summary.get("summary"):
+        lines += [summary["summary"], ""]
+    lines += [voice["section"], *[f"- {b}" for b in bullets], ""]
+    if summary and summary.get("notable_quote"):
+        lines += [summary["notable_quote"], ""]
+    lines += [
         f"Listen/watch: {episode_url}",
         f"Published: {airing}",
         "",
@@ -63,14 +107,15 @@ def build_template_promo(episode: dict) -> str:
     return "\n".join(lines)
 
 
-def build_ai_promo(config: Config, episode: dict) -> str | None:
+def build_ai_promo(config: Config, episode: dict, show: Show) -> str | None:
     """Build promotional copy using Haiku AI from show notes.
 
-    Returns AI-generated promo text, or None on failure (caller should fall back to template).
+    When the model can't be used for the summary or the promo, returns the
+    template promo built around an offline (extractive) summary instead.
+    Returns None only if there is nothing to summarize (caller should fall
+    back to the plain template).
     """
-    show = (episode.get("_embedded", {}).get("shows") or [{}])[0]
-    show_name = show.get("label", "TWiT Show")
-    show_code = show.get("shortCode", "").strip()
+    show_name = show.label or "TWiT Show"
     episode_number = episode.get("episodeNumber", "?")
     title = episode.get("label", "New Episode")
     clean_path = episode.get("cleanPath") or ""
@@ -80,20 +125,26 @@ def build_ai_promo(config: Config, episode: dict) -> str | None:
     if not source_html:
         log.warning("No show notes available for AI promo")
         return None
+    if not anthropic_client.available(config):
+        log.warning("Anthropic API unavailable (circuit open or run deadline reached), using template with an extractive summary")
+        summary = _extractive_summary(episode, source_html)
+        return build_template_promo(episode, show, summary) if summary else None
 
-    # Step 1: Summarize
+    # Step 1: Summarize, extractively if the API fails
     summary = summarize_episode(config, source_html, show_name, episode_number, title)
     if summary is None:
-        log.warning("AI summarization failed, falling back to template")
-        return None
+        log.warning("AI summarization failed, using the extractive summarizer")
+        summary = _extractive_summary(episode, source_html)
+        if summary is None:
+            return None
 
     # Step 2: Generate promo
-    voice = get_voice(show_code)
+    voice = get_voice(show.voice)
     promo = generate_ai_promo(
         config, summary, show_name, episode_number, title, episode_url, voice,
     )
     if promo is None:
-        log.warning("AI promo generation failed, falling back to template")
-        return None
+        log.warning("AI promo generation failed, falling back to template with the summary")
+        return build_template_promo(episode, show, summary)
 
     return promo
@@ -0,0 +1,401 @@
+"""Promo pipeline: build and post promos for a batch of episodes.
+
+A run has a wall-clock budget (``promo.run_budget_minutes``). Episodes are
+worked in priority order, show priority first and then newest first, and
+an episode is only started if the budget still covers what an episode
+has typically taken (a moving average kept in the state file). The rest
+are deferred: reported, recorded in the state file, and worked first by
+the next run so a busy week can't starve a low-priority show.
+
+A poll first archives the transcripts of recent episodes, inside the same
+lock and budget (at most ARCHIVE_BUDGET_SHARE of it). An episode whose
+transcript isn't out yet is checked again with a doubling back-off, so a
+show that never gets one costs a few requests a day, not a few per poll.
+"""
+
+import fcntl
+import json
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import click
+
+from twitcast import metrics
+from twitcast.config import Config, cache_dir
+
+log = logging.getLogger(__name__)
+
+STATE_FILE = "transcript-promo-state.json"
+LOCK_FILE = "transcript-promo.lock"
+MAX_EPISODE_AGE_DAYS = 14
+# Assumed seconds per episode before any have been timed
+DEFAULT_EPISODE_SECONDS = {"ai": 30.0, "template": 10.0}
+EPISODE_SECONDS_SMOOTHING = 0.3
+# Back-off between checks for a transcript that isn't out yet: doubles from
+# the first to the last
+TRANSCRIPT_RECHECK_MINUTES = (5, 12 * 60)
+# Share of the run budget archiving may use before promos start
+ARCHIVE_BUDGET_SHARE = 0.5
+
+
+def _load_state() -> dict:
+    if not (cache_dir() / STATE_FILE).exists():
+        return {}
+    try:
+        with open(cache_dir() / STATE_FILE) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def _save_state(state: dict) -> None:
+    cache_dir().mkdir(parents=True, exist_ok=True)
+    with open(cache_dir() / STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+@contextmanager
+def _state_lock():
+    """Serialize promo runs (timer, webhook listener) that share the state file."""
+    cache_dir().mkdir(parents=True, exist_ok=True)
+    with open(cache_dir() / LOCK_FILE, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _parse_airing_date(date_str: str | None) -> datetime | None:
+    """Parse an ISO 8601 airing date string to a timezone-aware datetime."""
+    if not date_str:
+        return None
+    try:
+        return datetime.fromisoformat(date_str)
+    except (ValueError, TypeError):
+        return None
+
+
+def _priority_key(show, episode: dict, carried_over: set[str]) -> tuple:
+    aired = _parse_airing_date(episode.get("airingDate"))
+    return (str(episode.get("id")) not in carried_over, -show.priority, -(aired.timestamp() if aired else 0))
+
+
+def run_promo(
+    config: Config,
+    episodes: list[dict],
+    dry_run: bool = False,
+    force: bool = False,
+    no_ai: bool = False,
+    no_discourse: bool = False,
+    no_mastodon: bool = False,
+    budget_minutes: float | None = None,
+) -> int:
+    """Build and post promos for episodes not yet posted, within the run budget.
+
+    budget_minutes overrides ``promo.run_budget_minutes``. Returns the
+    number of episodes posted.
+    """
+    with _run_window(config, budget_minutes) as deadline:
+        return _run_promo(config, episodes, dry_run, force, no_ai, no_discourse, no_mastodon, deadline)
+
+
+@contextmanager
+def _run_window(config: Config, budget_minutes: float | None):
+    """Hold the state lock and the run budget; yields the monotonic deadline."""
+    from twitcast.api.anthropic_client import run_deadline
+
+    budget = (config.promo.run_budget_minutes if budget_minutes is None else budget_minutes) * 60
+    # The budget starts once the lock is held, so a queued run gets its full window
+    with _state_lock(), run_deadline(budget):
+        yield time.monotonic() + budget
+
+
+def _run_promo(config, episodes, dry_run, force, no_ai, no_discourse, no_mastodon, deadline) -> int:
+    from twitcast.api.anthropic_client import shorten_for_mastodon
+    from twitcast.api.twit import TWIT_WEB_URL, episode_image_url
+    from twitcast.delivery.discord import post_embeds, post_text, promo_embed
+    from twitcast.delivery.discourse import post_topic
+    from twitcast.delivery.mastodon import post_status
+    from twitcast.promo.builder import build_ai_promo, build_template_promo
+    from twitcast.shows import load_registry
+
+    state = _load_state()
+    registry = load_registry(config)
+
+    # Load posted IDs, migrating from old single-ID format if needed
+    posted_ids = set(state.get("posted_episode_ids", []))
+    old_id = state.get("last_posted_episode_id")
+    if old_id:
+        posted_ids = posted_ids | {old_id}
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=MAX_EPISODE_AGE_DAYS)
+    posted_count = 0
+
+    queue = []
+    for episode in episodes:
+        if not force and str(episode.get("id")) in posted_ids:
+            continue
+        airing_date = _parse_airing_date(episode.get("airingDate"))
+        if airing_date and airing_date < cutoff:
+            continue
+        queue.append((registry.for_episode(episode), episode))
+    carried_over = {d["episode_id"] for d in state.get("deferred", [])}
+    queue.sort(key=lambda item: _priority_key(*item, carried_over))
+
+    mode = "template" if no_ai else "ai"
+    episode_seconds = {**DEFAULT_EPISODE_SECONDS, **state.get("episode_seconds", {})}
+    deferred = []
+    dry_run_count = 0
+    use_embeds = config.discord.promo_mode == "embeds"
+    if config.discord.promo_mode not in ("text", "embeds"):
+        log.warning("Unknown discord.promo_mode %r, posting text", config.discord.promo_mode)
+    # (show, episode, promo text, embed) waiting for the batched Discord post
+    pending_embeds = []
+
+    def publish(show, episode, promo_text) -> None:
+        """Post to the other destinations and count the episode as done."""
+        nonlocal posted_ids, posted_count
+        episode_number = episode.get("episodeNumber")
+        if not no_discourse:
+            with metrics.span("deliver.discourse"):
+                post_topic(
+                    config,
+                    show_code=show.code,
+                    episode_number=episode_number or "?",
+                    episode_title=episode.get("label", ""),
+                    body=promo_text,
+                    category_id=show.discourse_category,
+                    show_label=show.label,
+                )
+
+        if not no_mastodon and show.mastodon:
+            mastodon_text = shorten_for_mastodon(config, promo_text) if not no_ai else None
+            with metrics.span("deliver.mastodon"):
+                post_status(config, mastodon_text or promo_text)
+
+        log.info("Posted promo for %s #%s (episode %s)", show.label, episode_number, episode.get("id"))
+        posted_ids = posted_ids | {str(episode.get("id"))}
+        posted_count += 1
+        metrics.incr("promo.posted")
+
+    for show, episode in queue:
+        episode_id = str(episode.get("id"))
+        episode_number = episode.get("episodeNumber")
+
+        # The first episode always runs, so the run makes progress and the estimate stays current
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (remaining < episode_seconds[mode] and (posted_count or dry_run_count or pending_embeds)):
+            deferred.append((show, episode))
+            continue
+        started = time.monotonic()
+
+        # Generate promo copy from show notes
+        with metrics.span("promo.build", ai=not no_ai):
+            promo_text = None
+            if not no_ai:
+                promo_text = build_ai_promo(config, episode, show)
+            if promo_text is None:
+                promo_text = build_template_promo(episode, show)
+
+        if dry_run:
+            click.echo(f"--- {show.label} #{episode_number} (episode {episode_id}) ---")
+            click.echo(promo_text)
+            click.echo()
+            dry_run_count += 1
+            episode_seconds[mode] = _smooth(episode_seconds[mode], time.monotonic() - started)
+            continue
+
+        if use_embeds:
+            # Discord first, together after the loop in as few webhook
+            # requests as the limits allow; the rest only once that landed
+            pending_embeds.append((show, episode, promo_text, promo_embed(
+                f"{show.label} #{episode_number} — {episode.get('label', '')}",
+                f"{TWIT_WEB_URL}{episode.get('cleanPath') or ''}",
+                promo_text,
+                thumbnail_url=episode_image_url(episode),
+                timestamp=episode.get("airingDate"),
+            )))
+        else:
+            with metrics.span("deliver.discord"):
+                post_text(config, promo_text)
+            publish(show, episode, promo_text)
+            # Delay between posts so Discord shows them as separate messages
+            time.sleep(config.promo.post_delay_seconds)
+        episode_seconds[mode] = _smooth(episode_seconds[mode], time.monotonic() - started)
+
+    if pending_embeds:
+        with metrics.span("deliver.discord", embeds=len(pending_embeds)):
+            delivered = post_embeds(config, [embed for _, _, _, embed in pending_embeds])
+        failed = []
+        for (show, episode, promo_text, _), ok in zip(pending_embeds, delivered):
+            if ok:
+                publish(show, episode, promo_text)
+            else:
+                failed.append(f"{show.code} #{episode.get('episodeNumber')} (episode {episode.get('id')})")
+        if failed:
+            # Left out of posted_episode_ids, so the next run builds and posts them again
+            log.warning("Discord embed post failed; will retry %d episode(s) next run: %s", len(failed), ", ".join(failed))
+            metrics.incr("promo.discord_failed", len(failed))
+
+    if deferred:
+        _report_deferred(deferred, dry_run)
+
+    if not dry_run:
+        _save_state({
+            "posted_episode_ids": sorted(posted_ids),
+            "episode_seconds": episode_seconds,
+            "deferred": [
+                {"episode_id": str(e.get("id")), "show": s.code, "episode_number": e.get("episodeNumber")}
+                for s, e in deferred
+            ],
+            "transcript_checks": state.get("transcript_checks", {}),
+            "updated_at_utc": datetime.now(timezone.utc).isoformat(),
+        })
+
+    if posted_count == 0:
+        log.info("No new episodes ready for promo")
+    return posted_count
+
+
+def _smooth(average: float, seconds: float) -> float:
+    return average + EPISODE_SECONDS_SMOOTHING * (seconds - average)
+
+
+def _report_deferred(deferred: list, dry_run: bool) -> None:
+    names = [f"{show.code} #{episode.get('episodeNumber')} (episode {episode.get('id')})" for show, episode in deferred]
+    log.warning("Run budget exhausted; deferred %d episode(s) to the next run: %s", len(names), ", ".join(names))
+    metrics.incr("promo.deferred", len(names))
+    if dry_run:
+        click.echo(f"Deferred to the next run: {', '.join(names)}")
+
+
+def _recheck_due(check: dict | None, now: float) -> bool:
+    if not check:
+        return True
+    first, last = TRANSCRIPT_RECHECK_MINUTES
+    wait = min(first * 2 ** (check["attempts"] - 1), last)
+    return now - check["checked_at"] >= wait * 60
+
+
+def archive_new_transcripts(config: Config, episodes: list[dict], state: dict, deadline: float) -> list[str]:
+    """Archive recent episodes whose transcript isn't archived yet, and index them.
+
+    Keeps the transcript archive, search index and topic document
+    frequencies current between backfills. Episodes archived without a
+    transcript are checked again, backing off per episode (tracked in
+    state["transcript_checks"]), until it shows up. Stops checking at the
+    monotonic deadline. Returns the IDs of episodes whose transcript was
+    found this time.
+    """
+    from twitcast.shows import load_registry
+    from twitcast.transcript.archive import archive_episode, load_episode
+    from twitcast.transcript.search import update_index
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=MAX_EPISODE_AGE_DAYS)
+    now = time.time()
+    last_checks = state.get("transcript_checks", {})
+    # Only episodes still waiting for a transcript, so the table stays small
+    checks = {}
+    registry = None
+    found = []
+    archived = 0
+    with metrics.span("promo.archive") as span:
+        for episode in episodes:
+            episode_id = str(episode.get("id"))
+            airing_date = _parse_airing_date(episode.get("airingDate"))
+            if not episode.get("id") or (airing_date and airing_date < cutoff):
+                continue
+            record = load_episode(episode_id)
+            if record and record.get("transcript"):
+                continue
+            check = last_checks.get(episode_id)
+            if not _recheck_due(check, now) or time.monotonic() >= deadline:
+                if check:
+                    checks[episode_id] = check
+                continue
+            registry = registry or load_registry(config)
+            try:
+                if archive_episode(config, registry, episode):
+                    found.append(episode_id)
+            except Exception as e:
+                log.warning("Could not archive episode %s: %s", episode_id, e)
+            if episode_id not in found:
+                checks[episode_id] = {"checked_at": now, "attempts": (check or {}).get("attempts", 0) + 1}
+            # A first record without a transcript is still new to the index
+            archived += record is None or episode_id in found
+        span.update(archived=archived, transcripts=len(found), waiting=len(checks))
+    state["transcript_checks"] = checks
+    if archived:
+        try:
+            update_index()
+        except sqlite3.Error as e:
+            log.warning("Could not update the search index: %s", e)
+    return found
+
+
+def poll_promo(
+    config: Config,
+    dry_run: bool = False,
+    force: bool = False,
+    no_ai: bool = False,
+    no_discourse: bool = False,
+    no_mastodon: bool = False,
+    scheduled: bool = False,
+    budget_minutes: float | None = None,
+) -> int:
+    """Fetch recent episodes, learn the airing schedule and run promos.
+
+    With scheduled, does nothing until the learned schedule says a poll is
+    due. Returns the number of episodes posted.
+    """
+    from twitcast.api.twit import fetch_recent_episodes
+    from twitcast.promo.schedule import load_schedule, next_poll_time, poll_due, record_episodes, save_schedule
+
+    cache_dir().mkdir(parents=True, exist_ok=True)
+
+    now = datetime.now(timezone.utc)
+    schedule = load_schedule()
+    if scheduled and not poll_due(schedule, now):
+        log.info("Next scheduled poll at %s, skipping", schedule["next_poll_at"])
+        return 0
+
+    episodes = fetch_recent_episodes(config, count=10)
+
+    if dry_run:
+        if not episodes:
+            log.warning("No episodes returned from API")
+            return 0
+        return run_promo(
+            config,
+            episodes,
+            dry_run=True,
+            force=force,
+            no_ai=no_ai,
+            no_discourse=no_discourse,
+            no_mastodon=no_mastodon,
+            budget_minutes=budget_minutes,
+        )
+
+    with _run_window(config, budget_minutes) as deadline:
+        transcripts = []
+        if episodes:
+            state = _load_state()
+            archive_deadline = time.monotonic() + ARCHIVE_BUDGET_SHARE * (deadline - time.monotonic())
+            transcripts = archive_new_transcripts(config, episodes, state, archive_deadline)
+            _save_state(state)
+        # Re-read under the lock, in case an overlapping poll just saved it
+        schedule = load_schedule()
+        record_episodes(schedule, episodes, now, transcripts)
+        next_poll = next_poll_time(config, schedule, now)
+        schedule["next_poll_at"] = next_poll.isoformat()
+        save_schedule(schedule)
+        log.info("Next scheduled poll at %s", next_poll.astimezone().strftime("%a %H:%M"))
+
+        if not episodes:
+            log.warning("No episodes returned from API")
+            return 0
+        return _run_promo(config, episodes, dry_run, force, no_ai, no_discourse, no_mastodon, deadline)
@@ -0,0 +1,190 @@
+"""Adaptive promo polling: learn when each show's episodes appear.
+
+Each poll records, per show, the ``airingDate`` of recent episodes, when
+the episode first showed up in the API and when its transcript first
+resolved (promo polls archive transcripts as they appear, see
+promo/pipeline.py). From that history we derive weekly airing slots and a
+publication window (airing → episode available → transcript available),
+and poll densely only while a new episode or transcript is expected.
+
+Both latencies are measured at poll time, so they are only as precise as
+the interval that was running; dense polling inside the window keeps that
+to a few minutes once the window has been learned.
+"""
+
+import json
+import logging
+import statistics
+from datetime import datetime, timedelta, timezone
+
+from twitcast.config import Config, cache_dir
+from twitcast.shows import episode_show_slug
+
+SCHEDULE_FILE = "promo-schedule.json"
+
+# Episodes kept per show, and how far back airings count towards slots
+HISTORY_PER_SHOW = 12
+SLOT_LOOKBACK = timedelta(weeks=8)
+# Airings within this many minutes of each other share a weekly slot
+SLOT_ROUNDING_MINUTES = 15
+
+# Window used until a show has observed publication latencies
+DEFAULT_LATENCY_WINDOW = (timedelta(0), timedelta(hours=6))
+WINDOW_LEAD = timedelta(minutes=15)
+WINDOW_TAIL = timedelta(minutes=30)
+
+# Interval used before any history has been collected (the old fixed timer),
+# and the longest sparse interval while any show's window is still unlearned
+DEFAULT_POLL = timedelta(minutes=30)
+# Observed latencies a show needs before its window is trusted
+MIN_LATENCIES = 2
+# Timer jitter tolerance: a poll due within this margin runs now
+POLL_GRACE = timedelta(minutes=1)
+
+WEEK = timedelta(weeks=1)
+
+log = logging.getLogger(__name__)
+
+
+def load_schedule() -> dict:
+    if not (cache_dir() / SCHEDULE_FILE).exists():
+        return {}
+    try:
+        with open(cache_dir() / SCHEDULE_FILE) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def save_schedule(schedule: dict) -> None:
+    (cache_dir() / SCHEDULE_FILE).parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir() / SCHEDULE_FILE, "w") as f:
+        json.dump(schedule, f, indent=2)
+
+
+def _parse(date_str: str | None) -> datetime | None:
+    if not date_str:
+        return None
+    try:
+        dt = datetime.fromisoformat(date_str)
+    except (ValueError, TypeError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _show_key(episode: dict) -> str:
+    return episode_show_slug(episode) or "unknown"
+
+
+def record_episodes(schedule: dict, episodes: list[dict], now: datetime, transcripts: list[str] | None = None) -> None:
+    """Add newly seen episodes to the per-show airing history.
+
+    transcripts are the IDs of episodes whose transcript was first found
+    on this poll. Latencies are only learned for episodes that aired after
+    tracking began; anything already published on the first poll says
+    nothing about when it actually appeared.
+    """
+    tracking_since = _parse(schedule.setdefault("tracking_since", now.isoformat()))
+    # Transcripts have been watched for since this (older schedules predate it)
+    transcripts_since = _parse(schedule.setdefault("transcripts_tracking_since", now.isoformat()))
+    shows = schedule.setdefault("shows", {})
+    found = set(transcripts or ())
+
+    for episode in episodes:
+        airing = _parse(episode.get("airingDate"))
+        if airing is None:
+            continue
+        history = shows.setdefault(_show_key(episode), {})
+        episode_id = str(episode.get("id"))
+        entry = history.get(episode_id)
+        if entry is None:
+            entry = history[episode_id] = {"aired": airing.isoformat()}
+            if airing >= tracking_since:
+                entry["latency_s"] = max(0.0, (now - airing).total_seconds())
+        if episode_id in found and "transcript_latency_s" not in entry and airing >= transcripts_since:
+            entry["transcript_latency_s"] = max(0.0, (now - airing).total_seconds())
+
+    for key, history in shows.items():
+        if len(history) > HISTORY_PER_SHOW:
+            newest = sorted(history.items(), key=lambda kv: kv[1]["aired"], reverse=True)
+            shows[key] = dict(newest[:HISTORY_PER_SHOW])
+
+
+def _weekly_slots(history: dict, now: datetime) -> set[int]:
+    """Minute-of-week slots (UTC) at which this show has recently aired."""
+    slots = set()
+    for entry in history.values():
+        aired = _parse(entry["aired"])
+        if aired is None or now - aired > SLOT_LOOKBACK:
+            continue
+        aired = aired.astimezone(timezone.utc)
+        minute = aired.weekday() * 1440 + aired.hour * 60 + aired.minute
+        slots.add(round(minute / SLOT_ROUNDING_MINUTES) * SLOT_ROUNDING_MINUTES)
+    return slots
+
+
+def _latency_window(history: dict) -> tuple[timedelta, timedelta]:
+    """Window after airing from the episode's expected appearance to its transcript's."""
+    latencies = [e["latency_s"] for e in history.values() if "latency_s" in e]
+    if not latencies:
+        return DEFAULT_LATENCY_WINDOW
+    # The window closes once the transcript is in, or the episode if its
+    # transcript hasn't been seen yet
+    done = [max(e.get("latency_s", 0.0), e.get("transcript_latency_s", 0.0)) for e in history.values() if "latency_s" in e]
+    median = statistics.median(done)
+    low = max(timedelta(0), timedelta(seconds=min(latencies)) - WINDOW_LEAD)
+    # Clamp outliers (late uploads) to 3x the median so one bad week
+    # doesn't keep us polling densely for days.
+    high = timedelta(seconds=min(max(done), 3 * median)) + WINDOW_TAIL
+    return low, high
+
+
+def expected_windows(schedule: dict, now: datetime) -> list[tuple[datetime, datetime, str]]:
+    """Return (start, end, show) windows that are open now or open within a week."""
+    utc_now = now.astimezone(timezone.utc)
+    week_start = (utc_now - timedelta(days=utc_now.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    windows = []
+    for show, history in schedule.get("shows", {}).items():
+        low, high = _latency_window(history)
+        for slot in _weekly_slots(history, now):
+            # Check last week's, this week's and next week's occurrence so
+            # windows spanning the week boundary are not missed.
+            for weeks in (-1, 0, 1):
+                aired = week_start + timedelta(minutes=slot) + weeks * WEEK
+                start, end = aired + low, aired + high
+                if end >= now and start <= now + WEEK:
+                    windows.append((start, end, show))
+    return sorted(windows)
+
+
+def next_poll_time(config: Config, schedule: dict, now: datetime) -> datetime:
+    """Pick the next poll: dense inside an expected window, sparse otherwise."""
+    if not schedule.get("shows"):
+        return now + DEFAULT_POLL
+
+    dense = timedelta(minutes=config.promo.dense_poll_minutes)
+    sparse = timedelta(minutes=config.promo.sparse_poll_minutes)
+    # Until every show's window is learned, off-window episodes are likely
+    unlearned = [
+        show for show, history in schedule["shows"].items()
+        if sum("latency_s" in e for e in history.values()) < MIN_LATENCIES
+    ]
+    if unlearned and sparse > DEFAULT_POLL:
+        sparse = DEFAULT_POLL
+
+    windows = expected_windows(schedule, now)
+    open_now = [show for start, end, show in windows if start <= now <= end]
+    if open_now:
+        log.info("Expecting new episodes from %s, polling densely", ", ".join(sorted(set(open_now))))
+        return now + dense
+
+    upcoming = [start for start, _, _ in windows if start > now]
+    return min([now + sparse, *upcoming])
+
+
+def poll_due(schedule: dict, now: datetime) -> bool:
+    """Whether a scheduled promo run should poll the API now."""
+    next_poll = _parse(schedule.get("next_poll_at"))
+    return next_poll is None or now >= next_poll - POLL_GRACE
@@ -1,6 +1,7 @@
 """Per-show voice profiles for promotional copy."""
 
 
+# Voice profiles by name; shows pick one via Show.voice (see shows.py)
 SHOW_VOICE: dict[str, dict[str, str]] = {
     "TWiT": {
         "lead": "New episode of This Week in Tech:",
@@ -46,6 +47,6 @@ DEFAULT_VOICE: dict[str, str] = {
 }
 
 
-def get_voice(show_code: str) -> dict[str, str]:
-    """Get the voice profile for a show."""
-    return SHOW_VOICE.get(show_code, DEFAULT_VOICE).copy()
+def get_voice(name: str) -> dict[str, str]:
+    """Get a voice profile by name, or the network default."""
+    return SHOW_VOICE.get(name, DEFAULT_VOICE).copy()
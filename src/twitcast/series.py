@@ -0,0 +1,111 @@
+"""Append-only integer time series, one compact binary file per series.
+
+A file is a flat run of little-endian uint32 (unix time, value) pairs.
+Appending a sample is a single 8-byte write, and loading is one read
+straight into two arrays, so lookups and deltas never parse anything.
+"""
+
+import logging
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# 4-byte unsigned on every CPython platform; times fit until 2106
+TYPECODE = "I"
+RECORD_BYTES = 2 * array(TYPECODE).itemsize
+
+
+def _to_disk(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(TYPECODE, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_disk(data: bytes) -> array:
+    values = array(TYPECODE)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class Series:
+    """Samples in time order: parallel ``times`` and ``values`` arrays."""
+
+    def __init__(self, times: array | None = None, values: array | None = None):
+        self.times = times if times is not None else array(TYPECODE)
+        self.values = values if values is not None else array(TYPECODE)
+
+    @classmethod
+    def load(cls, path: Path) -> "Series":
+        """Read a series file. A missing file is an empty series."""
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return cls()
+        except OSError as e:
+            log.warning("Failed to read series %s: %s", path.name, e)
+            return cls()
+        # Ignore a torn trailing record left by an interrupted append
+        flat = _from_disk(data[: len(data) - len(data) % RECORD_BYTES])
+        return cls(flat[0::2], flat[1::2])
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def latest(self) -> tuple[int, int] | None:
+        return (self.times[-1], self.values[-1]) if self.times else None
+
+    def value_at(self, t: float) -> int | None:
+        """Value of the last sample at or before t, or None if t is before the first."""
+        i = bisect_right(self.times, t)
+        return self.values[i - 1] if i else None
+
+    def delta(self, seconds: float, now: float | None = None) -> int | None:
+        """Change in value over the last ``seconds``.
+
+        None when history doesn't reach back that far.
+        """
+        if not self.times:
+            return None
+        now = time.time() if now is None else now
+        before = self.value_at(now - seconds)
+        return None if before is None else self.values[-1] - before
+
+    def rate_per_day(self, seconds: float, now: float | None = None) -> float | None:
+        """Average change per day over the last ``seconds`` (or all history if shorter)."""
+        if len(self.times) < 2:
+            return None
+        now = time.time() if now is None else now
+        i = max(0, bisect_right(self.times, now - seconds) - 1)
+        span_days = (self.times[-1] - self.times[i]) / 86400
+        if span_days <= 0:
+            return None
+        return (self.values[-1] - self.values[i]) / span_days
+
+
+def append_sample(path: Path, value: int, t: float | None = None) -> None:
+    """Append one sample. Out-of-order or out-of-range samples are dropped."""
+    t = int(time.time() if t is None else t)
+    if not (0 <= value < 2**32):
+        log.warning("Series %s: value %d out of range, not recorded", path.name, value)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        aligned = size - size % RECORD_BYTES
+        if aligned != size:
+            f.truncate(aligned)
+        # Keep files sorted so lookups can bisect
+        if aligned:
+            f.seek(aligned - RECORD_BYTES)
+            if t < _from_disk(f.read(RECORD_BYTES))[0]:
+                log.warning("Series %s: sample older than the last one, not recorded", path.name)
+                return
+        f.write(_to_disk(array(TYPECODE, (t, value))))
@@ -1,29 +1,58 @@
-"""Show metadata: codes, slugs, IDs, YouTube channels."""
-
-# Show slug → short code mapping (from TWiT API /shows endpoint)
-SHOW_CODES: dict[str, str] = {
-    "this-week-in-tech": "TWiT",
-    "security-now": "SN",
-    "macbreak-weekly": "MBW",
-    "windows-weekly": "WW",
-    "intelligent-machines": "IM",
-    "tech-news-weekly": "TNW",
-    "hands-on-tech": "HOT",
-    "ios-today": "iOS",
-    "this-week-in-space": "TWiS",
-    "home-theater-geeks": "HTG",
-    "hands-on-apple": "HOA",
-    "hands-on-windows": "HOW",
-    "untitled-linux-show": "ULS",
-    "ai-inside": "AI",
-    "twit-plus": "PLUS",
-    "twit-plus-club-shows": "CLUB",
-    "twit-plus-news": "PLUSNEWS",
-    "total-leo": "Total Leo",
-    "total-mikah": "MIKAH",
-    "ask-the-tech-guys": "ATTG",
-    "hands-on-android": "H.O.A.",
-    "hands-on-photography": "HOP",
+"""Show metadata: the show registry, slugs, YouTube channels.
+
+The registry merges three layers, later ones winning:
+
+1. Active shows synced from the TWiT API /shows endpoint (id, label,
+   short code, slug), cached for a day in cache/shared/ (one file per
+   API account, shared by tenants of a multi-config run).
+2. SHOW_OVERRIDES below: what the API doesn't know (our dashboard codes,
+   Discourse categories, Mastodon cross-posting, voice profiles).
+3. ``[shows.<slug>]`` tables in config.toml, same keys as SHOW_OVERRIDES.
+
+Shows are indexed by id, slug, code/short code and label, so each lookup
+is one dict hit.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from twitcast.cache import read_cache, shared_cache_path, write_cache
+from twitcast.config import Config
+
+log = logging.getLogger(__name__)
+
+SHOWS_REFRESH_HOURS = 24
+
+# Local show metadata keyed by slug. Keys: code (short code shown on the
+# dashboard and in post titles), label, short_code (as the API reports it),
+# discourse_category (subcategory under "TWiT Shows"), mastodon
+# (cross-post promos), voice (profile name in promo/voices.py), priority
+# (promo order when a run can't do everything; higher goes first).
+SHOW_OVERRIDES: dict[str, dict] = {
+    "this-week-in-tech": {"code": "TWiT", "discourse_category": 13, "mastodon": True, "voice": "TWiT", "priority": 2},
+    "security-now": {"code": "SN", "discourse_category": 16, "mastodon": True, "voice": "SN", "priority": 2},
+    "macbreak-weekly": {"code": "MBW", "discourse_category": 14, "mastodon": True, "voice": "MBW", "priority": 1},
+    "windows-weekly": {"code": "WW", "discourse_category": 17, "mastodon": True, "voice": "WW", "priority": 1},
+    "intelligent-machines": {"code": "IM", "discourse_category": 89, "mastodon": True, "voice": "IM", "priority": 1},
+    "tech-news-weekly": {"code": "TNW", "discourse_category": 32},
+    "hands-on-tech": {"code": "HOT", "discourse_category": 22},
+    "ios-today": {"code": "iOS", "discourse_category": 15},
+    "this-week-in-space": {"code": "TWiS", "discourse_category": 80, "voice": "TWiS"},
+    "home-theater-geeks": {"code": "HTG", "discourse_category": 84},
+    "hands-on-apple": {"code": "HOA", "discourse_category": 90},
+    "hands-on-windows": {"code": "HOW", "discourse_category": 81},
+    "untitled-linux-show": {"code": "ULS", "discourse_category": 85},
+    "ai-inside": {"code": "AI"},
+    "twit-plus": {"code": "PLUS"},
+    "twit-plus-club-shows": {"code": "CLUB", "short_code": "PLUSSHOWS", "voice": "PLUSSHOWS"},
+    "twit-plus-news": {"code": "PLUSNEWS"},
+    "total-leo": {"code": "Total Leo"},
+    "total-mikah": {"code": "MIKAH"},
+    "ask-the-tech-guys": {"code": "ATTG"},
+    "hands-on-android": {"code": "H.O.A."},
+    "hands-on-photography": {"code": "HOP"},
 }
 
 # YouTube channels: (label, channel_id) — ordered by subscriber count, high to low
@@ -39,16 +68,147 @@ YOUTUBE_CHANNELS: list[tuple[str, str]] = [
 ]
 
 
-def extract_show_code(clean_path: str) -> str:
-    """Extract show short code from cleanPath like '/shows/this-week-in-tech/episodes/1071'.
+@dataclass(frozen=True)
+class Show:
+    slug: str
+    code: str
+    label: str = ""
+    id: int | None = None
+    short_code: str = ""
+    discourse_category: int | None = None
+    mastodon: bool = False
+    voice: str = ""
+    priority: int = 0
+
+
+class ShowRegistry:
+    """Shows indexed by id, slug, code and label."""
+
+    def __init__(self, shows: list[Show]):
+        self.shows = shows
+        self._by_id = {s.id: s for s in shows if s.id is not None}
+        self._by_slug = {s.slug: s for s in shows}
+        self._by_code = {}
+        self._by_label = {}
+        for s in shows:
+            for code in (s.short_code, s.code):
+                if code:
+                    self._by_code.setdefault(code.casefold(), s)
+            if s.label:
+                self._by_label.setdefault(s.label.casefold(), s)
+
+    def by_id(self, show_id: int | str) -> Show | None:
+        try:
+            return self._by_id.get(int(show_id))
+        except (TypeError, ValueError):
+            return None
+
+    def by_slug(self, slug: str) -> Show | None:
+        return self._by_slug.get(slug)
+
+    def by_code(self, code: str) -> Show | None:
+        return self._by_code.get((code or "").strip().casefold())
+
+    def by_label(self, label: str) -> Show | None:
+        return self._by_label.get((label or "").strip().casefold())
+
+    def for_path(self, clean_path: str) -> Show:
+        """The show an episode cleanPath belongs to."""
+        slug = show_slug_from_path(clean_path)
+        return self._by_slug.get(slug) or _unknown_show(slug)
+
+    def for_episode(self, episode: dict) -> Show:
+        """The show an API episode (with embedded show data) belongs to.
+
+        Shows the registry hasn't seen get a Show built from the episode.
+        """
+        embedded = (episode.get("_embedded", {}).get("shows") or [{}])[0]
+        slug = episode_show_slug(episode)
+        show = (
+            self._by_slug.get(slug)
+            or self.by_id(embedded.get("id"))
+            or self.by_code(embedded.get("shortCode", ""))
+        )
+        if show:
+            return show
+        code = (embedded.get("shortCode") or "").strip()
+        return Show(
+            slug=slug,
+            code=code or _unknown_show(slug).code,
+            label=embedded.get("label", ""),
+            short_code=code,
+        )
+
 
-    Falls back to uppercased slug initials if show not found in mapping.
+def _unknown_show(slug: str) -> Show:
+    return Show(slug=slug, code=slug.upper()[:6] if slug else "???")
+
+
+def build_registry(api_shows: list[dict], overrides: dict[str, dict]) -> ShowRegistry:
+    """Merge shows from fetch_shows with local overrides keyed by slug."""
+    merged: dict[str, dict] = {}
+    for item in api_shows:
+        if item.get("slug"):
+            merged[item["slug"]] = {
+                "id": item.get("id"),
+                "label": item.get("label", ""),
+                "short_code": (item.get("short_code") or "").strip(),
+            }
+    for slug, fields in overrides.items():
+        merged[slug] = {**merged.get(slug, {}), **fields}
+
+    shows = []
+    for slug, fields in merged.items():
+        fields = {k: v for k, v in fields.items() if k in Show.__dataclass_fields__ and k != "slug"}
+        fields.setdefault("code", fields.get("short_code") or _unknown_show(slug).code)
+        shows.append(Show(slug=slug, **fields))
+    return ShowRegistry(shows)
+
+
+def _cache_path(config: Config) -> Path:
+    # The show list is the same for every tenant on the same API account
+    tc = config.twit
+    return shared_cache_path("shows", tc.api_url, tc.app_id, tc.app_key)
+
+
+def sync_shows(config: Config) -> list[dict] | None:
+    """Fetch active shows from the TWiT API into the local cache."""
+    from twitcast.api.twit import fetch_shows
+
+    shows = fetch_shows(config)
+    if shows:
+        write_cache(_cache_path(config), {"shows": shows})
+        log.info("Synced %d shows from the TWiT API", len(shows))
+    return shows
+
+
+def load_registry(config: Config, refresh: bool = False) -> ShowRegistry:
+    """Build the registry, syncing from the API when the cache is older than a day.
+
+    Falls back to a stale cache, then to the local overrides alone, if the
+    API is unreachable.
     """
-    parts = clean_path.strip("/").split("/")
-    if len(parts) >= 2 and parts[0] == "shows":
-        slug = parts[1]
-        return SHOW_CODES.get(slug, slug.upper()[:6])
-    return "???"
+    cached = None if refresh else read_cache(_cache_path(config), SHOWS_REFRESH_HOURS)
+    api_shows = cached["shows"] if cached else None
+    if api_shows is None:
+        api_shows = sync_shows(config)
+    if not api_shows:
+        api_shows = _load_stale_shows(_cache_path(config))
+
+    overrides = {slug: dict(fields) for slug, fields in SHOW_OVERRIDES.items()}
+    for slug, fields in config.shows.items():
+        overrides[slug] = {**overrides.get(slug, {}), **fields}
+    return build_registry(api_shows, overrides)
+
+
+def _load_stale_shows(cache_path: Path) -> list[dict]:
+    if cache_path.exists():
+        try:
+            with open(cache_path) as f:
+                return json.load(f)["shows"]
+        except (json.JSONDecodeError, KeyError, OSError):
+            pass
+    return []
 
 
 def show_slug_from_path(clean_path: str) -> str:
@@ -57,3 +217,10 @@ def show_slug_from_path(clean_path: str) -> str:
     if len(parts) >= 2 and parts[0] == "shows":
         return parts[1]
     return ""
+
+
+def episode_show_slug(episode: dict) -> str:
+    """Slug of an API episode's show, from its embedded show or its own cleanPath."""
+    show = (episode.get("_embedded", {}).get("shows") or [{}])[0]
+    slug = (show.get("cleanPath") or "").strip("/").split("/")[-1]
+    return slug or show_slug_from_path(episode.get("cleanPath", ""))
@@ -0,0 +1,135 @@
+"""Multi-tenant runs: several configs served by one process.
+
+``twitcast run -c a.toml -c b.toml`` loads each config as a tenant named
+after its file. Every tenant gets its own state and caches under
+``cache/tenants/<name>/`` (promo state and lock, airing schedule, dashboard
+and Pi state, Discourse indexes, Memberful and YouTube counts, previews),
+selected per thread through ``config.use_cache_dir``. What is safe to
+share is shared: the HTTP connection pool (net.py), Anthropic clients per
+key, album art and YouTube subscriber history.
+
+Jobs run on a bounded worker pool. Workers pick tenants round-robin and a
+tenant never has two jobs in flight, so one tenant with a slow Pi or a
+long promo backlog holds at most one worker while the rest keep moving.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+
+from twitcast import metrics
+from twitcast.config import TENANTS_DIR, Config, load_config, use_cache_dir
+
+log = logging.getLogger(__name__)
+
+_tenant: ContextVar[str] = ContextVar("twitcast_tenant", default="")
+
+
+@dataclass(frozen=True)
+class Tenant:
+    name: str
+    config: Config
+    cache_dir: Path
+
+
+@dataclass(frozen=True)
+class JobResult:
+    tenant: str
+    job: str
+    ok: bool
+    seconds: float
+    error: str = ""
+
+
+class TenantLogFilter(logging.Filter):
+    """Prefix log lines with the tenant they were logged for."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        name = _tenant.get()
+        if name and not getattr(record, "tenant", None):
+            record.tenant = name
+            record.msg = f"[{name}] {record.msg}"
+        return True
+
+
+def load_tenants(paths: list[Path]) -> list[Tenant]:
+    """One tenant per config file, named by file stem.
+
+    Raises ValueError if two files would share a name (and so a cache dir).
+    """
+    tenants = []
+    seen = set()
+    for path in paths:
+        name = path.stem
+        if name in seen:
+            raise ValueError(f"two configs named {name!r}; tenant names come from file names and must be unique")
+        seen.add(name)
+        with metrics.span("config.load", tenant=name):
+            config = load_config(path)
+        tenants.append(Tenant(name=name, config=config, cache_dir=TENANTS_DIR / name))
+    return tenants
+
+
+def run_jobs(
+    tenants: list[Tenant],
+    jobs: list[tuple[str, Callable[[Tenant], object]]],
+    workers: int = 4,
+) -> list[JobResult]:
+    """Run every job for every tenant, jobs in the given order per tenant.
+
+    A failing job is logged and reported; it doesn't stop the tenant's
+    remaining jobs or other tenants.
+    """
+    by_name = {t.name: t for t in tenants}
+    pending = {t.name: deque(jobs) for t in tenants}
+    order = deque(by_name)
+    busy: set[str] = set()
+    results: list[JobResult] = []
+    cond = threading.Condition()
+
+    def next_task():
+        with cond:
+            while True:
+                for _ in range(len(order)):
+                    name = order[0]
+                    order.rotate(-1)
+                    if name not in busy and pending[name]:
+                        busy.add(name)
+                        return by_name[name], pending[name].popleft()
+                if not any(pending.values()):
+                    return None
+                cond.wait()
+
+    def worker():
+        while (task := next_task()) is not None:
+            tenant, (job_name, job) = task
+            token = _tenant.set(tenant.name)
+            start = time.monotonic()
+            error = ""
+            try:
+                with use_cache_dir(tenant.cache_dir), metrics.span("tenant.job", tenant=tenant.name, job=job_name):
+                    job(tenant)
+            except Exception as e:
+                log.exception("%s failed", job_name)
+                error = f"{type(e).__name__}: {e}"
+            finally:
+                _tenant.reset(token)
+            with cond:
+                results.append(JobResult(tenant.name, job_name, not error, time.monotonic() - start, error))
+                busy.discard(tenant.name)
+                cond.notify_all()
+
+    threads = [
+        threading.Thread(target=worker, name=f"tenant-worker-{i}")
+        for i in range(max(1, min(workers, len(tenants))))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
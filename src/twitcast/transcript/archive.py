@@ -0,0 +1,118 @@
+"""Local archive of resolved transcripts, one JSON file per episode.
+
+Filled by ``twitcast backfill`` for past episodes and by every promo poll
+for recent ones (see promo/pipeline.py), so new transcripts arrive without
+a backfill. Each record holds the episode metadata,
+its show notes and transcript as plain text (speaker lines keep their
+``[HH:MM:SS]:`` markers) and, if summarized, the summary. Episodes whose
+transcript couldn't be found are archived too, with an empty transcript,
+so a resumed backfill doesn't probe them again.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+from twitcast.config import Config, cache_dir
+
+log = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "transcripts"
+
+
+def _path(episode_id: str | int) -> Path:
+    return cache_dir() / ARCHIVE_DIR / f"{episode_id}.json"
+
+
+def has_episode(episode_id: str | int) -> bool:
+    return _path(episode_id).exists()
+
+
+def save_episode(record: dict) -> None:
+    """Write a record keyed by its ``episode_id``, atomically."""
+    path = _path(record["episode_id"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(record, f)
+    tmp.replace(path)
+
+
+def load_episode(episode_id: str | int) -> dict | None:
+    try:
+        with open(_path(episode_id)) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def archived_mtimes() -> dict[str, float]:
+    """Modification time of every archived record, by episode ID, without reading them."""
+    directory = cache_dir() / ARCHIVE_DIR
+    if not directory.exists():
+        return {}
+    return {entry.name.removesuffix(".json"): entry.stat().st_mtime
+            for entry in os.scandir(directory)
+            if entry.name.endswith(".json") and not entry.name.startswith(".")}
+
+
+def iter_episodes() -> Iterator[dict]:
+    """Every archived record, in no particular order."""
+    directory = cache_dir() / ARCHIVE_DIR
+    if not directory.exists():
+        return
+    for path in directory.glob("*.json"):
+        try:
+            with open(path) as f:
+                yield json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning("Skipping unreadable archive record %s: %s", path.name, e)
+
+
+def archive_episode(config: Config, registry, episode: dict, summarize: bool = False) -> bool:
+    """Resolve, summarize and archive one episode. Returns whether it had a transcript.
+
+    Raises if a transcript probe or the summary fails, leaving the episode
+    unarchived so it is retried.
+    """
+    from twitcast.api.twit import TWIT_WEB_URL
+    from twitcast.shows import episode_show_slug
+    from twitcast.transcript.parser import strip_html, transcript_text
+    from twitcast.transcript.resolver import resolve_transcript_url
+    from twitcast.transcript.summarizer import summarize_episode
+
+    show = registry.for_episode(episode)
+    embedded = (episode.get("_embedded", {}).get("shows") or [{}])[0]
+    show_label = show.label or embedded.get("label", "")
+    number = episode.get("episodeNumber")
+    title = episode.get("label", "")
+
+    transcript_url, transcript_html, _ = resolve_transcript_url(
+        episode_show_slug(episode), show_label, number, config.twit.transcript_url, raise_errors=True
+    )
+    summary = None
+    if transcript_html and summarize:
+        summary = summarize_episode(config, transcript_html, show_label, number, title)
+        if summary is None:
+            raise RuntimeError("summarization failed")
+
+    save_episode({
+        "episode_id": str(episode.get("id")),
+        "show_slug": show.slug,
+        "show_code": show.code,
+        "show_label": show_label,
+        "episode_number": number,
+        "title": title,
+        "airing_date": episode.get("airingDate"),
+        "episode_url": f"{TWIT_WEB_URL}{episode.get('cleanPath') or ''}",
+        "show_notes": strip_html(episode.get("showNotes", "")),
+        "transcript_url": transcript_url,
+        "transcript": transcript_text(transcript_html) if transcript_html else "",
+        "summary": summary,
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    })
+    return transcript_html is not None
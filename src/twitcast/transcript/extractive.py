@@ -0,0 +1,153 @@
+"""Offline extractive summaries: the fallback when the Anthropic API is down.
+
+Sentences are ranked TextRank-style: each sentence is a sparse TF-IDF
+vector (IDF over the episode's own sentences), edges are cosine
+similarities, and weighted PageRank picks the sentences most central to
+what was discussed. The similarity graph is applied as sparse products
+instead of being built pair by pair (see _rank), so a full two-hour
+transcript ranks in a fraction of a second.
+
+Sponsor reads are dropped first (see packer.py). The notable quote is
+the best-scoring speaker turn of quotable length, attributed to its
+speaker. Topics come from topics.py and are weighted against the
+archived corpus when there is one.
+"""
+
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+
+from twitcast import metrics
+from twitcast.transcript import topics
+from twitcast.transcript.packer import strip_boilerplate
+from twitcast.transcript.parser import split_turns, transcript_text
+
+log = logging.getLogger(__name__)
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+
+MIN_WORDS, MAX_WORDS = 6, 60
+QUOTE_WORDS = (12, 45)
+DAMPING = 0.85
+ITERATIONS = 50
+TOLERANCE = 1e-6
+
+
+def _sentences(turn: str) -> list[str]:
+    """Sentences of a turn; runs without punctuation are cut every MAX_WORDS words."""
+    out = []
+    for sentence in SENTENCE_RE.split(turn):
+        words = sentence.split()
+        for i in range(0, len(words), MAX_WORDS):
+            out.append(" ".join(words[i:i + MAX_WORDS]))
+    return out
+
+
+def _rank(vectors: list[dict[str, float]]) -> list[float]:
+    """Weighted PageRank over the cosine-similarity graph of unit vectors.
+
+    The similarity matrix is never built: with V the sentence-by-term
+    matrix it is V·Vᵀ minus the diagonal, so each power step is two sparse
+    products, V·(Vᵀ·x), linear in the number of nonzero weights.
+    """
+    n = len(vectors)
+    index: dict[str, int] = {}
+    rows = [[(index.setdefault(t, len(index)), w) for t, w in vec.items()] for vec in vectors]
+
+    def similarity_times(x: list[float]) -> list[float]:
+        column = [0.0] * len(index)
+        for row, xi in zip(rows, x):
+            if xi:
+                for t, w in row:
+                    column[t] += w * xi
+        # Unit vectors: each sentence's similarity to itself is 1
+        return [sum(w * column[t] for t, w in row) - xi for row, xi in zip(rows, x)]
+
+    out_weight = similarity_times([1.0] * n)
+    scores = [1.0 / n] * n
+    for _ in range(ITERATIONS):
+        spread = similarity_times([s / o if o > 1e-12 else 0.0 for s, o in zip(scores, out_weight)])
+        updated = [(1 - DAMPING) / n + DAMPING * y for y in spread]
+        delta = sum(abs(a - b) for a, b in zip(updated, scores))
+        scores = updated
+        if delta < TOLERANCE:
+            break
+    return scores
+
+
+def _vectors(sentences: list[str]) -> list[dict[str, float]]:
+    """Unit-length TF-IDF vectors, IDF taken over the sentences themselves."""
+    counts = [Counter(topics.terms(s, phrases=False)) for s in sentences]
+    df = Counter(t for c in counts for t in c)
+    n = len(sentences)
+    vectors = []
+    for c in counts:
+        vec = {t: (1 + math.log(k)) * math.log((n + 1) / df[t]) for t, k in c.items()}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        vectors.append({t: w / norm for t, w in vec.items()})
+    return vectors
+
+
+def _cosine(a: dict[str, float], b: dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(t, 0.0) for t, w in a.items())
+
+
+def summarize_extractive(transcript_html: str, max_sentences: int = 4, max_topics: int = 5) -> dict:
+    """Summarize a transcript (or any text) without a model.
+
+    Returns the same shape as ``summarize_episode``: summary, topics and
+    notable_quote. The quote is empty when the text has no speaker turns.
+    """
+    with metrics.span("summarize.extractive") as span:
+        text = transcript_text(transcript_html)
+        turns = [(speaker, body) for speaker, _, body in strip_boilerplate(split_turns(text))]
+
+        sentences: list[str] = []
+        owner: list[int] = []
+        for t, (_, body) in enumerate(turns):
+            for sentence in _sentences(body):
+                if MIN_WORDS <= len(sentence.split()) <= MAX_WORDS:
+                    sentences.append(sentence)
+                    owner.append(t)
+
+        summary = ""
+        quote = ""
+        if sentences:
+            vectors = _vectors(sentences)
+            scores = _rank(vectors)
+
+            chosen: list[int] = []
+            for i in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+                # Questions don't summarize; skip them and near-repeats of a pick
+                if sentences[i].endswith("?"):
+                    continue
+                if all(_cosine(vectors[i], vectors[c]) < 0.5 for c in chosen):
+                    chosen.append(i)
+                if len(chosen) >= max_sentences:
+                    break
+            summary = " ".join(sentences[i] for i in sorted(chosen))
+
+            turn_score: dict[int, float] = defaultdict(float)
+            for i, t in enumerate(owner):
+                turn_score[t] += scores[i]
+            turn_sentences = Counter(owner)
+            lo, hi = QUOTE_WORDS
+            quotable = [t for t in turn_score if turns[t][0] and lo <= len(turns[t][1].split()) <= hi]
+            # The opening rundown is a table of contents, not a quote
+            quotable = [t for t in quotable if t > 0] or quotable
+            if quotable:
+                # Mean rather than total, so long turns don't win on length alone
+                best = max(quotable, key=lambda t: turn_score[t] / turn_sentences[t])
+                speaker, body = turns[best]
+                quote = f"“{body}” — {speaker}"
+
+        # Speaker names would otherwise top the list
+        spoken = "\n".join(body for _, body in turns)
+        weights = topics.weigh(spoken)
+        topic_list = [topics.surface(t, spoken) for t in topics.top_terms(weights, k=max_topics)]
+        span.update(sentences=len(sentences), turns=len(turns))
+
+    return {"summary": summary, "topics": topic_list, "notable_quote": quote}
@@ -0,0 +1,162 @@
+"""Fit a transcript into a model's input token budget.
+
+Boilerplate goes first: sponsor reads (from "brought to you by" to the
+hand-back to the show or the end of the host's turn) and the site footer
+after the last speaker turn.
+If the rest still doesn't fit, turns are chosen by how much they tell the
+model about the episode:
+
+1. the opening rundown, where the host lists what's coming up,
+2. segment transitions ("let's take a break", "next story") and the turn
+   after each, which usually introduces the new topic,
+3. the turns with the most TF-IDF weight per term (see topics.py),
+
+and then written out in their original order, with a ``[…]`` marker
+wherever turns were left out.
+"""
+
+import logging
+import math
+import re
+
+from twitcast import metrics
+from twitcast.api.tokens import estimate_tokens
+from twitcast.transcript import topics
+from twitcast.transcript.parser import split_turns
+
+log = logging.getLogger(__name__)
+
+AD_START_RE = re.compile(
+    r"\b(?:brought to you by|a word from our sponsor|our (?:show|episode) today is brought)\b", re.I
+)
+AD_END_RE = re.compile(r"\b(?:back to (?:the show|you|work|our show)|thank you,? [\w .]{1,40},? for (?:supporting|sponsoring))\b", re.I)
+AD_LINE_RE = re.compile(r"\b(?:promo code|offer code|use the code|\w+\.com/twit|slash twit)\b", re.I)
+FOOTER_RE = re.compile(r"\b(?:All Rights Reserved|Copyright ©|© \d{4}|Privacy Policy|Terms of (?:Service|Use))\b", re.I)
+TRANSITION_RE = re.compile(
+    r"\b(?:take a (?:quick )?break|moving on|next story|let's talk about|let's move|speaking of|turning to"
+    r"|our next|back to the show|coming up)\b",
+    re.I,
+)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'])")
+
+# Share of the budget for the opening rundown
+OPENING_SHARE = 0.15
+# Turns longer than this share of the budget are split at sentence ends
+MAX_TURN_SHARE = 0.05
+GAP_MARKER = "[…]"
+
+
+def strip_boilerplate(turns: list[tuple[str, int | None, str]]) -> list[tuple[str, int | None, str]]:
+    """Turns with sponsor reads and the trailing site footer removed."""
+    kept = []
+    in_ad = False
+    for speaker, seconds, text in turns:
+        sentences = []
+        for sentence in SENTENCE_RE.split(text):
+            if not in_ad and AD_START_RE.search(sentence):
+                in_ad = True
+            if in_ad:
+                if AD_END_RE.search(sentence):
+                    in_ad = False
+                continue
+            if not AD_LINE_RE.search(sentence):
+                sentences.append(sentence)
+        # Reads are done by one speaker; whoever talks next is back on the show
+        in_ad = False
+        if sentences:
+            kept.append((speaker, seconds, " ".join(sentences)))
+    if kept and (m := FOOTER_RE.search(kept[-1][2])):
+        speaker, seconds, text = kept[-1]
+        kept[-1] = (speaker, seconds, text[:m.start()].rstrip())
+        if not kept[-1][2]:
+            kept.pop()
+    return kept
+
+
+def _line(speaker: str, seconds: int | None, text: str) -> str:
+    if seconds is None:
+        return text
+    stamp = f"[{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}]:"
+    return f"{speaker} {stamp} {text}" if speaker else f"{stamp} {text}"
+
+
+def _split_long(turns, max_tokens: int, model: str):
+    """Break turns over max_tokens into runs of whole sentences."""
+    out = []
+    for speaker, seconds, text in turns:
+        if estimate_tokens(text, model) <= max_tokens:
+            out.append((speaker, seconds, text))
+            continue
+        chunk: list[str] = []
+        size = 0
+        for sentence in SENTENCE_RE.split(text):
+            cost = estimate_tokens(sentence, model)
+            if chunk and size + cost > max_tokens:
+                out.append((speaker, seconds, " ".join(chunk)))
+                chunk, size = [], 0
+            chunk.append(sentence)
+            size += cost
+        if chunk:
+            out.append((speaker, seconds, " ".join(chunk)))
+    return out
+
+
+def pack_transcript(text: str, budget_tokens: int, model: str) -> str:
+    """The most informative part of a plain-text transcript that fits budget_tokens."""
+    with metrics.span("summarize.pack") as span:
+        turns = strip_boilerplate(split_turns(text))
+        lines = [_line(*turn) for turn in turns]
+        total = sum(estimate_tokens(line, model) + 1 for line in lines)
+        span.update(budget=budget_tokens, tokens=total, turns=len(turns))
+        if total <= budget_tokens:
+            return "\n".join(lines)
+
+        turns = _split_long(turns, max(1, int(budget_tokens * MAX_TURN_SHARE)), model)
+        lines = [_line(*turn) for turn in turns]
+        costs = [estimate_tokens(line, model) + 1 for line in lines]
+        gap_cost = estimate_tokens(GAP_MARKER, model) + 1
+
+        weights = topics.weigh("\n".join(t[2] for t in turns))
+
+        density = []
+        for _, _, turn_text in turns:
+            turn_terms = set(topics.terms(turn_text))
+            score = sum(weights.get(t, 0.0) for t in turn_terms) / math.sqrt(len(turn_terms)) if turn_terms else 0.0
+            density.append(score)
+
+        chosen: set[int] = set()
+        used = 0
+
+        def take(i: int) -> bool:
+            nonlocal used
+            # Each kept turn may open a gap before it; charge for the marker up front
+            cost = costs[i] + gap_cost
+            if i in chosen or used + cost > budget_tokens:
+                return False
+            chosen.add(i)
+            used += cost
+            return True
+
+        for i in range(len(turns)):
+            if used + costs[i] > budget_tokens * OPENING_SHARE or not take(i):
+                break
+        transitions = [i for i, turn in enumerate(turns) if TRANSITION_RE.search(turn[2])]
+        for i in sorted(transitions, key=lambda i: -density[i]):
+            take(i)
+            if i + 1 < len(turns):
+                take(i + 1)
+        for i in sorted(range(len(turns)), key=lambda i: -density[i]):
+            take(i)
+
+        out = []
+        prev = -1
+        for i in sorted(chosen):
+            if i != prev + 1:
+                out.append(GAP_MARKER)
+            out.append(lines[i])
+            prev = i
+        if prev != len(turns) - 1:
+            out.append(GAP_MARKER)
+        span.update(kept_turns=len(chosen), kept_tokens=used)
+    log.info("Packed transcript to ~%d of ~%d tokens (%d of %d turns)", used, total, len(chosen), len(turns))
+    return "\n".join(out)
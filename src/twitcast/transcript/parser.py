@@ -3,6 +3,13 @@
 import html
 import re
 
+# Speaker lines in TWiT transcripts start with "[HH:MM:SS]:"
+TIMESTAMP_RE = re.compile(r"\[(\d{2}):(\d{2}):(\d{2})\]:")
+# "Leo Laporte [00:01:02]:" — the name is whatever capitalized words end the previous turn
+SPEAKER_RE = re.compile(r"(?:^|(?<=[.!?\"'…)\]])\s)\s*((?:[A-Z][\w.'-]*\s){0,3}[A-Z][\w.'-]*)\s*$")
+# Before the first turn there is only page chrome to go on, so take a first and last name
+FIRST_SPEAKER_RE = re.compile(r"((?:[A-Z][\w.'-]*\s)?[A-Z][\w.'-]*)\s*$")
+
 
 def strip_html(text: str) -> str:
     """Strip HTML tags and normalize whitespace."""
@@ -15,6 +22,39 @@ def strip_html(text: str) -> str:
     return re.sub(r"[ \t]+", " ", text).strip()
 
 
+def transcript_text(transcript_html: str) -> str:
+    """Plain transcript text from the first speaker line on, dropping the
+    page chrome before it."""
+    text = strip_html(transcript_html)
+    ts_match = TIMESTAMP_RE.search(text)
+    if not ts_match:
+        return text
+    speaker = FIRST_SPEAKER_RE.search(text[:ts_match.start()])
+    return text[speaker.start(1) if speaker else ts_match.start():]
+
+
+def split_turns(text: str) -> list[tuple[str, int | None, str]]:
+    """(speaker, seconds, text) per ``[HH:MM:SS]:`` speaker turn of plain transcript text.
+
+    Text without timestamps comes back as a single anonymous turn.
+    """
+    chunks = TIMESTAMP_RE.split(text)
+    if len(chunks) == 1:
+        return [("", None, re.sub(r"\s+", " ", text).strip())] if text.strip() else []
+    turns = []
+    m = SPEAKER_RE.search(chunks[0]) or FIRST_SPEAKER_RE.search(chunks[0])
+    speaker = m.group(1) if m else ""
+    # split() puts the three timestamp groups between consecutive bodies
+    for i in range(1, len(chunks), 4):
+        h, mi, s, body = chunks[i:i + 4]
+        m = SPEAKER_RE.search(body)
+        turn = re.sub(r"\s+", " ", body[:m.start(1)] if m else body).strip()
+        if turn:
+            turns.append((speaker, int(h) * 3600 + int(mi) * 60 + int(s), turn))
+        speaker = m.group(1) if m else ""
+    return turns
+
+
 def extract_list_items(notes_html: str) -> list[str]:
     """Extract <li> items from HTML show notes."""
     items = re.findall(r"<li>(.*?)</li>", notes_html or "", flags=re.IGNORECASE | re.DOTALL)
@@ -28,11 +68,7 @@ def extract_list_items(notes_html: str) -> list[str]:
 
 def extract_transcript_highlight(transcript_html: str) -> str | None:
     """Extract a usable highlight quote from transcript HTML."""
-    text = strip_html(transcript_html)
-    # Trim leading page chrome; transcripts include timestamped speaker lines.
-    ts_match = re.search(r"\[\d{2}:\d{2}:\d{2}\]:", text)
-    if ts_match:
-        text = text[ts_match.start():]
+    text = transcript_text(transcript_html)
 
     # Prefer the "Coming up on..." line if present.
     m = re.search(
@@ -6,11 +6,17 @@ import re
 
 import requests
 
+from twitcast import metrics, net
+
 TRANSCRIPT_BASE = "https://twit.tv/posts/transcripts"
 
 log = logging.getLogger(__name__)
 
 
+class TranscriptFetchError(Exception):
+    """A transcript probe failed for a reason other than the page not existing."""
+
+
 def slugify(text: str) -> str:
     """Convert text to URL slug."""
     text = html.unescape(text or "").lower()
@@ -57,14 +63,23 @@ def transcript_slug_candidates(show_slug: str, show_label: str, episode_number:
     return ordered
 
 
-def fetch_transcript_html(url: str) -> str | None:
-    """Fetch a transcript URL and validate it contains actual transcript content."""
+def fetch_transcript_html(url: str, raise_errors: bool = False) -> str | None:
+    """Fetch a transcript URL and validate it contains actual transcript content.
+
+    With raise_errors, a failure that doesn't mean "no such page" (network
+    error, 5xx, rate limit) raises TranscriptFetchError instead of returning None.
+    """
+    metrics.incr("transcript.probes")
     try:
-        resp = requests.get(url, timeout=30)
+        resp = net.session().get(url, timeout=30)
     except requests.RequestException as e:
         log.warning("Transcript fetch failed for %s: %s", url, e)
+        if raise_errors:
+            raise TranscriptFetchError(f"{url}: {e}") from e
         return None
     if resp.status_code != 200:
+        if raise_errors and (resp.status_code >= 500 or resp.status_code == 429):
+            raise TranscriptFetchError(f"{url}: HTTP {resp.status_code}")
         return None
     body = resp.text
     if "Transcript" not in body:
@@ -75,17 +90,25 @@ def fetch_transcript_html(url: str) -> str | None:
 
 
 def resolve_transcript_url(
-    show_slug: str, show_label: str, episode_number: int | str | None
+    show_slug: str,
+    show_label: str,
+    episode_number: int | str | None,
+    base_url: str = TRANSCRIPT_BASE,
+    raise_errors: bool = False,
 ) -> tuple[str | None, str | None, list[str]]:
     """Probe candidate URLs until a valid transcript is found.
 
-    Returns (transcript_url, transcript_html, attempted_urls).
+    Returns (transcript_url, transcript_html, attempted_urls). With
+    raise_errors, a probe that fails transiently raises TranscriptFetchError,
+    so "not found" really means no candidate exists.
     """
     attempted = []
-    for slug in transcript_slug_candidates(show_slug, show_label, episode_number):
-        url = f"{TRANSCRIPT_BASE}/{slug}"
-        attempted.append(url)
-        html_doc = fetch_transcript_html(url)
-        if html_doc:
-            return url, html_doc, attempted
+    with metrics.span("transcript.resolve") as span:
+        for slug in transcript_slug_candidates(show_slug, show_label, episode_number):
+            url = f"{base_url.rstrip('/')}/{slug}"
+            attempted.append(url)
+            span["probes"] = len(attempted)
+            html_doc = fetch_transcript_html(url, raise_errors)
+            if html_doc:
+                return url, html_doc, attempted
     return None, None, attempted
@@ -0,0 +1,217 @@
+"""Full-text search over archived transcripts and show notes (SQLite FTS5).
+
+The index lives in ``cache/search.db`` and is built from the transcript
+archive (see archive.py). Every ``[HH:MM:SS]:`` speaker line is its own
+row, so a hit points at the moment in the episode where it was said; the
+title and show notes are rows too, without a timestamp.
+
+``update_index`` is incremental: it compares archive file mtimes with what
+was indexed and only re-reads records that are new or changed, so it is
+cheap enough to run before every search. Each episode's rows are a
+contiguous rowid range, which makes replacing an episode a range delete.
+The same update maintains the document-frequency table used by topics.py.
+"""
+
+import logging
+import re
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+
+from twitcast import metrics
+from twitcast.config import cache_dir
+from twitcast.transcript import topics
+from twitcast.transcript.parser import TIMESTAMP_RE
+
+log = logging.getLogger(__name__)
+
+INDEX_FILE = "search.db"
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    episode_id TEXT PRIMARY KEY,
+    show_code TEXT,
+    show_label TEXT,
+    episode_number TEXT,
+    title TEXT,
+    airing_date TEXT,
+    episode_url TEXT,
+    transcript_url TEXT,
+    source_mtime REAL,
+    first_row INTEGER,
+    last_row INTEGER
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+    text,
+    episode_id UNINDEXED,
+    kind UNINDEXED,
+    seconds UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+-- Document frequencies for topic extraction (see topics.py)
+CREATE TABLE IF NOT EXISTS doc_terms (episode_id TEXT PRIMARY KEY, terms TEXT);
+CREATE TABLE IF NOT EXISTS df (term TEXT PRIMARY KEY, n INTEGER) WITHOUT ROWID;
+"""
+TABLES = ("episodes", "segments", "doc_terms", "df")
+
+
+@dataclass(frozen=True)
+class Hit:
+    episode_id: str
+    show_code: str
+    episode_number: str
+    title: str
+    airing_date: str
+    url: str
+    kind: str
+    seconds: int | None
+    snippet: str
+    score: float
+
+    @property
+    def timestamp(self) -> str:
+        if self.seconds is None:
+            return ""
+        return f"{self.seconds // 3600:02d}:{self.seconds // 60 % 60:02d}:{self.seconds % 60:02d}"
+
+
+def _connect() -> sqlite3.Connection:
+    path = cache_dir() / INDEX_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        db.executescript("".join(f"DROP TABLE IF EXISTS {table};" for table in TABLES))
+        db.executescript(SCHEMA)
+        db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return db
+
+
+def _segments(record: dict) -> list[tuple[str, str, int | None]]:
+    """(text, kind, seconds) rows for one archived episode."""
+    rows = []
+    if record.get("title"):
+        rows.append((record["title"], "title", None))
+    if record.get("show_notes"):
+        rows.append((record["show_notes"], "notes", None))
+    transcript = record.get("transcript") or ""
+    matches = list(TIMESTAMP_RE.finditer(transcript))
+    for m, nxt in zip(matches, [*matches[1:], None]):
+        text = transcript[m.end():nxt.start() if nxt else len(transcript)].strip()
+        if text:
+            h, mi, s = (int(g) for g in m.groups())
+            rows.append((text, "transcript", h * 3600 + mi * 60 + s))
+    return rows
+
+
+def _delete_episode(db: sqlite3.Connection, episode_id: str) -> None:
+    row = db.execute("SELECT first_row, last_row FROM episodes WHERE episode_id = ?", (episode_id,)).fetchone()
+    if row and row[0] is not None:
+        db.execute("DELETE FROM segments WHERE rowid BETWEEN ? AND ?", row)
+    db.execute("DELETE FROM episodes WHERE episode_id = ?", (episode_id,))
+    topics.remove_document(db, episode_id)
+
+
+def _index_episode(db: sqlite3.Connection, record: dict, mtime: float) -> None:
+    episode_id = str(record["episode_id"])
+    _delete_episode(db, episode_id)
+    first = last = None
+    for text, kind, seconds in _segments(record):
+        cur = db.execute(
+            "INSERT INTO segments (text, episode_id, kind, seconds) VALUES (?, ?, ?, ?)",
+            (text, episode_id, kind, seconds),
+        )
+        first = cur.lastrowid if first is None else first
+        last = cur.lastrowid
+    db.execute(
+        "INSERT INTO episodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            episode_id, record.get("show_code", ""), record.get("show_label", ""),
+            str(record.get("episode_number") or ""), record.get("title", ""), record.get("airing_date") or "",
+            record.get("episode_url", ""), record.get("transcript_url") or "", mtime, first, last,
+        ),
+    )
+    topics.add_document(db, episode_id, topics.document_terms(record))
+
+
+def update_index(rebuild: bool = False) -> tuple[int, int]:
+    """Bring the index up to date with the archive.
+
+    Returns (episodes indexed, episodes removed).
+    """
+    from twitcast.transcript.archive import archived_mtimes, load_episode
+
+    indexed = removed = 0
+    with metrics.span("search.update") as span, closing(_connect()) as db, db:
+        if rebuild:
+            for table in TABLES:
+                db.execute(f"DELETE FROM {table}")
+        known = dict(db.execute("SELECT episode_id, source_mtime FROM episodes"))
+        archived = archived_mtimes()
+        for episode_id in known.keys() - archived.keys():
+            _delete_episode(db, episode_id)
+            removed += 1
+        for episode_id, mtime in archived.items():
+            if known.get(episode_id) == mtime:
+                continue
+            record = load_episode(episode_id)
+            if record is None:
+                continue
+            _index_episode(db, record, mtime)
+            indexed += 1
+        span.update(indexed=indexed, removed=removed)
+    if indexed or removed:
+        log.info("Search index: %d episodes indexed, %d removed", indexed, removed)
+    return indexed, removed
+
+
+def _match_expression(query: str) -> str:
+    """Quote each word so user input can't trip FTS5 query syntax; words are ANDed."""
+    words = re.findall(r"[\w'-]+", query)
+    return " ".join('"' + w.replace('"', '""') + '"' for w in words)
+
+
+def search(query: str, limit: int = 20, show_code: str = "", per_episode: int = 3, raw: bool = False) -> list[Hit]:
+    """Best-ranked hits for query, at most per_episode from any one episode."""
+    expression = query if raw else _match_expression(query)
+    if not expression:
+        return []
+    sql = (
+        "SELECT s.episode_id, s.kind, s.seconds, snippet(segments, 0, '[', ']', '…', 16), bm25(segments) AS score,"
+        " e.show_code, e.episode_number, e.title, e.airing_date, e.episode_url, e.transcript_url"
+        " FROM segments s JOIN episodes e ON e.episode_id = s.episode_id"
+        " WHERE segments MATCH ?"
+    )
+    params: list = [expression]
+    if show_code:
+        sql += " AND e.show_code = ? COLLATE NOCASE"
+        params.append(show_code)
+    # Over-fetch so the per-episode cap can still fill the limit
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit * per_episode)
+
+    start = time.perf_counter()
+    with closing(_connect()) as db:
+        try:
+            rows = db.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            log.error("Invalid search query %r: %s", query, e)
+            return []
+    metrics.record("search.query", time.perf_counter() - start)
+
+    hits: list[Hit] = []
+    per: dict[str, int] = {}
+    for episode_id, kind, seconds, snippet, score, code, number, title, aired, episode_url, transcript_url in rows:
+        if per.get(episode_id, 0) >= per_episode:
+            continue
+        per[episode_id] = per.get(episode_id, 0) + 1
+        hits.append(Hit(
+            episode_id=episode_id, show_code=code, episode_number=number, title=title,
+            airing_date=aired, url=(transcript_url if kind == "transcript" else "") or episode_url,
+            kind=kind, seconds=seconds, snippet=snippet, score=score,
+        ))
+        if len(hits) >= limit:
+            break
+    return hits
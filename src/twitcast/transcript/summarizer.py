@@ -3,9 +3,11 @@
 import json
 import logging
 
-from twitcast.api.anthropic_client import summarize_transcript, write_promo
+from twitcast.api.anthropic_client import SUMMARIZE_MAX_TOKENS, summarize_transcript, write_promo
+from twitcast.api.tokens import input_budget
 from twitcast.config import Config
-from twitcast.transcript.parser import strip_html
+from twitcast.transcript.packer import pack_transcript
+from twitcast.transcript.parser import transcript_text
 
 log = logging.getLogger(__name__)
 
@@ -22,10 +24,9 @@ def summarize_episode(
     Returns dict with keys: summary, topics, notable_quote.
     Returns None on failure.
     """
-    text = strip_html(transcript_html)
-    # Truncate to ~30K chars to stay within Haiku context
-    if len(text) > 30_000:
-        text = text[:30_000]
+    # Keep what fits the model's input budget, most informative parts first
+    budget = input_budget(config, SUMMARIZE_MAX_TOKENS)
+    text = pack_transcript(transcript_text(transcript_html), budget, config.anthropic.model)
 
     result = summarize_transcript(config, text, show_name, episode_number, title)
     if result is None:
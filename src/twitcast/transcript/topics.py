@@ -0,0 +1,184 @@
+"""Topic extraction: TF-IDF scoring against the archived episode corpus.
+
+Terms are lowercased words and, from titles and show notes, two-word
+phrases. The document-frequency table lives in ``cache/search.db`` next to
+the full-text index (see search.py) and is updated with it, one document
+per archived episode. Backfill fills it with past episodes; every promo
+poll archives and indexes recent ones before their promos are built
+(promo/pipeline.py archive_new_transcripts), so it keeps growing without
+another backfill.
+
+Documents are sparse vectors (term -> weight dicts). Scoring an episode
+costs one Counter pass over its text plus one indexed lookup per distinct
+term, a few milliseconds even for a full transcript. With no corpus yet
+every term gets the same IDF and scoring degrades to term frequency.
+"""
+
+import logging
+import math
+import re
+import sqlite3
+from collections import Counter
+from contextlib import closing
+
+from twitcast.config import cache_dir
+
+log = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.'-]*[a-z0-9+#]|[a-z0-9]")
+
+# English function words plus podcast chatter that says nothing about a topic
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being
+below between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down
+during each few for from further had hadn't has hasn't have haven't having he he'd he'll he's her here
+here's hers herself him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its itself
+let's me more most mustn't my myself no nor not of off on once only or other ought our ours ourselves out
+over own same shan't she she'd she'll she's should shouldn't so some such than that that's the their
+theirs them themselves then there there's these they they'd they'll they're they've this those through
+to too under until up very was wasn't we we'd we'll we're we've were weren't what what's when when's
+where where's which while who who's whom why why's will with won't would wouldn't you you'd you'll
+you're you've your yours yourself yourselves
+yeah yes okay ok oh uh um hmm like just really actually basically literally know think thing things
+going gonna gotta wanna get got getting go goes went gone say says said saying see seen look looking
+kind sort lot lots right well now way ways want wanted mean means make makes made take takes took
+something anything everything nothing someone anyone everyone little much many good great new old
+one two three first last next back even still ever never always maybe probably pretty sure thank
+thanks today week episode show shows podcast twit club sponsor sponsors sponsored brought host hosts
+www http https com tv
+cover covers covered covering discuss discusses discussed discussing talk talks talked talking join joins
+joined plus latest news everywhere everyone's also including include includes dig digs look looks
+""".split())
+
+# SQLite caps bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+
+def _words(text: str) -> list[str]:
+    words = []
+    for w in WORD_RE.findall((text or "").lower()):
+        w = w.removesuffix("'s").strip(".'-")
+        words.append(w if len(w) > 2 and w not in STOPWORDS and not w.isdigit() else "")
+    return words
+
+
+def terms(text: str, phrases: bool = True) -> list[str]:
+    """Content words of text, plus adjacent-pair phrases if phrases is set."""
+    words = _words(text)
+    out = [w for w in words if w]
+    if phrases:
+        out += [f"{a} {b}" for a, b in zip(words, words[1:]) if a and b and a != b]
+    return out
+
+
+def document_terms(record: dict) -> set[str]:
+    """Distinct terms an archived episode contributes to document frequency.
+
+    Phrases come only from the title and notes; transcripts add single
+    words, which keeps the table small.
+    """
+    header = f"{record.get('title', '')}\n{record.get('show_notes', '')}"
+    return set(terms(header)) | set(terms(record.get("transcript") or "", phrases=False))
+
+
+# --- Document-frequency table (in search.db, maintained by search.update_index) ---
+
+def add_document(db: sqlite3.Connection, episode_id: str, doc_terms: set[str]) -> None:
+    db.execute("INSERT INTO doc_terms VALUES (?, ?)", (episode_id, "\n".join(sorted(doc_terms))))
+    db.executemany(
+        "INSERT INTO df (term, n) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET n = n + 1",
+        ((t,) for t in doc_terms),
+    )
+
+
+def remove_document(db: sqlite3.Connection, episode_id: str) -> None:
+    row = db.execute("SELECT terms FROM doc_terms WHERE episode_id = ?", (episode_id,)).fetchone()
+    if row is None:
+        return
+    db.executemany("UPDATE df SET n = n - 1 WHERE term = ?", ((t,) for t in row[0].split("\n") if t))
+    db.execute("DELETE FROM df WHERE n <= 0")
+    db.execute("DELETE FROM doc_terms WHERE episode_id = ?", (episode_id,))
+
+
+def document_frequencies(wanted: set[str]) -> tuple[int, dict[str, int]]:
+    """(corpus size, df of each wanted term that occurs in the corpus)."""
+    from twitcast.transcript.search import INDEX_FILE, SCHEMA_VERSION
+
+    path = cache_dir() / INDEX_FILE
+    if not wanted or not path.exists():
+        return 0, {}
+    try:
+        with closing(sqlite3.connect(path)) as db:
+            if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                return 0, {}
+            n_docs = db.execute("SELECT count(*) FROM doc_terms").fetchone()[0]
+            df = {}
+            items = list(wanted)
+            for i in range(0, len(items), _LOOKUP_CHUNK):
+                chunk = items[i:i + _LOOKUP_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                df.update(db.execute(f"SELECT term, n FROM df WHERE term IN ({marks})", chunk))
+    except sqlite3.Error as e:
+        log.warning("Could not read document frequencies, scoring by term frequency: %s", e)
+        return 0, {}
+    return n_docs, df
+
+
+# --- Scoring ---
+
+def weigh(text: str) -> dict[str, float]:
+    """Sparse TF-IDF vector of text: sublinear term frequency times smoothed IDF."""
+    tf = Counter(terms(text))
+    n_docs, df = document_frequencies(set(tf))
+    return {
+        term: (1 + math.log(count)) * (math.log((n_docs + 1) / (df.get(term, 0) + 1)) + 1)
+        for term, count in tf.items()
+    }
+
+
+def top_terms(weights: dict[str, float], k: int = 5, min_ratio: float = 0.5) -> list[str]:
+    """Highest-weighted terms, without repeating words already covered by a phrase.
+
+    Terms below min_ratio of the top weight are left out rather than padding
+    the list with noise.
+    """
+    chosen: list[str] = []
+    covered: set[str] = set()
+    floor = max(weights.values(), default=0) * min_ratio
+    for term in sorted(weights, key=lambda t: (-weights[t], t)):
+        if weights[term] < floor:
+            break
+        parts = term.split()
+        if all(p in covered for p in parts):
+            continue
+        # A phrase replaces the single words it extends
+        chosen = [c for c in chosen if c not in parts]
+        chosen.append(term)
+        covered.update(parts)
+        if len(chosen) >= k:
+            break
+    return chosen
+
+
+def surface(term: str, text: str) -> str:
+    """A lowercased term as first written in text (so 'ios' comes back as 'iOS')."""
+    m = re.search(r"\b" + r"\s+".join(map(re.escape, term.split())) + r"\b", text, flags=re.IGNORECASE)
+    return re.sub(r"\s+", " ", m.group(0)) if m else term
+
+
+def rank_passages(passages: list[str], weights: dict[str, float], k: int = 3) -> list[str]:
+    """The k passages whose terms carry the most weight, in their original order.
+
+    Scores are length-normalized, so a long list of sponsors doesn't beat
+    a short, specific item. Passages with no weighted terms are dropped.
+    """
+    scored = []
+    for i, passage in enumerate(passages):
+        passage_terms = set(terms(passage))
+        if not passage_terms:
+            continue
+        score = sum(weights.get(t, 0.0) for t in passage_terms) / math.sqrt(len(passage_terms))
+        if score > 0:
+            scored.append((score, i))
+    best = sorted(scored, reverse=True)[:k]
+    return [passages[i] for _, i in sorted(best, key=lambda s: s[1])]
@@ -0,0 +1,180 @@
+"""Local webhook receiver for push-triggered promo runs.
+
+A sender POSTs ``{"episode_id": ..., "event": ..., "timestamp": ...}`` to
+``WEBHOOK_PATH``, signed with the shared secret as an HMAC-SHA256 of the raw
+body in the ``X-Twitcast-Signature`` header. Accepted notifications are queued
+and handled one at a time on a worker thread, so the sender gets an immediate
+202 while the promo pipeline runs.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+log = logging.getLogger(__name__)
+
+WEBHOOK_PATH = "/hooks/episode"
+SIGNATURE_HEADER = "X-Twitcast-Signature"
+EVENTS = ("episode.published", "transcript.published")
+MAX_BODY_BYTES = 16 * 1024
+# Seconds a client may stall on any read before the connection is dropped
+REQUEST_TIMEOUT_SECONDS = 10
+# Reject notifications whose timestamp is further than this from our clock
+MAX_CLOCK_SKEW_SECONDS = 300
+
+
+def sign(secret: str, body: bytes) -> str:
+    """Signature header value for a request body."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify(secret: str, body: bytes, signature: str) -> bool:
+    """Check a signature header against the shared secret (constant time)."""
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign(secret, body), signature)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "WebhookServer"
+    # Socket timeout (StreamRequestHandler), so a slow or silent client
+    # can't hold a handler thread forever
+    timeout = REQUEST_TIMEOUT_SECONDS
+
+    def do_POST(self):
+        if self.path != WEBHOOK_PATH:
+            self._reply(404, "not found")
+            return
+
+        header = self.headers.get("Content-Length")
+        if header is None:
+            self._reply(411, "length required")
+            return
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(400, "invalid content length")
+            return
+        if length > MAX_BODY_BYTES:
+            self._reply(413, "payload too large")
+            return
+        try:
+            body = self.rfile.read(length)
+        except TimeoutError:
+            log.warning("Webhook from %s timed out sending its body", self.client_address[0])
+            self.close_connection = True
+            return
+        if len(body) < length:
+            self._reply(400, "truncated body")
+            return
+
+        if not verify(self.server.secret, body, self.headers.get(SIGNATURE_HEADER, "")):
+            log.warning("Rejected webhook from %s: bad signature", self.client_address[0])
+            self._reply(401, "bad signature")
+            return
+
+        try:
+            payload = json.loads(body)
+            episode_id = str(payload["episode_id"]).strip()
+            event = payload.get("event", EVENTS[0])
+            sent_at = float(payload.get("timestamp", 0))
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            self._reply(400, "invalid payload")
+            return
+
+        if not episode_id.isdigit() or event not in EVENTS:
+            self._reply(400, "invalid payload")
+            return
+        if abs(time.time() - sent_at) > MAX_CLOCK_SKEW_SECONDS:
+            log.warning("Rejected webhook for episode %s: stale timestamp", episode_id)
+            self._reply(401, "stale timestamp")
+            return
+
+        queued = self.server.enqueue(episode_id)
+        log.info("Webhook %s for episode %s (%s)", event, episode_id, "queued" if queued else "already queued")
+        self._reply(202, "accepted")
+
+    def _reply(self, status: int, message: str) -> None:
+        body = json.dumps({"status": message}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("%s - %s", self.client_address[0], format % args)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """HTTP listener that hands verified episode IDs to a single worker."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], secret: str, on_episode: Callable[[str], None]):
+        super().__init__(address, _Handler)
+        self.secret = secret
+        self._on_episode = on_episode
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._work, name="webhook-worker", daemon=True)
+        self._worker.start()
+
+    def enqueue(self, episode_id: str) -> bool:
+        """Queue an episode unless it is already waiting. Returns True if queued."""
+        with self._lock:
+            if episode_id in self._pending:
+                return False
+            self._pending.add(episode_id)
+        self._queue.put(episode_id)
+        return True
+
+    def _work(self) -> None:
+        while True:
+            episode_id = self._queue.get()
+            try:
+                self._on_episode(episode_id)
+            except Exception:
+                log.exception("Webhook promo run failed for episode %s", episode_id)
+            finally:
+                with self._lock:
+                    self._pending.discard(episode_id)
+                self._queue.task_done()
+
+
+def send_notification(
+    url: str,
+    secret: str,
+    episode_id: str | int,
+    event: str = EVENTS[0],
+) -> bool:
+    """Send a signed notification, standing in for the real publisher."""
+    body = json.dumps({
+        "episode_id": str(episode_id),
+        "event": event,
+        "timestamp": time.time(),
+    }).encode()
+    try:
+        resp = requests.post(
+            url,
+            data=body,
+            headers={"Content-Type": "application/json", SIGNATURE_HEADER: sign(secret, body)},
+            timeout=10,
+        )
+        resp.raise_for_status()
+        log.info("Webhook accepted for episode %s", episode_id)
+        return True
+    except requests.RequestException as e:
+        log.warning("Webhook notification failed: %s", e)
+        return False
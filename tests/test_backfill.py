@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from twitcast import backfill, shows
+from twitcast.api import twit
+from twitcast.config import Config, use_cache_dir
+from twitcast.transcript import archive
+
+SINCE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _page(page: int, aired: str) -> list[dict]:
+    return [{"id": f"{page}-{i}", "airingDate": aired} for i in range(2)]
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """Pages served by the fake catalog; a RequestException entry fails that page."""
+    pages: list = []
+
+    def iter_pages(config, page_size=50, start_page=0):
+        for page in range(start_page, len(pages)):
+            if isinstance(pages[page], Exception):
+                raise pages[page]
+            yield page, pages[page]
+
+    monkeypatch.setattr(twit, "iter_episode_pages", iter_pages)
+    monkeypatch.setattr(shows, "load_registry", lambda _: None)
+    monkeypatch.setattr(archive, "archive_episode", lambda *_: True)
+    monkeypatch.setattr(backfill, "_is_done", lambda *_: False)
+    with use_cache_dir(tmp_path):
+        yield pages
+
+
+def test_failed_page_is_a_failure_and_resumes_there(catalog):
+    catalog += [_page(0, "2026-03-01"), requests.ConnectionError("down"), _page(2, "2025-12-01")]
+    stats = backfill.run_backfill(Config(), SINCE, workers=1, page_size=2)
+    assert stats.failed == 1
+    assert stats.archived == 2
+    assert backfill._load_state()["next_page"] == 1
+
+
+def test_complete_run_clears_checkpoint(catalog):
+    catalog += [_page(0, "2026-03-01"), _page(1, "2026-02-01"), _page(2, "2025-12-01")]
+    stats = backfill.run_backfill(Config(), SINCE, workers=1, page_size=2)
+    assert (stats.failed, stats.archived, stats.pages) == (0, 4, 3)
+    assert backfill._load_state() == {}
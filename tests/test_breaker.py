@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+
+from twitcast.api import anthropic_client
+from twitcast.breaker import CircuitBreaker
+from twitcast.config import AnthropicConfig, Config
+
+
+def _bad_request() -> anthropic.BadRequestError:
+    response = SimpleNamespace(request=None, status_code=400, headers={})
+    return anthropic.BadRequestError("prompt is too long", response=response, body=None)
+
+
+def _overloaded() -> anthropic.APIStatusError:
+    response = SimpleNamespace(request=None, status_code=529, headers={})
+    return anthropic.APIStatusError("overloaded", response=response, body=None)
+
+
+class FakeClient:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.messages = self
+
+    def with_options(self, **_):
+        return self
+
+    def create(self, **_):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setattr(anthropic_client, "_breakers", {})
+    return Config(anthropic=AnthropicConfig(api_key="test", breaker_threshold=1, breaker_cooldown_seconds=60))
+
+
+def test_trial_success_closes():
+    breaker = CircuitBreaker("test", threshold=1, cooldown=0)
+    breaker.failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.success()
+    assert not breaker.is_open
+    assert breaker.allow() and breaker.allow()
+
+
+def test_trial_failure_reopens():
+    breaker = CircuitBreaker("test", threshold=1, cooldown=60)
+    breaker.failure()
+    assert not breaker.allow()
+    breaker.cooldown = 0
+    assert breaker.allow()
+    breaker.cooldown = 60
+    breaker.failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+
+
+def test_released_trial_lets_next_caller_try():
+    breaker = CircuitBreaker("test", threshold=1, cooldown=0)
+    breaker.failure()
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_rejected_request_during_trial_closes(config, monkeypatch):
+    client = FakeClient(_overloaded(), _bad_request())
+    monkeypatch.setattr(anthropic_client, "_get_client", lambda _: client)
+    with pytest.raises(anthropic.APIStatusError):
+        anthropic_client._create(config, "test", max_tokens=1, messages=[])
+    breaker = anthropic_client._breaker_for(config, config.anthropic.model)
+    assert breaker.is_open
+    breaker.cooldown = 0
+
+    with pytest.raises(anthropic.BadRequestError):
+        anthropic_client._create(config, "test", max_tokens=1, messages=[])
+    assert not breaker.is_open
+    assert anthropic_client.available(config)
+
+
+def test_interrupted_trial_is_released(config, monkeypatch):
+    client = FakeClient(_overloaded(), KeyboardInterrupt())
+    monkeypatch.setattr(anthropic_client, "_get_client", lambda _: client)
+    with pytest.raises(anthropic.APIStatusError):
+        anthropic_client._create(config, "test", max_tokens=1, messages=[])
+    breaker = anthropic_client._breaker_for(config, config.anthropic.model)
+    breaker.cooldown = 0
+    with pytest.raises(KeyboardInterrupt):
+        anthropic_client._create(config, "test", max_tokens=1, messages=[])
+    assert breaker.allow()
+
+
+def _not_found() -> anthropic.NotFoundError:
+    response = SimpleNamespace(request=None, status_code=404, headers={})
+    return anthropic.NotFoundError("model: claude-retired", response=response, body=None)
+
+
+def test_missing_model_falls_back(monkeypatch):
+    monkeypatch.setattr(anthropic_client, "_breakers", {})
+    config = Config(anthropic=AnthropicConfig(api_key="test", model="claude-retired", fallback_model="claude-spare"))
+    reply = SimpleNamespace(usage=SimpleNamespace(input_tokens=1, output_tokens=1))
+    client = FakeClient(_not_found(), reply)
+    monkeypatch.setattr(anthropic_client, "_get_client", lambda _: client)
+    assert anthropic_client._create(config, "test", max_tokens=1, messages=[]) is reply
@@ -0,0 +1,45 @@
+import pytest
+
+from twitcast.api import anthropic_client
+from twitcast.config import Config, use_cache_dir
+from twitcast.promo import builder
+from twitcast.shows import Show
+
+NOTES = """
+<p>Leo and the panel dig into the week's biggest stories.</p>
+<ul>
+<li>Apple ships a passkey manager for every device in the house.</li>
+<li>A ransomware gang takes a hospital network offline for three days.</li>
+</ul>
+<p>The antitrust trial over app store fees enters its second week with new testimony.
+Regulators question whether the fees hurt small developers across the industry.
+Passkeys are replacing passwords faster than analysts expected this year.
+Hospitals are paying ransoms because their backups are not tested often enough.</p>
+"""
+
+EPISODE = {"id": 1, "episodeNumber": 1000, "label": "Passkeys Everywhere", "showNotes": NOTES, "cleanPath": "/x"}
+SHOW = Show(slug="this-week-in-tech", code="TWiT", label="This Week in Tech")
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path):
+    with use_cache_dir(tmp_path):
+        yield
+
+
+def test_outage_uses_extractive_summary(monkeypatch):
+    monkeypatch.setattr(anthropic_client, "available", lambda _: False)
+    promo = builder.build_ai_promo(Config(), EPISODE, SHOW)
+    assert promo is not None
+    assert "Regulators question whether the fees hurt small developers" in promo
+    assert promo != builder.build_template_promo(EPISODE, SHOW)
+
+
+def test_failed_promo_writing_keeps_summary(monkeypatch):
+    summary = {"summary": "A week of passkeys and ransomware.", "topics": ["passkeys"], "notable_quote": "“Test your backups.” — Leo"}
+    monkeypatch.setattr(anthropic_client, "available", lambda _: True)
+    monkeypatch.setattr(builder, "summarize_episode", lambda *_: summary)
+    monkeypatch.setattr(builder, "generate_ai_promo", lambda *_: None)
+    promo = builder.build_ai_promo(Config(), EPISODE, SHOW)
+    assert summary["summary"] in promo
+    assert summary["notable_quote"] in promo
@@ -0,0 +1,78 @@
+import pytest
+
+from twitcast.config import Config, DiscourseConfig, use_cache_dir
+from twitcast.delivery import discourse
+
+SHOW_CATEGORY = 101
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, data: dict, text: str = ""):
+        self.status_code = status_code
+        self._data = data
+        self.text = text
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, topics: list[dict], users: list[dict] = (), post: FakeResponse | None = None):
+        self.latest = {"topic_list": {"topics": topics}, "users": list(users)}
+        self.post_response = post
+        self.posted = []
+
+    def get(self, url, **_):
+        return FakeResponse(200, self.latest)
+
+    def post(self, url, json=None, **_):
+        self.posted.append(json)
+        return self.post_response
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(discourse, "find_category", lambda *_: SHOW_CATEGORY)
+    with use_cache_dir(tmp_path):
+        yield Config(discourse=DiscourseConfig(api_key="key", api_username="TWiT-Bot"))
+
+
+def _use(monkeypatch, session):
+    monkeypatch.setattr(discourse.net, "session", lambda: session)
+
+
+def test_member_thread_does_not_block_episode_topic(config, monkeypatch):
+    session = FakeSession(
+        [{"id": 7, "title": "SN 1000: question about the show", "category_id": 1,
+          "posters": [{"user_id": 3, "description": "Original Poster"}]}],
+        users=[{"id": 3, "username": "listener"}],
+        post=FakeResponse(200, {"topic_id": 8}),
+    )
+    _use(monkeypatch, session)
+    result = discourse.post_topic(config, "SN", 1000, "Encryption", "body")
+    assert result == {"topic_id": 8}
+    assert session.posted
+
+
+@pytest.mark.parametrize("topic", [
+    {"id": 7, "title": "SN 1000: Old title", "category_id": SHOW_CATEGORY},
+    {"id": 7, "title": "SN 1000: Old title", "category_id": 1,
+     "posters": [{"user_id": 3, "description": "Original Poster, Most Recent Poster"}]},
+    {"id": 7, "title": "SN 1000: Encryption", "category_id": 1},
+])
+def test_existing_episode_topic_is_found(config, monkeypatch, topic):
+    session = FakeSession([topic], users=[{"id": 3, "username": "twit-bot"}])
+    _use(monkeypatch, session)
+    assert discourse.post_topic(config, "SN", 1000, "Encryption", "body") == {"topic_id": 7, "duplicate": True}
+    assert not session.posted
+
+
+def test_rejected_duplicate_is_looked_up(config, monkeypatch):
+    session = FakeSession([], post=FakeResponse(422, {}, "Title has already been used"))
+    _use(monkeypatch, session)
+    assert discourse.find_topic(config, "SN 1000: Encryption") is None
+    session.latest["topic_list"]["topics"] = [{"id": 9, "title": "SN 1000: Encryption", "category_id": 1}]
+    assert discourse.post_topic(config, "SN", 1000, "Encryption", "body") == {"topic_id": 9, "duplicate": True}
@@ -0,0 +1,12 @@
+from twitcast.dashboard.fingerprint import fingerprint_inputs
+
+
+def test_render_config_changes_fingerprint():
+    episodes = [{"show_code": "sn", "title": "SN 1000"}]
+    base = fingerprint_inputs(episodes, 100, None, {"pi": ("portrait", "", "floyd-steinberg")})
+    assert base == fingerprint_inputs(episodes, 100, None, {"pi": ("portrait", "", "floyd-steinberg")})
+    assert base != fingerprint_inputs(episodes, 100, None, {"pi": ("portrait", "gray4", "floyd-steinberg")})
+    assert base != fingerprint_inputs(episodes, 100, None, {"pi": ("landscape", "", "floyd-steinberg")})
+    assert base != fingerprint_inputs(
+        episodes, 100, None, {"pi:a": ("portrait", "", "floyd-steinberg"), "pi:b": ("portrait", "", "floyd-steinberg")}
+    )
@@ -0,0 +1,26 @@
+import json
+import time
+
+import pytest
+
+from twitcast.api import memberful
+from twitcast.config import Config, DisplayConfig, MemberfulConfig
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(memberful, "LEGACY_CACHE", tmp_path / "memberful.json")
+    monkeypatch.setattr(memberful, "_cache_path", lambda _: tmp_path / "shared" / "memberful-0123.json")
+    return Config(memberful=MemberfulConfig(api_key=""), display=DisplayConfig(memberful_refresh_hours=4))
+
+
+def test_legacy_count_is_migrated(config, tmp_path):
+    (tmp_path / "memberful.json").write_text(json.dumps({"count": 1234, "timestamp": time.time()}))
+    assert memberful.fetch_memberful_count(config) == 1234
+    assert not (tmp_path / "memberful.json").exists()
+    assert (tmp_path / "shared" / "memberful-0123.json").exists()
+
+
+def test_stale_legacy_count_is_the_fallback(config, tmp_path):
+    (tmp_path / "memberful.json").write_text(json.dumps({"count": 1234, "timestamp": 0}))
+    assert memberful.fetch_memberful_count(config) == 1234
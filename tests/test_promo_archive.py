@@ -0,0 +1,58 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from twitcast import shows
+from twitcast.config import Config, use_cache_dir
+from twitcast.promo import pipeline
+from twitcast.transcript import archive, search
+
+EPISODE = {"id": 1, "airingDate": (datetime.now(timezone.utc) - timedelta(hours=3)).isoformat()}
+
+
+@pytest.fixture
+def probes(tmp_path, monkeypatch):
+    """Episode IDs archive_episode was called for; it never finds a transcript."""
+    calls = []
+
+    def archive_episode(config, registry, episode, summarize=False):
+        calls.append(episode["id"])
+        archive.save_episode({"episode_id": str(episode["id"]), "transcript": ""})
+        return False
+
+    monkeypatch.setattr(archive, "archive_episode", archive_episode)
+    monkeypatch.setattr(shows, "load_registry", lambda _: None)
+    monkeypatch.setattr(search, "update_index", lambda: None)
+    with use_cache_dir(tmp_path):
+        yield calls
+
+
+def test_missing_transcript_is_rechecked_with_backoff(probes, monkeypatch):
+    state = {}
+    deadline = time.monotonic() + 60
+    clock = [time.time()]
+    monkeypatch.setattr(pipeline.time, "time", lambda: clock[0])
+
+    pipeline.archive_new_transcripts(Config(), [EPISODE], state, deadline)
+    pipeline.archive_new_transcripts(Config(), [EPISODE], state, deadline)
+    assert probes == [1]
+
+    clock[0] += 5 * 60
+    pipeline.archive_new_transcripts(Config(), [EPISODE], state, deadline)
+    assert probes == [1, 1]
+    assert state["transcript_checks"]["1"]["attempts"] == 2
+
+    # The second wait is twice the first
+    clock[0] += 5 * 60
+    pipeline.archive_new_transcripts(Config(), [EPISODE], state, deadline)
+    assert probes == [1, 1]
+    clock[0] += 5 * 60
+    pipeline.archive_new_transcripts(Config(), [EPISODE], state, deadline)
+    assert probes == [1, 1, 1]
+
+
+def test_no_checks_past_the_deadline(probes):
+    state = {}
+    pipeline.archive_new_transcripts(Config(), [EPISODE], state, time.monotonic())
+    assert probes == []
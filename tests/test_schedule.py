@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from twitcast.config import Config, PromoConfig
+from twitcast.promo.schedule import _latency_window, next_poll_time, record_episodes
+
+START = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def _episode(episode_id: int, aired: datetime) -> dict:
+    return {"id": episode_id, "airingDate": aired.isoformat(), "_embedded": {"shows": [{"shortName": "sn"}]}}
+
+
+def test_transcript_latency_widens_window():
+    schedule: dict = {}
+    record_episodes(schedule, [], START)
+    for week in range(3):
+        aired = START + timedelta(weeks=week, hours=1)
+        episode = _episode(week, aired)
+        record_episodes(schedule, [episode], aired + timedelta(minutes=30))
+        record_episodes(schedule, [episode], aired + timedelta(hours=4), [str(week)])
+
+    (history,) = schedule["shows"].values()
+    assert all(e["latency_s"] == 1800 and e["transcript_latency_s"] == 4 * 3600 for e in history.values())
+    low, high = _latency_window(history)
+    assert low <= timedelta(minutes=30) and high >= timedelta(hours=4)
+
+
+def test_transcript_seen_again_keeps_first_latency():
+    schedule: dict = {}
+    record_episodes(schedule, [], START)
+    episode = _episode(1, START + timedelta(hours=1))
+    record_episodes(schedule, [episode], START + timedelta(hours=2), ["1"])
+    record_episodes(schedule, [episode], START + timedelta(hours=9), ["1"])
+    (history,) = schedule["shows"].values()
+    assert history["1"]["transcript_latency_s"] == 3600
+
+
+def test_sparse_interval_capped_while_unlearned():
+    config = Config(promo=PromoConfig(sparse_poll_minutes=120))
+    schedule: dict = {}
+    # Aired before tracking began: no latency learned
+    record_episodes(schedule, [_episode(1, START - timedelta(days=3))], START)
+    assert next_poll_time(config, schedule, START) - START <= timedelta(minutes=30)
@@ -0,0 +1,58 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from twitcast import webhook
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(webhook._Handler, "timeout", 1)
+    received = []
+    srv = webhook.WebhookServer(("127.0.0.1", 0), SECRET, received.append)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv, received
+    srv.shutdown()
+    srv.server_close()
+
+
+def _send(srv, head: str, body: bytes = b"") -> str:
+    with socket.create_connection(srv.server_address, timeout=5) as sock:
+        sock.sendall(head.encode() + b"\r\n" + body)
+        return sock.recv(4096).decode(errors="replace")
+
+
+def _head(length: str | None) -> str:
+    lines = [f"POST {webhook.WEBHOOK_PATH} HTTP/1.1", "Host: localhost"]
+    if length is not None:
+        lines.append(f"Content-Length: {length}")
+    return "\r\n".join(lines) + "\r\n"
+
+
+@pytest.mark.parametrize("length, status", [(None, "411"), ("abc", "400"), ("-1", "400"), ("99999999", "413")])
+def test_bad_content_length(server, length, status):
+    srv, _ = server
+    assert _send(srv, _head(length)).split()[1] == status
+
+
+def test_stalled_body_is_dropped(server):
+    srv, _ = server
+    start = time.monotonic()
+    reply = _send(srv, _head("100"), b"{")
+    assert time.monotonic() - start < 4
+    assert reply == "" or reply.split()[1] == "400"
+
+
+def test_signed_notification_is_accepted(server):
+    srv, received = server
+    body = json.dumps({"episode_id": "123", "event": "episode.published", "timestamp": time.time()}).encode()
+    head = _head(str(len(body))) + f"{webhook.SIGNATURE_HEADER}: {webhook.sign(SECRET, body)}\r\n"
+    assert _send(srv, head, body).split()[1] == "202"
+    srv._queue.join()
+    assert received == ["123"]